@@ -1,5 +1,7 @@
 from django.contrib import admin
-from .models import Camera, TargetLabel, DetectionLog
+from django.urls import reverse
+from django.utils.html import format_html
+from .models import Camera, TargetLabel, DetectionLog, CameraROI
 
 class TargetLabelInline(admin.StackedInline):
     model = TargetLabel
@@ -11,4 +13,35 @@ class CameraAdmin(admin.ModelAdmin):
     """카메라 테이블 하나에서 LABEL 정보도 함께 등록"""
     inlines = [TargetLabelInline]
 
-admin.site.register(DetectionLog)
\ No newline at end of file
+@admin.register(CameraROI)
+class CameraROIAdmin(admin.ModelAdmin):
+    list_display = ['camera', 'points_count', 'is_active', 'editor_link', 'updated_at']
+    list_filter = ['is_active', 'updated_at']
+    search_fields = ['camera__name', 'camera__location']
+    ordering = ['camera__name']
+
+    fieldsets = (
+        ('기본 정보', {
+            'fields': ('camera', 'is_active')
+        }),
+        ('관심 영역', {
+            'fields': ('points',),
+            'description': '꼭짓점을 프레임 대비 비율(0.0-1.0)로 입력하거나 ROI 편집기에서 그리세요'
+        })
+    )
+
+    def points_count(self, obj):
+        return len(obj.get_points())
+    points_count.short_description = '꼭짓점 수'
+
+    def editor_link(self, obj):
+        if obj.camera:
+            return format_html('<a href="{}" target="_blank">ROI 편집기</a>',
+                               reverse('cctv:camera_roi_editor', kwargs={'camera_id': obj.camera.id}))
+        return '-'
+    editor_link.short_description = '편집'
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('camera')
+
+admin.site.register(DetectionLog)
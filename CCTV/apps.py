@@ -1,8 +1,11 @@
 # CCTV/apps.py
 from django.apps import AppConfig
+import logging
 import threading
 import time
 
+logger = logging.getLogger(__name__)
+
 class CctvConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'CCTV'
@@ -23,9 +26,7 @@ class CctvConfig(AppConfig):
         if os.environ.get('RUN_MAIN') != 'true':
             return
         
-        print("\n" + "="*60)
-        print("🚀 CCTV 시스템 초기화 시작...")
-        print("="*60)
+        logger.info("CCTV 시스템 초기화 시작...")
         
         def initialize_cctv_system():
             """백그라운드에서 CCTV 시스템 초기화 - 실시간 DB 반영"""
@@ -35,6 +36,17 @@ class CctvConfig(AppConfig):
                 
                 from .utils import camera_streamer, ai_detection_system
                 from .models import Camera
+
+                # 0. AI 모델 백그라운드 로드 (스트리밍은 로드 완료를 기다리지 않음)
+                ai_detection_system.start_model_loading()
+
+                # 스크린샷 존재 플래그 주기적 재검증
+                from .screenshots import screenshot_reconciler
+                screenshot_reconciler.start()
+
+                # 로그/스크린샷 보관 정책 (만료 삭제, 오래된 날짜 압축)
+                from .retention import retention_worker
+                retention_worker.start()
                 
                 # 1. 카메라 실시간 모니터링 스레드 시작
                 def monitor_cameras():
@@ -58,13 +70,13 @@ class CctvConfig(AppConfig):
                             
                             # 변경사항 감지
                             if current_state != last_camera_state:
-                                print(f"\n🔄 카메라 설정 변경 감지!")
+                                logger.info("카메라 설정 변경 감지!")
                                 
                                 # 추가된 카메라
                                 added = set(current_state.keys()) - set(last_camera_state.keys())
                                 for camera_id in added:
                                     camera = Camera.objects.get(id=camera_id)
-                                    print(f"  ➕ 새 카메라: {camera.name}")
+                                    logger.info("새 카메라: %s", camera.name)
                                     
                                     # 백그라운드 스트리밍 시작
                                     camera_streamer.start_background_streaming(camera.rtsp_url)
@@ -76,7 +88,7 @@ class CctvConfig(AppConfig):
                                 # 삭제된 카메라
                                 removed = set(last_camera_state.keys()) - set(current_state.keys())
                                 for camera_id in removed:
-                                    print(f"  ➖ 삭제된 카메라: ID {camera_id}")
+                                    logger.info("삭제된 카메라: ID %s", camera_id)
                                     
                                     # 스트리밍 중지
                                     if camera_id in last_camera_state:
@@ -94,7 +106,7 @@ class CctvConfig(AppConfig):
                                     
                                     # RTSP URL 변경
                                     if old['rtsp_url'] != new['rtsp_url']:
-                                        print(f"  🔄 RTSP 변경: {new['name']}")
+                                        logger.info("RTSP 변경: %s", new['name'])
                                         camera_streamer.stop_background_streaming(old['rtsp_url'])
                                         camera_streamer.cleanup_camera(old['rtsp_url'])
                                         camera_streamer.start_background_streaming(new['rtsp_url'])
@@ -102,7 +114,7 @@ class CctvConfig(AppConfig):
                                     # 타겟 라벨 변경
                                     if old['has_labels'] != new['has_labels'] or old['label_count'] != new['label_count']:
                                         camera = Camera.objects.get(id=camera_id)
-                                        print(f"  🎯 타겟 라벨 변경: {new['name']} (라벨 {new['label_count']}개)")
+                                        logger.info("타겟 라벨 변경: %s (라벨 %s개)", new['name'], new['label_count'])
                                         
                                         if new['has_labels']:
                                             # AI 탐지 재시작
@@ -114,13 +126,13 @@ class CctvConfig(AppConfig):
                                             ai_detection_system.stop_detection_for_camera(camera_id)
                                 
                                 last_camera_state = current_state
-                                print("  ✅ 변경사항 적용 완료\n")
+                                logger.info("변경사항 적용 완료")
                             
                             # 10초마다 체크
                             time.sleep(10)
                             
                         except Exception as e:
-                            print(f"❌ 카메라 모니터링 오류: {e}")
+                            logger.error("카메라 모니터링 오류: %s", e)
                             time.sleep(10)
                 
                 # 모니터링 스레드 시작
@@ -130,37 +142,33 @@ class CctvConfig(AppConfig):
                     name="CameraMonitor"
                 )
                 monitor_thread.start()
-                print("✅ 카메라 실시간 모니터링 시작")
+                logger.info("카메라 실시간 모니터링 시작")
                 
                 # 2. 초기 카메라 로드 및 시작
                 cameras = Camera.objects.prefetch_related('target_labels').all()
-                print(f"\n📹 총 {cameras.count()}개 카메라 발견")
+                logger.info("총 %s개 카메라 발견", cameras.count())
                 
                 # 백그라운드 스트리밍 시작
                 for camera in cameras:
                     try:
                         camera_streamer.start_background_streaming(camera.rtsp_url)
-                        print(f"  ✅ '{camera.name}' 백그라운드 스트리밍 시작")
+                        logger.info("'%s' 백그라운드 스트리밍 시작", camera.name)
                     except Exception as e:
-                        print(f"  ❌ '{camera.name}' 스트리밍 실패: {e}")
+                        logger.error("'%s' 스트리밍 실패: %s", camera.name, e)
                 
                 # AI 탐지 시작 (타겟 라벨이 있는 카메라만)
                 for camera in cameras:
                     if camera.target_labels.exists():
                         try:
                             ai_detection_system.start_detection_for_camera(camera)
-                            print(f"  🤖 '{camera.name}' AI 탐지 시작 (라벨 {camera.target_labels.count()}개)")
+                            logger.info("'%s' AI 탐지 시작 (라벨 %s개)", camera.name, camera.target_labels.count())
                         except Exception as e:
-                            print(f"  ❌ '{camera.name}' AI 탐지 실패: {e}")
+                            logger.error("'%s' AI 탐지 실패: %s", camera.name, e)
                 
-                print("\n" + "="*60)
-                print("✅ CCTV 시스템 초기화 완료!")
-                print("="*60 + "\n")
+                logger.info("CCTV 시스템 초기화 완료!")
                 
             except Exception as e:
-                print(f"❌ CCTV 시스템 초기화 실패: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("CCTV 시스템 초기화 실패: %s", e)
         
         # 백그라운드 스레드에서 초기화
         init_thread = threading.Thread(
@@ -176,7 +184,7 @@ class CctvConfig(AppConfig):
         def cleanup():
             try:
                 from .utils import camera_streamer, ai_detection_system
-                print("\n🧹 CCTV 시스템 종료 중...")
+                logger.info("CCTV 시스템 종료 중...")
                 
                 # 모든 스트리밍 중지
                 camera_streamer.stop_all_background_streaming()
@@ -186,9 +194,21 @@ class CctvConfig(AppConfig):
                 
                 # 리소스 정리
                 camera_streamer.cleanup_all_resources()
+
+                # 이벤트 녹화 버퍼 및 HLS remux 프로세스 종료
+                from .recorder import event_clip_recorder
+                from .live_output import live_output_manager
+                event_clip_recorder.disable_all()
+                live_output_manager.stop_all()
+
+                from .screenshots import screenshot_reconciler
+                screenshot_reconciler.stop()
+
+                from .retention import retention_worker
+                retention_worker.stop()
                 
-                print("✅ CCTV 시스템 정리 완료")
+                logger.info("CCTV 시스템 정리 완료")
             except Exception as e:
-                print(f"⚠️ 정리 중 오류: {e}")
+                logger.warning("정리 중 오류: %s", e)
         
         atexit.register(cleanup)
\ No newline at end of file
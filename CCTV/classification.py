@@ -0,0 +1,170 @@
+# CCTV/classification.py
+"""
+카메라 간 배치 CLIP 분류 서비스
+
+카메라별 탐지 스레드가 각자 clip_model.encode_image 를 배치 1 로 호출하면
+스레드끼리 모델을 두고 경쟁만 하고 GPU/CPU 활용률은 낮다.
+이 서비스는 모든 카메라의 크롭을 하나의 요청 큐로 모아
+- 최대 CLIP_BATCH_SIZE 개, 첫 요청 후 최대 CLIP_BATCH_LINGER_MS 동안 기다려 마이크로 배치를 만들고
+- 배치당 encode_image 1 회만 호출한 뒤
+- 요청마다 자신의 라벨 세트(text_features)로 softmax 를 계산해 Future 로 돌려준다.
+전처리(clip_preprocess)는 호출한 카메라 스레드에서 수행해 워커 부담을 줄인다.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+logger = logging.getLogger('CCTV.detection')
+
+# 배치당 최대 크롭 수
+CLIP_BATCH_SIZE = getattr(settings, 'CCTV_CLIP_BATCH_SIZE', 16)
+# 첫 요청 이후 배치를 채우기 위해 기다리는 최대 시간 (밀리초)
+CLIP_BATCH_LINGER_MS = getattr(settings, 'CCTV_CLIP_BATCH_LINGER_MS', 5)
+# 호출자가 결과를 기다리는 최대 시간 (초)
+CLIP_RESULT_TIMEOUT = 30.0
+
+
+class ClassificationRequest:
+    """크롭 1장 분류 요청"""
+
+    def __init__(self, image_tensor, text_features):
+        self.image_tensor = image_tensor  # 전처리된 (3, H, W) 텐서
+        self.text_features = text_features  # 정규화된 (라벨 수, D) 텐서
+        self.future = Future()
+
+
+class ClipClassificationService:
+    """요청 큐 + 마이크로 배치 워커"""
+
+    def __init__(self, batch_size=CLIP_BATCH_SIZE, linger_ms=CLIP_BATCH_LINGER_MS):
+        self.batch_size = max(1, int(batch_size))
+        self.linger = max(0.0, linger_ms / 1000.0)
+        self.requests = queue.Queue()
+        self.lock = threading.Lock()
+        self.model = None
+        self.preprocess = None
+        self.device = "cpu"
+        self.worker = None
+        self.running = False
+
+        # 통계
+        self.batch_count = 0
+        self.crop_count = 0
+        self.max_batch = 0
+        self.encode_seconds = 0.0
+
+    def start(self, model, preprocess, device):
+        """모델 로드 후 워커 시작 (이미 실행 중이면 모델만 교체)"""
+        with self.lock:
+            self.model = model
+            self.preprocess = preprocess
+            self.device = device
+            if self.worker is not None and self.worker.is_alive():
+                return
+            self.running = True
+            self.worker = threading.Thread(target=self._worker_loop, daemon=True, name="ClipBatcher")
+            self.worker.start()
+        logger.info("CLIP 배치 분류 서비스 시작 (batch=%s, linger=%.0fms)", self.batch_size, self.linger * 1000)
+
+    def stop(self):
+        self.running = False
+        self.requests.put(None)
+        if self.worker is not None:
+            self.worker.join(timeout=5.0)
+            self.worker = None
+
+    def is_running(self):
+        return self.running and self.worker is not None and self.worker.is_alive()
+
+    def submit(self, pil_image, text_features):
+        """크롭(PIL) 1장 분류 요청 → softmax 확률(numpy)을 담을 Future"""
+        if not self.is_running():
+            raise RuntimeError("CLIP 배치 분류 서비스가 시작되지 않음")
+        request = ClassificationRequest(self.preprocess(pil_image), text_features)
+        self.requests.put(request)
+        return request.future
+
+    def classify(self, pil_images, text_features, timeout=CLIP_RESULT_TIMEOUT):
+        """여러 크롭을 한꺼번에 요청하고 결과 리스트 반환 (입력 순서 유지)"""
+        futures = [self.submit(image, text_features) for image in pil_images]
+        return [future.result(timeout=timeout) for future in futures]
+
+    def _collect_batch(self):
+        """첫 요청을 기다린 뒤 batch_size 또는 linger 시간까지 추가 요청 수집"""
+        first = self.requests.get()
+        if first is None:
+            return []
+        batch = [first]
+        deadline = time.perf_counter() + self.linger
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self.requests.get(timeout=remaining) if remaining > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self.running = False
+                break
+            batch.append(request)
+        return batch
+
+    def _worker_loop(self):
+        import torch
+
+        while self.running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            try:
+                start = time.perf_counter()
+                images = torch.stack([request.image_tensor for request in batch]).to(self.device)
+                with torch.no_grad():
+                    features = self.model.encode_image(images)
+                    features = features / features.norm(dim=-1, keepdim=True)
+
+                    # 요청별 라벨 세트로 softmax (CLIP temperature scaling)
+                    for request, feature in zip(batch, features):
+                        text_features = request.text_features
+                        logits = (feature.unsqueeze(0) @ text_features.T.to(feature.dtype)) * 100.0
+                        request.future.set_result(logits.softmax(dim=-1).cpu().numpy()[0])
+
+                self.batch_count += 1
+                self.crop_count += len(batch)
+                self.max_batch = max(self.max_batch, len(batch))
+                self.encode_seconds += time.perf_counter() - start
+            except Exception as e:
+                logger.exception("CLIP 배치 분류 오류: %s", e)
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+        # 종료 시 남은 요청 취소
+        while True:
+            try:
+                request = self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(RuntimeError("CLIP 배치 분류 서비스 종료"))
+
+    def get_status(self):
+        return {
+            'running': self.is_running(),
+            'batch_size': self.batch_size,
+            'linger_ms': self.linger * 1000,
+            'queue_size': self.requests.qsize(),
+            'batches': self.batch_count,
+            'crops': self.crop_count,
+            'avg_batch': round(self.crop_count / self.batch_count, 2) if self.batch_count else 0,
+            'max_batch': self.max_batch,
+            'avg_encode_ms': round(self.encode_seconds / self.batch_count * 1000, 1) if self.batch_count else 0,
+        }
+
+
+# 싱글톤 인스턴스
+clip_classifier = ClipClassificationService()
@@ -0,0 +1,34 @@
+# CCTV/clip_quantization.py
+"""
+CPU 추론용 CLIP 이미지 인코더 동적 int8 양자화
+
+ViT-L/14@336px 이미지 인코더의 nn.Linear(MLP, projection) 가중치를 int8 로 바꾸고
+활성값은 실행 시점에 동적으로 양자화한다 (torch.ao.quantization.quantize_dynamic).
+- 텍스트 인코더는 fp32 유지 (라벨 수만큼만 실행되어 비중이 작음)
+- conv1(패치 임베딩)은 Conv2d 라 양자화 대상이 아님 → model.dtype 은 fp32 그대로
+- GPU 에서는 사용하지 않음 (dynamic quantization 은 CPU 백엔드 전용)
+
+배포별 사용 여부는 settings.CCTV_CLIP_QUANTIZE 로 지정하고,
+정확도/지연 비교는 TEST/benchmark_clip_quantization.py 로 확인한다.
+"""
+
+
+def quantize_clip_visual(clip_model):
+    """
+    CLIP 모델의 이미지 인코더를 동적 int8 양자화 모델로 교체
+
+    clip_model 을 직접 수정하고 그대로 반환한다. (fp32 비교가 필요하면 호출 전에 deepcopy)
+    """
+    import torch
+
+    clip_model.visual = torch.ao.quantization.quantize_dynamic(
+        clip_model.visual.float(),
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+    )
+    clip_model.clip_quantized = True
+    return clip_model
+
+
+def is_quantized(clip_model):
+    return bool(getattr(clip_model, 'clip_quantized', False))
@@ -0,0 +1,140 @@
+# CCTV/crop_cache.py
+"""
+지각 해시(dHash) 기반 크롭 분류 캐시
+
+책상 앞 경비원, 세워둔 카트처럼 정지된 장면은 매 주기 거의 같은 크롭을 만든다.
+트랙 캐시(CCTV/tracking.py)는 새 트랙/박스 변화/TTL 만료 시 재분류하지만,
+크롭 내용이 사실상 같다면 ViT-L 을 다시 돌릴 필요가 없다.
+
+카메라별 LRU 캐시에 (크롭 dHash, 박스) → (라벨, 신뢰도)를 저장하고
+- 해밍 거리 CROP_CACHE_MAX_DISTANCE 이하
+- 박스 IoU CROP_CACHE_MIN_IOU 이상
+- CROP_CACHE_TTL 초 이내
+인 항목이 있으면 이전 분류 결과를 재사용한다. 적중률은 텔레메트리 카운터로 노출한다.
+
+캐시 조회는 트랙 캐시가 재분류를 요구한 뒤에만 일어나므로 (TTL 만료 / 박스 변화)
+CROP_CACHE_TTL 은 TRACK_CLASSIFY_TTL 보다 길고 CROP_CACHE_MIN_IOU 는 TRACK_RECLASSIFY_IOU 보다 낮아야 적중할 수 있다.
+적중해도 저장 시각은 그대로 두므로 정지 장면도 CROP_CACHE_TTL 마다 한 번은 다시 분류한다.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+from django.conf import settings
+
+from .tracking import TRACK_CLASSIFY_TTL, TRACK_RECLASSIFY_IOU, box_iou
+
+logger = logging.getLogger('CCTV.detection')
+
+# dHash 크기 (HASH_SIZE x HASH_SIZE 비트)
+CROP_HASH_SIZE = 8
+# 같은 크롭으로 볼 최대 해밍 거리 (64비트 중)
+CROP_CACHE_MAX_DISTANCE = getattr(settings, 'CCTV_CROP_CACHE_MAX_DISTANCE', 6)
+# 캐시 항목 유효 시간 (초, 저장 시각 기준) - 트랙 분류 TTL 의 2배보다 짧으면 TTL 만료 재분류 시 적중 불가
+CROP_CACHE_TTL = getattr(settings, 'CCTV_CROP_CACHE_TTL', 30.0)
+if CROP_CACHE_TTL < TRACK_CLASSIFY_TTL * 2:
+    logger.warning(
+        "CCTV_CROP_CACHE_TTL(%s초)이 트랙 분류 TTL 의 2배(%s초)보다 짧아 TTL 만료 재분류에서 크롭 캐시가 거의 적중하지 않습니다.",
+        CROP_CACHE_TTL, TRACK_CLASSIFY_TTL * 2,
+    )
+# 같은 위치로 볼 최소 박스 IoU - 박스 변화로 재분류되는 트랙(IoU < TRACK_RECLASSIFY_IOU)도 적중하도록 더 느슨하게
+CROP_CACHE_MIN_IOU = 0.5
+# 카메라별 최대 항목 수
+CROP_CACHE_SIZE = 64
+
+
+def dhash(image, hash_size=CROP_HASH_SIZE):
+    """BGR 크롭의 difference hash (int)"""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(hash1, hash2):
+    return bin(hash1 ^ hash2).count('1')
+
+
+class CropCache:
+    """카메라 하나의 LRU 크롭 분류 캐시"""
+
+    def __init__(self, max_distance=CROP_CACHE_MAX_DISTANCE, ttl=CROP_CACHE_TTL,
+                 min_iou=CROP_CACHE_MIN_IOU, max_size=CROP_CACHE_SIZE):
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self.min_iou = min_iou
+        self.max_size = max_size
+        self.entries = OrderedDict()  # 항목 번호 -> (hash, box, label_id, confidence, stored_at)
+        self.label_signature = None
+        self._next_id = 0
+
+    def lookup(self, crop_hash, box, now=None):
+        """근접 중복 크롭의 (label_id, confidence) - 없으면 None"""
+        now = now or time.time()
+        best_key = None
+        best_distance = self.max_distance + 1
+
+        for key, (cached_hash, cached_box, _, _, stored_at) in list(self.entries.items()):
+            if now - stored_at > self.ttl:
+                del self.entries[key]
+                continue
+            distance = hamming_distance(crop_hash, cached_hash)
+            if distance < best_distance and box_iou(box, cached_box) >= self.min_iou:
+                best_key, best_distance = key, distance
+
+        if best_key is None:
+            return None
+        self.entries.move_to_end(best_key)
+        _, _, label_id, confidence, _ = self.entries[best_key]
+        return label_id, confidence
+
+    def store(self, crop_hash, box, label_id, confidence, now=None):
+        self.entries[self._next_id] = (crop_hash, list(box), label_id, confidence, now or time.time())
+        self._next_id += 1
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def sync_labels(self, label_signature):
+        """타겟 라벨 구성이 바뀌면 캐시 비우기"""
+        if label_signature != self.label_signature:
+            self.label_signature = label_signature
+            self.entries.clear()
+
+
+class CropCacheRegistry:
+    """카메라 ID 별 CropCache 보관"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.caches = {}
+
+    def get(self, camera_id):
+        with self.lock:
+            cache = self.caches.get(camera_id)
+            if cache is None:
+                cache = self.caches[camera_id] = CropCache()
+            return cache
+
+    def remove(self, camera_id):
+        with self.lock:
+            self.caches.pop(camera_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.caches.clear()
+
+
+def get_hit_rate(counters):
+    """텔레메트리 카운터에서 크롭 캐시 적중률 (조회가 없으면 None)"""
+    hits = counters.get('crop_cache_hits', 0)
+    lookups = hits + counters.get('crop_cache_misses', 0)
+    return round(hits / lookups, 4) if lookups else None
+
+
+# 싱글톤 인스턴스
+crop_cache_registry = CropCacheRegistry()
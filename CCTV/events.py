@@ -0,0 +1,195 @@
+# CCTV/events.py
+"""
+탐지 이벤트 엔진 (중복 알림 제거 + 쿨다운)
+
+매 탐지 주기의 결과를 (카메라, 라벨, 트랙) 단위 이벤트로 바꾼다.
+- open   : 처음 보이는 트랙 → DetectionLog 1개 + 스크린샷 + (경고 라벨이면) 알림
+- update : 이미 열린 트랙 → DB 쓰기 없이 마지막 확인 시각/프레임 수만 갱신
+- close  : EVENT_CLOSE_SECONDS 동안 보이지 않으면 종료 → 로그에 last_seen_at/ended_at/frame_count 기록
+
+쿨다운: 같은 (카메라, 라벨)에서 이벤트가 열린 뒤 EVENT_COOLDOWN_SECONDS 안에 새 트랙이 나타나면
+새 로그/알림을 만들지 않고 기존 로그에 합친다 (트랙 ID 가 바뀌며 생기는 중복 알림 방지).
+"""
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+# 같은 (카메라, 라벨)에 새 로그/알림을 만들지 않는 시간 (초)
+EVENT_COOLDOWN_SECONDS = getattr(settings, 'CCTV_EVENT_COOLDOWN_SECONDS', 30)
+# 트랙이 이 시간 동안 보이지 않으면 이벤트 종료 (초)
+EVENT_CLOSE_SECONDS = getattr(settings, 'CCTV_EVENT_CLOSE_SECONDS', 10)
+
+
+class DetectionEvent:
+    """(카메라, 라벨, 트랙) 하나의 진행 중인 이벤트"""
+
+    def __init__(self, camera_id, label_id, track_id, now, log_id=None):
+        self.camera_id = camera_id
+        self.label_id = label_id
+        self.track_id = track_id
+        self.log_id = log_id
+        self.opened_at = now
+        self.last_seen = now
+        self.frame_count = 1
+        self.max_confidence = 0.0
+
+    def update(self, now, confidence):
+        self.last_seen = now
+        self.frame_count += 1
+        self.max_confidence = max(self.max_confidence, confidence)
+
+
+class EventEngine:
+    """카메라별 진행 중인 이벤트 관리"""
+
+    def __init__(self, cooldown=EVENT_COOLDOWN_SECONDS, close_after=EVENT_CLOSE_SECONDS):
+        self.cooldown = cooldown
+        self.close_after = close_after
+        self.lock = threading.Lock()
+        self.events = {}  # (camera_id, label_id, track_id) -> DetectionEvent
+        self.last_opened = {}  # (camera_id, label_id) -> (opened_at, log_id)
+        self.log_state = {}  # log_id -> {'open': 진행 중 이벤트 수, 'last_seen': .., 'frames': ..}
+
+    def update(self, camera_id, detections, now=None):
+        """
+        이번 주기의 탐지 결과 반영
+
+        Returns:
+            새 이벤트를 연 탐지 결과 리스트 (호출자가 로그/스크린샷/알림 생성 후 attach_log 호출)
+        """
+        now = now or time.time()
+        opened = []
+
+        with self.lock:
+            for detection in detections:
+                label_id = detection['label'].id
+                opens_event = False
+
+                for box in detection['boxes']:
+                    key = (camera_id, label_id, box.get('track_id'))
+                    event = self.events.get(key)
+                    if event is not None:
+                        event.update(now, box['confidence'])
+                        continue
+
+                    event = DetectionEvent(camera_id, label_id, key[2], now)
+                    event.max_confidence = box['confidence']
+                    self.events[key] = event
+
+                    recent = self.last_opened.get((camera_id, label_id))
+                    if recent and now - recent[0] < self.cooldown and recent[1] is not None:
+                        # 쿨다운 중 - 기존 로그에 합침
+                        self._attach(event, recent[1])
+                    else:
+                        opens_event = True
+
+                if opens_event:
+                    self.last_opened[(camera_id, label_id)] = (now, None)
+                    opened.append(detection)
+
+        return opened
+
+    def attach_log(self, camera_id, detection, log_id):
+        """새로 연 이벤트(들)에 생성된 DetectionLog 연결"""
+        label_id = detection['label'].id
+        with self.lock:
+            opened_at = self.last_opened.get((camera_id, label_id), (time.time(), None))[0]
+            self.last_opened[(camera_id, label_id)] = (opened_at, log_id)
+            for (event_camera, event_label, _), event in self.events.items():
+                if event_camera == camera_id and event_label == label_id and event.log_id is None:
+                    # 새 로그는 DB 기본값 frame_count=1 로 여는 프레임을 이미 셈
+                    self._attach(event, log_id, initial_frames=-1)
+
+    def _attach(self, event, log_id, initial_frames=0):
+        """
+        이벤트를 로그에 연결
+
+        state['frames'] 는 DB frame_count 에 더할 값이다. 종료 기록 후 쿨다운 안에 같은 로그에
+        다시 합쳐지면 state 를 새로 만들고 이전 기록에 이어서 더한다.
+        """
+        event.log_id = log_id
+        state = self.log_state.setdefault(
+            log_id, {'open': 0, 'last_seen': event.last_seen, 'frames': initial_frames}
+        )
+        state['open'] += 1
+
+    def close_expired(self, camera_id=None, now=None, force=False):
+        """
+        오래 보이지 않은 이벤트 종료
+
+        Args:
+            camera_id: 지정 시 해당 카메라만 (None 이면 전체)
+            force: True 면 시간과 관계없이 모두 종료 (탐지 중지 시)
+        Returns:
+            DB 에 종료를 기록한 로그 ID 리스트
+        """
+        now = now or time.time()
+        finished = {}
+
+        with self.lock:
+            for key, event in list(self.events.items()):
+                if camera_id is not None and key[0] != camera_id:
+                    continue
+                if not force and now - event.last_seen < self.close_after:
+                    continue
+
+                del self.events[key]
+                if event.log_id is None:
+                    continue
+
+                state = self.log_state.get(event.log_id)
+                if state is None:
+                    continue
+                state['open'] -= 1
+                state['last_seen'] = max(state['last_seen'], event.last_seen)
+                state['frames'] += event.frame_count
+                if state['open'] <= 0:
+                    finished[event.log_id] = self.log_state.pop(event.log_id)
+
+            if force and camera_id is not None:
+                for label_key in [k for k in self.last_opened if k[0] == camera_id]:
+                    del self.last_opened[label_key]
+
+        if finished:
+            self._write_closed(finished, now)
+        return list(finished)
+
+    def _write_closed(self, finished, now):
+        from .models import DetectionLog
+
+        for log_id, state in finished.items():
+            DetectionLog.objects.filter(id=log_id).update(
+                last_seen_at=_to_datetime(state['last_seen']),
+                ended_at=_to_datetime(now),
+                frame_count=F('frame_count') + state['frames'],
+            )
+
+    def get_open_events(self, camera_id=None):
+        with self.lock:
+            return [
+                {
+                    'camera_id': event.camera_id,
+                    'label_id': event.label_id,
+                    'track_id': event.track_id,
+                    'log_id': event.log_id,
+                    'opened_at': event.opened_at,
+                    'last_seen': event.last_seen,
+                    'frame_count': event.frame_count,
+                    'max_confidence': event.max_confidence,
+                }
+                for event in self.events.values()
+                if camera_id is None or event.camera_id == camera_id
+            ]
+
+
+def _to_datetime(timestamp):
+    value = datetime.fromtimestamp(timestamp, tz=dt_timezone.utc)
+    return value if settings.USE_TZ else timezone.make_naive(value)
+
+
+# 싱글톤 인스턴스
+event_engine = EventEngine()
@@ -0,0 +1,174 @@
+# CCTV/export.py
+"""
+DetectionLog 대량 내보내기 (CSV / Parquet)
+
+응답/파일을 EXPORT_CHUNK_SIZE 행씩 만들어 바로 내보내므로 1년치 로그도 청크 하나 분량의 메모리만 쓴다.
+청크는 id 키셋 조회(id > 마지막 id)로 따로 읽는다. 하나의 커서를 다운로드 내내 열어 두면
+SQLite 에서는 읽기 잠금이 유지되어 탐지 스레드의 로그 INSERT 가 막히기 때문이다.
+
+Parquet 는 pyarrow 가 설치된 경우에만 사용할 수 있다 (청크마다 row group 하나).
+"""
+import csv
+import importlib.util
+import io
+from datetime import datetime, time as dt_time, timedelta
+
+from django.utils import timezone
+
+FORMAT_CSV = 'csv'
+FORMAT_PARQUET = 'parquet'
+FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+CONTENT_TYPES = {
+    FORMAT_CSV: 'text/csv; charset=utf-8',
+    FORMAT_PARQUET: 'application/vnd.apache.parquet',
+}
+
+# 한 번에 읽어서 내보낼 로그 수
+EXPORT_CHUNK_SIZE = 5000
+
+# (열 이름, DetectionLog 필드)
+EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('detected_at', 'detected_at'),
+    ('ended_at', 'ended_at'),
+    ('camera_id', 'camera_id'),
+    ('camera_name', 'camera_name'),
+    ('camera_location', 'camera_location'),
+    ('label', 'detected_object'),
+    ('object_count', 'object_count'),
+    ('confidence', 'confidence'),
+    ('has_alert', 'has_alert'),
+    ('frame_count', 'frame_count'),
+    ('screenshot_path', 'screenshot_path'),
+    ('clip_path', 'clip_path'),
+]
+
+
+def parquet_available():
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def parse_date(value):
+    """'YYYY-MM-DD' → date (없으면 None, 형식이 잘못되면 ValueError)"""
+    return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+
+
+def filter_logs(start=None, end=None, camera_id=None, label=None, alert_only=False):
+    """내보낼 로그 queryset - start/end 는 현재 시간대 날짜 (end 포함)"""
+    from .models import DetectionLog
+
+    logs = DetectionLog.objects.all()
+    if start:
+        logs = logs.filter(detected_at__gte=timezone.make_aware(datetime.combine(start, dt_time.min)))
+    if end:
+        logs = logs.filter(detected_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), dt_time.min)))
+    if camera_id:
+        logs = logs.filter(camera_id=camera_id)
+    if label:
+        logs = logs.filter(detected_object=label)
+    if alert_only:
+        logs = logs.filter(has_alert=True)
+    return logs
+
+
+def iter_row_chunks(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """EXPORT_COLUMNS 순서의 행 tuple 목록을 chunk_size 개씩 (id 순)"""
+    fields = [field for _, field in EXPORT_COLUMNS]
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).order_by('id').values_list(*fields)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def iter_csv(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """CSV 바이트 청크 (UTF-8 BOM 포함 - Excel 한글 호환)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for chunk in iter_row_chunks(queryset, chunk_size):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row] for row in chunk
+        )
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow 가 쓰는 바이트를 모아 두었다가 꺼내 가는 출력 스트림"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ('id', pa.int64()),
+        ('detected_at', pa.timestamp('us', tz='UTC')),
+        ('ended_at', pa.timestamp('us', tz='UTC')),
+        ('camera_id', pa.int64()),
+        ('camera_name', pa.string()),
+        ('camera_location', pa.string()),
+        ('label', pa.string()),
+        ('object_count', pa.int32()),
+        ('confidence', pa.float32()),
+        ('has_alert', pa.bool_()),
+        ('frame_count', pa.int32()),
+        ('screenshot_path', pa.string()),
+        ('clip_path', pa.string()),
+    ])
+
+
+def iter_parquet(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Parquet 바이트 청크 (청크마다 row group 하나, 파일 footer 는 마지막에)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression='zstd') as writer:
+        for chunk in iter_row_chunks(queryset, chunk_size):
+            writer.write_table(pa.Table.from_pylist(
+                [dict(zip(schema.names, row)) for row in chunk], schema=schema
+            ))
+            yield sink.drain()
+    yield sink.drain()
+
+
+def iter_export(queryset, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    if export_format == FORMAT_PARQUET:
+        return iter_parquet(queryset, chunk_size)
+    return iter_csv(queryset, chunk_size)
+
+
+def get_export_filename(export_format):
+    return f"detection_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
@@ -0,0 +1,507 @@
+# CCTV/live_output.py
+"""
+RTSP H.264 스트림을 디코딩 없이 fMP4 조각으로 remux 하여
+메모리 링 버퍼에 보관하고 HLS(fMP4) 로 제공하는 모듈.
+
+- ffmpeg 서브프로세스가 `-c copy` 로 RTSP → fragmented MP4 변환 (재인코딩 없음)
+- stdout 으로 나오는 MP4 박스를 파싱해서 init segment(ftyp+moov)와
+  fragment(moof+mdat)로 분리
+- AI 탐지용 디코딩(CameraStreamer)은 기존대로 별도로 동작
+"""
+import logging
+import math
+import shutil
+import struct
+import subprocess
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# HLS 링 버퍼에 유지할 최대 조각 수
+HLS_SEGMENT_RING_SIZE = 10
+# 플레이리스트에 노출할 최근 조각 수
+HLS_PLAYLIST_SIZE = 5
+# 시청자(플레이리스트/조각 요청)가 없을 때 remux 프로세스를 종료하기까지의 시간 (초)
+HLS_IDLE_TIMEOUT = 30
+# 첫 조각이 나올 때까지 플레이리스트 요청이 대기하는 최대 시간 (초)
+HLS_FIRST_SEGMENT_TIMEOUT = 10
+# 링 버퍼 최대 조각 수 (녹화용 장시간 버퍼의 메모리 상한)
+MAX_RING_FRAGMENTS = 600
+
+FFMPEG_BINARY = shutil.which('ffmpeg') or 'ffmpeg'
+
+
+def _iter_boxes(data, offset=0, end=None):
+    """MP4 박스 목록 순회 - (type, payload_start, box_end) 반환"""
+    end = len(data) if end is None else end
+    while offset + 8 <= end:
+        size, box_type = struct.unpack('>I4s', data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            size = struct.unpack('>Q', data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            break
+        yield box_type, offset + header, offset + size
+        offset += size
+
+
+def _find_box(data, path, offset=0, end=None):
+    """중첩 박스 경로(예: [b'moov', b'trak', b'mdia', b'mdhd'])의 payload 범위 반환"""
+    for box_type, start, box_end in _iter_boxes(data, offset, end):
+        if box_type == path[0]:
+            if len(path) == 1:
+                return start, box_end
+            return _find_box(data, path[1:], start, box_end)
+    return None
+
+
+def parse_timescale(init_segment):
+    """init segment(moov/trak/mdia/mdhd)에서 비디오 타임스케일 추출"""
+    found = _find_box(init_segment, [b'moov', b'trak', b'mdia', b'mdhd'])
+    if not found:
+        return None
+    start, _ = found
+    version = init_segment[start]
+    if version == 1:
+        # version(1) + flags(3) + creation(8) + modification(8)
+        return struct.unpack('>I', init_segment[start + 20:start + 24])[0]
+    # version(1) + flags(3) + creation(4) + modification(4)
+    return struct.unpack('>I', init_segment[start + 12:start + 16])[0]
+
+
+def parse_fragment_timing(moof):
+    """moof 박스에서 (baseMediaDecodeTime, 조각 전체 길이[타임스케일 단위]) 추출"""
+    traf = _find_box(moof, [b'moof', b'traf'])
+    if not traf:
+        return None, None
+    traf_start, traf_end = traf
+
+    base_time = None
+    default_duration = 0
+    total_duration = 0
+
+    for box_type, start, box_end in _iter_boxes(moof, traf_start, traf_end):
+        if box_type == b'tfdt':
+            version = moof[start]
+            if version == 1:
+                base_time = struct.unpack('>Q', moof[start + 4:start + 12])[0]
+            else:
+                base_time = struct.unpack('>I', moof[start + 4:start + 8])[0]
+        elif box_type == b'tfhd':
+            flags = int.from_bytes(moof[start + 1:start + 4], 'big')
+            pos = start + 8  # version/flags + track_ID
+            if flags & 0x01:
+                pos += 8  # base_data_offset
+            if flags & 0x02:
+                pos += 4  # sample_description_index
+            if flags & 0x08:
+                default_duration = struct.unpack('>I', moof[pos:pos + 4])[0]
+        elif box_type == b'trun':
+            flags = int.from_bytes(moof[start + 1:start + 4], 'big')
+            sample_count = struct.unpack('>I', moof[start + 4:start + 8])[0]
+            pos = start + 8
+            if flags & 0x01:
+                pos += 4  # data_offset
+            if flags & 0x04:
+                pos += 4  # first_sample_flags
+            fields = [(0x100, 'duration'), (0x200, 'size'), (0x400, 'flags'), (0x800, 'cto')]
+            sample_size = sum(4 for flag, _ in fields if flags & flag)
+            if flags & 0x100:
+                for i in range(sample_count):
+                    sample_pos = pos + i * sample_size
+                    total_duration += struct.unpack('>I', moof[sample_pos:sample_pos + 4])[0]
+            else:
+                total_duration += default_duration * sample_count
+
+    return base_time, total_duration
+
+
+class FragmentedMP4Remuxer:
+    """카메라 1대의 RTSP → fMP4 remux 프로세스와 조각 링 버퍼"""
+
+    def __init__(self, rtsp_url, ring_size=HLS_SEGMENT_RING_SIZE, ring_seconds=0):
+        self.rtsp_url = rtsp_url
+        self.ring_size = ring_size
+        self.ring_seconds = ring_seconds  # 최소 보관 시간 (이벤트 녹화용 pre-event 버퍼)
+        self.pinned = False  # True면 시청자가 없어도 유지 (이벤트 녹화)
+        self.init_segment = None
+        self.timescale = None
+        self.fragments = deque(maxlen=MAX_RING_FRAGMENTS)
+        self.buffered_seconds = 0.0
+        self.next_sequence = 0
+        self.condition = threading.Condition()
+        self.process = None
+        self.reader_thread = None
+        self.running = False
+        self.last_access = time.time()
+        self.started_at = None
+        self.bytes_received = 0
+
+    def build_command(self):
+        """ffmpeg 명령어 구성 (비디오 트랙 copy, 키프레임마다 조각 생성)"""
+        command = [FFMPEG_BINARY, '-hide_banner', '-loglevel', 'error', '-nostdin']
+        if self.rtsp_url.startswith('rtsp://'):
+            command += ['-rtsp_transport', 'tcp']
+        command += [
+            '-fflags', 'nobuffer',
+            '-i', self.rtsp_url,
+            '-map', '0:v:0',
+            '-c:v', 'copy',
+            '-an',
+            '-f', 'mp4',
+            '-movflags', '+frag_keyframe+empty_moov+default_base_moof',
+            'pipe:1',
+        ]
+        return command
+
+    def start(self):
+        """remux 프로세스 및 리더 스레드 시작"""
+        with self.condition:
+            if self.running:
+                return True
+            try:
+                self.process = subprocess.Popen(
+                    self.build_command(),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    bufsize=0,
+                )
+            except (OSError, ValueError) as e:
+                logger.error("fMP4 remux 프로세스 시작 실패: %s", e)
+                self.process = None
+                return False
+
+            self.running = True
+            self.started_at = time.time()
+            self.last_access = time.time()
+            self.reader_thread = threading.Thread(
+                target=self._reader_loop,
+                daemon=True,
+                name=f"Remuxer-{self.rtsp_url.split('/')[-1][:10]}"
+            )
+            self.reader_thread.start()
+            logger.info("fMP4 remux 시작: %s", self.rtsp_url)
+            return True
+
+    def stop(self):
+        """remux 프로세스 종료"""
+        with self.condition:
+            self.running = False
+            process = self.process
+            self.process = None
+            self.condition.notify_all()
+
+        if process:
+            try:
+                process.terminate()
+                process.wait(timeout=3)
+            except Exception:
+                try:
+                    process.kill()
+                except Exception:
+                    pass
+        logger.info("fMP4 remux 종료: %s", self.rtsp_url)
+
+    def is_alive(self):
+        return self.running and self.process is not None and self.process.poll() is None
+
+    def touch(self):
+        self.last_access = time.time()
+
+    def _read_exact(self, stream, size):
+        """파이프에서 정확히 size 바이트 읽기 (EOF면 None)"""
+        chunks = []
+        remaining = size
+        while remaining > 0:
+            chunk = stream.read(remaining)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b''.join(chunks)
+
+    def _read_box(self, stream):
+        header = self._read_exact(stream, 8)
+        if header is None:
+            return None, None
+        size, box_type = struct.unpack('>I4s', header)
+        if size == 1:
+            large = self._read_exact(stream, 8)
+            if large is None:
+                return None, None
+            size = struct.unpack('>Q', large)[0]
+            header += large
+        if size < len(header):
+            return None, None
+        body = self._read_exact(stream, size - len(header))
+        if body is None:
+            return None, None
+        self.bytes_received += size
+        return box_type, header + body
+
+    def _reader_loop(self):
+        """ffmpeg stdout 에서 MP4 박스를 읽어 init/조각으로 분리"""
+        process = self.process
+        if process is None:
+            return
+        stream = process.stdout
+        init_parts = []
+        pending_moof = None
+        last_wallclock = time.time()
+
+        try:
+            while self.running:
+                box_type, box = self._read_box(stream)
+                if box is None:
+                    break
+
+                if box_type in (b'ftyp', b'moov'):
+                    init_parts.append(box)
+                    if box_type == b'moov':
+                        init_segment = b''.join(init_parts)
+                        init_parts = []
+                        with self.condition:
+                            self.init_segment = init_segment
+                            self.timescale = parse_timescale(init_segment)
+                            self.fragments.clear()
+                            self.buffered_seconds = 0.0
+                            self.condition.notify_all()
+                elif box_type == b'moof':
+                    pending_moof = box
+                elif box_type == b'mdat' and pending_moof is not None:
+                    now = time.time()
+                    base_time, duration_units = parse_fragment_timing(pending_moof)
+                    if self.timescale and duration_units:
+                        duration = duration_units / self.timescale
+                    else:
+                        duration = now - last_wallclock
+                    last_wallclock = now
+
+                    with self.condition:
+                        fragment = {
+                            'sequence': self.next_sequence,
+                            'data': pending_moof + box,
+                            'duration': max(duration, 0.001),
+                            'base_time': base_time,
+                            'received_at': now,
+                        }
+                        self.next_sequence += 1
+                        if len(self.fragments) == self.fragments.maxlen:
+                            self.buffered_seconds -= self.fragments[0]['duration']
+                        self.fragments.append(fragment)
+                        self.buffered_seconds += fragment['duration']
+                        self._prune_fragments()
+                        self.condition.notify_all()
+                    pending_moof = None
+                # styp/sidx/mfra 등 나머지 박스는 무시
+        except Exception as e:
+            logger.warning("fMP4 remux 리더 오류: %s", e)
+        finally:
+            with self.condition:
+                self.running = False
+                self.condition.notify_all()
+            try:
+                if process.poll() is None:
+                    process.kill()
+            except Exception:
+                pass
+
+    def _prune_fragments(self):
+        """조각 수(ring_size)와 보관 시간(ring_seconds)을 모두 만족하는 범위에서 오래된 조각 제거"""
+        while len(self.fragments) > self.ring_size:
+            oldest = self.fragments[0]
+            if self.buffered_seconds - oldest['duration'] < self.ring_seconds:
+                break
+            self.fragments.popleft()
+            self.buffered_seconds -= oldest['duration']
+
+    def set_ring_seconds(self, ring_seconds):
+        with self.condition:
+            self.ring_seconds = ring_seconds
+            self._prune_fragments()
+
+    def get_fragments_between(self, start_time, end_time):
+        """벽시계 기준 [start_time, end_time] 구간과 겹치는 조각들 반환 (init segment 포함)"""
+        with self.condition:
+            init_segment = self.init_segment
+            selected = [
+                fragment for fragment in self.fragments
+                if fragment['received_at'] >= start_time
+                and fragment['received_at'] - fragment['duration'] <= end_time
+            ]
+        return init_segment, selected
+
+    def wait_for_fragments(self, count=1, timeout=HLS_FIRST_SEGMENT_TIMEOUT):
+        """init segment 와 최소 count 개의 조각이 준비될 때까지 대기"""
+        deadline = time.time() + timeout
+        with self.condition:
+            while self.init_segment is None or len(self.fragments) < count:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self.running:
+                    return False
+                self.condition.wait(remaining)
+            return True
+
+    def get_fragment(self, sequence):
+        with self.condition:
+            for fragment in self.fragments:
+                if fragment['sequence'] == sequence:
+                    return fragment['data']
+        return None
+
+    def build_playlist(self, playlist_size=HLS_PLAYLIST_SIZE):
+        """fMP4 기반 HLS 미디어 플레이리스트 생성"""
+        with self.condition:
+            fragments = list(self.fragments)[-playlist_size:]
+
+        if not fragments:
+            return None
+
+        target_duration = max(1, math.ceil(max(f['duration'] for f in fragments)))
+        lines = [
+            '#EXTM3U',
+            '#EXT-X-VERSION:7',
+            f'#EXT-X-TARGETDURATION:{target_duration}',
+            f"#EXT-X-MEDIA-SEQUENCE:{fragments[0]['sequence']}",
+            '#EXT-X-INDEPENDENT-SEGMENTS',
+            '#EXT-X-MAP:URI="init.mp4"',
+        ]
+        for fragment in fragments:
+            lines.append(f"#EXTINF:{fragment['duration']:.3f},")
+            lines.append(f"{fragment['sequence']}.m4s")
+        return '\n'.join(lines) + '\n'
+
+    def get_status(self):
+        with self.condition:
+            return {
+                'running': self.is_alive(),
+                'has_init_segment': self.init_segment is not None,
+                'fragment_count': len(self.fragments),
+                'buffered_seconds': round(self.buffered_seconds, 1),
+                'pinned': self.pinned,
+                'next_sequence': self.next_sequence,
+                'bytes_received': self.bytes_received,
+                'idle_seconds': round(time.time() - self.last_access, 1),
+            }
+
+
+class LiveOutputManager:
+    """카메라별 remux 프로세스 관리 - 요청 시 시작, 유휴 시 자동 종료 (pin 된 카메라는 상시 유지)"""
+
+    def __init__(self):
+        self.remuxers = {}
+        self.pinned = {}  # rtsp_url -> ring_seconds (이벤트 녹화용 상시 remux)
+        self.lock = threading.Lock()
+        self.reaper_thread = None
+
+    def is_available(self):
+        """ffmpeg 바이너리 사용 가능 여부"""
+        return shutil.which(FFMPEG_BINARY) is not None
+
+    def get_remuxer(self, rtsp_url, start=True):
+        """카메라 remuxer 반환 (필요하면 시작)"""
+        with self.lock:
+            remuxer = self.remuxers.get(rtsp_url)
+            if remuxer is None or (start and not remuxer.is_alive()):
+                if not start:
+                    return remuxer
+                if remuxer is not None:
+                    remuxer.stop()
+                remuxer = self._create_remuxer(rtsp_url)
+                if remuxer is None:
+                    return None
+            remuxer.touch()
+            self._ensure_reaper()
+            return remuxer
+
+    def _create_remuxer(self, rtsp_url):
+        """remuxer 생성 및 시작 (self.lock 보유 상태에서 호출)"""
+        remuxer = FragmentedMP4Remuxer(rtsp_url, ring_seconds=self.pinned.get(rtsp_url, 0))
+        remuxer.pinned = rtsp_url in self.pinned
+        self.remuxers[rtsp_url] = remuxer
+        if not remuxer.start():
+            del self.remuxers[rtsp_url]
+            return None
+        return remuxer
+
+    def pin(self, rtsp_url, ring_seconds):
+        """시청자가 없어도 remux 를 유지하고 ring_seconds 만큼 조각 보관"""
+        with self.lock:
+            self.pinned[rtsp_url] = ring_seconds
+            remuxer = self.remuxers.get(rtsp_url)
+            if remuxer is not None and remuxer.is_alive():
+                remuxer.pinned = True
+                remuxer.set_ring_seconds(ring_seconds)
+            else:
+                if remuxer is not None:
+                    remuxer.stop()
+                remuxer = self._create_remuxer(rtsp_url)
+            self._ensure_reaper()
+            return remuxer
+
+    def unpin(self, rtsp_url):
+        """상시 유지 해제 - 이후 유휴 타임아웃에 따라 정리됨"""
+        with self.lock:
+            self.pinned.pop(rtsp_url, None)
+            remuxer = self.remuxers.get(rtsp_url)
+            if remuxer is not None:
+                remuxer.pinned = False
+                remuxer.set_ring_seconds(0)
+                remuxer.touch()
+
+    def stop(self, rtsp_url):
+        with self.lock:
+            remuxer = self.remuxers.pop(rtsp_url, None)
+        if remuxer:
+            remuxer.stop()
+
+    def stop_all(self):
+        with self.lock:
+            remuxers = list(self.remuxers.values())
+            self.remuxers.clear()
+            self.pinned.clear()
+        for remuxer in remuxers:
+            remuxer.stop()
+
+    def get_status(self, rtsp_url):
+        remuxer = self.remuxers.get(rtsp_url)
+        return remuxer.get_status() if remuxer else None
+
+    def _ensure_reaper(self):
+        if self.reaper_thread is None or not self.reaper_thread.is_alive():
+            self.reaper_thread = threading.Thread(
+                target=self._reaper_loop,
+                daemon=True,
+                name="RemuxerReaper"
+            )
+            self.reaper_thread.start()
+
+    def _reaper_loop(self):
+        """유휴 상태 remuxer 정리 및 pin 된 remuxer 재연결"""
+        while True:
+            time.sleep(5)
+            now = time.time()
+            with self.lock:
+                idle_urls = [
+                    url for url, remuxer in self.remuxers.items()
+                    if not remuxer.is_alive()
+                    or (not remuxer.pinned and now - remuxer.last_access > HLS_IDLE_TIMEOUT)
+                ]
+                idle = [self.remuxers.pop(url) for url in idle_urls]
+            for remuxer in idle:
+                remuxer.stop()
+
+            # 연결이 끊긴 녹화 대상 카메라는 다시 시작
+            with self.lock:
+                for url in list(self.pinned.keys()):
+                    if url not in self.remuxers:
+                        self._create_remuxer(url)
+
+
+# 싱글톤 인스턴스
+live_output_manager = LiveOutputManager()
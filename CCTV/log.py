@@ -0,0 +1,123 @@
+# CCTV/log.py
+"""
+CCTV 로깅 유틸리티
+
+- NonBlockingQueueHandler : 로그 레코드를 큐에만 넣고 즉시 반환, 실제 출력은 QueueListener 스레드가 담당
+  (탐지/프레임 스레드가 터미널 I/O 에서 막히지 않도록)
+- RateLimitFilter : 같은 위치에서 완전히 같은 메시지(인자 포함)가 interval 안에 반복되면 생략하고 생략 횟수만 기록
+- StructuredFormatter : extra 로 넘긴 필드를 key=value 형태로 덧붙임
+
+설정은 config/settings.py 의 LOGGING 에서 모듈별 레벨과 함께 지정한다.
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+import time
+
+# LogRecord 기본 속성 (StructuredFormatter 가 extra 필드를 구분하는 데 사용)
+_RESERVED_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class StructuredFormatter(logging.Formatter):
+    """기본 포맷 뒤에 extra 필드를 key=value 로 덧붙이는 포매터"""
+
+    def format(self, record):
+        message = super().format(record)
+        extras = [
+            f"{key}={value}"
+            for key, value in record.__dict__.items()
+            if key not in _RESERVED_ATTRS and not key.startswith('_')
+        ]
+        if extras:
+            message = f"{message} | {' '.join(extras)}"
+        return message
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    반복 메시지 억제 필터
+
+    (로거, 레벨, 소스 위치, 인자를 채운 메시지)가 같은 레코드는 interval 초에 한 번만 통과시키고,
+    다음에 통과하는 레코드에 그동안 생략된 횟수를 suppressed 필드로 붙인다.
+    템플릿이 같아도 인자가 다르면 (예: 카메라별 연결/경고 로그) 별개의 메시지로 본다.
+    """
+
+    def __init__(self, interval=10.0, max_keys=2048):
+        super().__init__()
+        self.interval = float(interval)
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> [last_emit_time, suppressed_count]
+
+    def filter(self, record):
+        if record.levelno >= logging.ERROR and record.exc_info:
+            # 예외 트레이스백은 항상 출력
+            return True
+
+        try:
+            message = record.getMessage()
+        except Exception:
+            message = f"{record.msg}{record.args}"
+        key = (record.name, record.levelno, record.pathname, record.lineno, message)
+        now = time.monotonic()
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] < self.interval:
+                entry[1] += 1
+                return False
+
+            suppressed = entry[1] if entry is not None else 0
+            if len(self.entries) >= self.max_keys:
+                self.entries.clear()
+            self.entries[key] = [now, 0]
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    큐 기반 비동기 로그 핸들러
+
+    호출 스레드는 큐에 put_nowait 만 하고, 출력(stream write)은 QueueListener 스레드에서 수행한다.
+    큐가 가득 차면 레코드를 버리고 개수만 센다 (호출 스레드를 절대 막지 않음).
+    """
+
+    def __init__(self, queue_size=10000, stream=None):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.dropped = 0
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target, respect_handler_level=False)
+        self.listener.start()
+        atexit.register(self.stop_listener)
+
+    def setFormatter(self, fmt):
+        # 포맷은 출력 스레드에서 적용
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """메시지 인자만 미리 합치고 나머지 속성(extra 포함)은 유지"""
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def stop_listener(self):
+        try:
+            self.listener.stop()
+        except Exception:
+            pass
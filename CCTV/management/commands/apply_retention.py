@@ -0,0 +1,32 @@
+# CCTV/management/commands/apply_retention.py
+"""
+탐지 로그/스크린샷 보관 정책 실행 (CCTV/retention.py)
+
+    python manage.py apply_retention
+    python manage.py apply_retention --dry-run
+    python manage.py apply_retention --no-archive
+"""
+from django.core.management.base import BaseCommand
+
+from CCTV.retention import RETENTION_BATCH_SIZE, apply_retention
+
+
+class Command(BaseCommand):
+    help = "보관 기간이 지난 탐지 로그/스크린샷 삭제 및 오래된 날짜 폴더 tar 압축"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RETENTION_BATCH_SIZE, help="한 트랜잭션에서 지울 로그 수")
+        parser.add_argument('--dry-run', action='store_true', help="변경 없이 대상 건수만 출력")
+        parser.add_argument('--no-archive', action='store_true', help="날짜 폴더 압축 건너뛰기")
+
+    def handle(self, *args, **options):
+        stats = apply_retention(
+            batch_size=options['batch_size'], dry_run=options['dry_run'], archive=not options['no_archive']
+        )
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        policies = ", ".join(f"{name} {count}건" for name, count in stats['policies'].items())
+        self.stdout.write(
+            f"{prefix}로그 {stats['deleted_logs']}건 삭제 ({policies}), 파일 {stats['deleted_files']}개 삭제, "
+            f"날짜 {stats['purged_days']}개 만료, 날짜 {stats['archived_days']}개 압축 "
+            f"(파일 {stats['archived_files']}개, {stats['seconds']}초)"
+        )
@@ -0,0 +1,171 @@
+# CCTV/management/commands/benchmark_pipeline.py
+"""
+파일 재생 카메라 N대로 수집 → 탐지 → 로그 저장 파이프라인 벤치마크
+
+    python manage.py benchmark_pipeline --source clip_images --cameras 8 --duration 60
+    python manage.py benchmark_pipeline --source /data/lobby.mp4 --cameras 16 --speed realtime --json
+
+벤치마크 카메라(이름 "benchmark-N")와 타겟 라벨을 DB 에 만들고 종료 시 삭제한다 (--keep 이면 유지).
+runserver 가 같은 DB 를 보고 있으면 카메라 모니터가 벤치마크 카메라를 가져가므로 단독으로 실행할 것.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+BENCHMARK_CAMERA_PREFIX = 'benchmark-'
+
+
+def _current_rss_mb():
+    """현재 RSS (MB) - /proc 이 없으면 최대 RSS (Windows 는 psutil)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        # Linux 는 KB, macOS 는 바이트 단위
+        divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+    except ImportError:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+class Command(BaseCommand):
+    help = "파일 재생 카메라로 수집/탐지/로그 파이프라인 처리량, 단계별 지연, 메모리 측정"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', required=True, help="동영상 파일 또는 이미지 디렉토리 경로")
+        parser.add_argument('--cameras', type=int, default=4, help="시뮬레이션 카메라 수")
+        parser.add_argument('--duration', type=float, default=60.0, help="측정 시간 (초)")
+        parser.add_argument('--speed', choices=['realtime', 'max'], default='max', help="재생 속도")
+        parser.add_argument('--fps', type=float, default=None, help="재생 FPS (기본: 파일 FPS / 이미지 10)")
+        parser.add_argument('--label', default='person', help="타겟 라벨 객체 탐지 토큰")
+        parser.add_argument('--interval', type=float, default=0.0, help="탐지 주기 사이 대기 (초, 기본 0)")
+        parser.add_argument('--warmup', type=float, default=120.0, help="모델 로드 대기 최대 시간 (초)")
+        parser.add_argument('--keep', action='store_true', help="벤치마크 카메라/로그를 삭제하지 않음")
+        parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+
+    def handle(self, *args, **options):
+        from CCTV.models import Camera, DetectionLog, TargetLabel
+        from CCTV.telemetry import pipeline_telemetry
+        from CCTV.utils import ai_detection_system, camera_streamer
+
+        source = os.path.abspath(options['source'])
+        if not os.path.exists(source):
+            raise CommandError(f"소스를 찾을 수 없습니다: {source}")
+        if options['cameras'] < 1:
+            raise CommandError("--cameras 는 1 이상이어야 합니다")
+
+        self.stderr.write("AI 모델 로드 중...")
+        if not ai_detection_system.wait_until_ready(timeout=options['warmup']):
+            raise CommandError(f"AI 모델 로드 실패: {ai_detection_system.get_model_status()['error']}")
+        ai_detection_system.detection_interval = options['interval']
+
+        cameras = []
+        for index in range(options['cameras']):
+            query = {'speed': options['speed'], 'cam': index}
+            if options['fps']:
+                query['fps'] = options['fps']
+            camera = Camera.objects.create(
+                name=f"{BENCHMARK_CAMERA_PREFIX}{index}",
+                location='benchmark',
+                # 드라이브 문자, 공백, '?' 가 들어간 경로도 깨지지 않도록 퍼센트 인코딩된 file:// URI 사용
+                rtsp_url=f"{Path(source).as_uri()}?{urlencode(query)}",
+            )
+            TargetLabel.objects.create(camera=camera, display_name=options['label'], label_name=options['label'])
+            cameras.append(camera)
+        keys = [camera.rtsp_url for camera in cameras]
+
+        rss_start = _current_rss_mb()
+        rss_peak = rss_start
+        threads_start = threading.active_count()
+        threads_peak = threads_start
+
+        try:
+            for camera in cameras:
+                pipeline_telemetry.remove(camera.rtsp_url)
+                camera_streamer.start_background_streaming(camera.rtsp_url)
+                ai_detection_system.start_detection_for_camera(camera)
+
+            self.stderr.write(f"카메라 {len(cameras)}대 측정 중 ({options['duration']:.0f}초)...")
+            started = time.time()
+            while time.time() - started < options['duration']:
+                time.sleep(1.0)
+                rss_peak = max(rss_peak, _current_rss_mb())
+                threads_peak = max(threads_peak, threading.active_count())
+            elapsed = time.time() - started
+
+            metrics = pipeline_telemetry.aggregate(keys)
+            log_count = DetectionLog.objects.filter(camera__in=cameras).count()
+        finally:
+            # cleanup_camera 는 리더 스레드를 기다린 뒤 캡처를 해제한다. 늦게 끝나는 리더도 명령 종료 전에 기다림
+            readers = [camera_streamer.reader_threads.get(camera.rtsp_url) for camera in cameras]
+            for camera in cameras:
+                ai_detection_system.stop_detection_for_camera(camera.id)
+                camera_streamer.stop_background_streaming(camera.rtsp_url)
+                camera_streamer.cleanup_camera(camera.rtsp_url)
+            for reader in readers:
+                if reader is not None:
+                    reader.join(timeout=10.0)
+            if not options['keep']:
+                Camera.objects.filter(id__in=[camera.id for camera in cameras]).delete()
+
+        counters = metrics['counters']
+        result = {
+            'source': source,
+            'cameras': len(cameras),
+            'speed': options['speed'],
+            'duration_seconds': round(elapsed, 1),
+            'throughput': {
+                'frames_captured_per_sec': round(counters.get('frames_captured', 0) / elapsed, 2),
+                'detection_cycles_per_sec': round(counters.get('detection_cycles', 0) / elapsed, 2),
+                'frames_dropped': counters.get('frames_dropped', 0),
+                'detection_logs': log_count,
+            },
+            'stages': {
+                stage: {key: histogram[key] for key in ('count', 'avg', 'p50', 'p95', 'max')}
+                for stage, histogram in metrics['stages'].items()
+            },
+            'memory_mb': {
+                'rss_start': round(rss_start, 1),
+                'rss_peak': round(rss_peak, 1),
+                'rss_growth': round(rss_peak - rss_start, 1),
+            },
+            'threads': {'start': threads_start, 'peak': threads_peak},
+            'counters': counters,
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(result, ensure_ascii=False, indent=2))
+            return
+
+        throughput = result['throughput']
+        self.stdout.write(f"소스: {source} ({options['speed']}), 카메라 {len(cameras)}대, {elapsed:.1f}초")
+        self.stdout.write(
+            f"처리량: 수집 {throughput['frames_captured_per_sec']} fps, "
+            f"탐지 {throughput['detection_cycles_per_sec']} 회/초, "
+            f"드롭 {throughput['frames_dropped']}, 로그 {log_count}건"
+        )
+        self.stdout.write(f"{'단계':<18}{'count':>8}{'avg(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'max(ms)':>10}")
+        for stage, histogram in result['stages'].items():
+            self.stdout.write(
+                f"{stage:<18}{histogram['count']:>8}"
+                + ''.join(f"{histogram[key] * 1000:>10.1f}" for key in ('avg', 'p50', 'p95', 'max'))
+            )
+        memory = result['memory_mb']
+        self.stdout.write(
+            f"메모리: 시작 {memory['rss_start']}MB, 최대 {memory['rss_peak']}MB (+{memory['rss_growth']}MB), "
+            f"스레드 {threads_start} → 최대 {threads_peak}"
+        )
+        if not options['keep']:
+            self.stdout.write("벤치마크 카메라/로그 삭제 완료 (스크린샷 파일은 MEDIA_ROOT 에 남음)")
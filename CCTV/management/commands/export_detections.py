@@ -0,0 +1,49 @@
+# CCTV/management/commands/export_detections.py
+"""
+탐지 로그를 CSV / Parquet 파일로 내보내기 (CCTV/export.py, 청크 단위로 써서 메모리 사용량 일정)
+
+    python manage.py export_detections -o detections_2025.csv --start 2025-01-01 --end 2025-12-31
+    python manage.py export_detections -o alerts.parquet --format parquet --alert-only --camera 3
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from CCTV.export import (
+    EXPORT_CHUNK_SIZE, FORMAT_PARQUET, FORMATS, filter_logs, iter_export, parquet_available, parse_date,
+)
+
+
+class Command(BaseCommand):
+    help = "탐지 로그를 날짜/카메라/라벨 조건으로 CSV 또는 Parquet 파일에 내보내기"
+
+    def add_arguments(self, parser):
+        parser.add_argument('-o', '--output', required=True, help="출력 파일 경로")
+        parser.add_argument('--format', choices=FORMATS, help="출력 형식 (기본: 출력 파일 확장자, 없으면 csv)")
+        parser.add_argument('--start', help="시작 날짜 YYYY-MM-DD")
+        parser.add_argument('--end', help="종료 날짜 YYYY-MM-DD (포함)")
+        parser.add_argument('--camera', type=int, help="카메라 ID")
+        parser.add_argument('--label', help="탐지 객체 이름 (DetectionLog.detected_object)")
+        parser.add_argument('--alert-only', action='store_true', help="경고 로그만")
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE, help="한 번에 읽을 로그 수")
+
+    def handle(self, *args, **options):
+        output = options['output']
+        export_format = options['format'] or ('parquet' if output.endswith('.parquet') else 'csv')
+        if export_format == FORMAT_PARQUET and not parquet_available():
+            raise CommandError("Parquet 내보내기에는 pyarrow 설치가 필요합니다 (pip install pyarrow).")
+        try:
+            logs = filter_logs(
+                start=parse_date(options['start']),
+                end=parse_date(options['end']),
+                camera_id=options['camera'],
+                label=options['label'],
+                alert_only=options['alert_only'],
+            )
+        except ValueError:
+            raise CommandError("--start/--end 는 YYYY-MM-DD 형식이어야 합니다.")
+
+        size = 0
+        with open(output, 'wb') as f:
+            for data in iter_export(logs, export_format, options['chunk_size']):
+                f.write(data)
+                size += len(data)
+        self.stdout.write(f"{output} 저장 완료 ({export_format}, {size / 1024 / 1024:.1f}MB)")
@@ -0,0 +1,26 @@
+# CCTV/management/commands/rebuild_rollups.py
+"""
+탐지 집계(시간/일)를 원본 DetectionLog 에서 다시 계산 (CCTV/rollups.py)
+
+    python manage.py rebuild_rollups               # 전체 (보관 정책으로 지워진 기간의 집계도 사라짐)
+    python manage.py rebuild_rollups --days 7      # 최근 7일만
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from CCTV.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "탐지 집계 테이블을 원본 로그로 다시 계산"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="최근 N일만 다시 계산 (기본: 전체)")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+        stats = rebuild_rollups(since=since)
+        scope = f"최근 {options['days']}일" if since else "전체"
+        self.stdout.write(f"{scope} 집계 재계산: 시간별 {stats['hour']}행, 일별 {stats['day']}행")
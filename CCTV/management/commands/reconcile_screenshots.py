@@ -0,0 +1,26 @@
+# CCTV/management/commands/reconcile_screenshots.py
+"""
+DetectionLog.screenshot_available 을 실제 스크린샷 파일과 비교해 갱신
+
+    python manage.py reconcile_screenshots
+    python manage.py reconcile_screenshots --dry-run
+"""
+from django.core.management.base import BaseCommand
+
+from CCTV.screenshots import RECONCILE_BATCH_SIZE, reconcile_screenshots
+
+
+class Command(BaseCommand):
+    help = "스크린샷 존재 플래그를 디렉토리 목록 기준으로 일괄 재검증"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=RECONCILE_BATCH_SIZE, help="한 번에 처리할 로그 수")
+        parser.add_argument('--dry-run', action='store_true', help="변경 없이 불일치 건수만 출력")
+
+    def handle(self, *args, **options):
+        stats = reconcile_screenshots(batch_size=options['batch_size'], dry_run=options['dry_run'])
+        prefix = "[dry-run] " if options['dry_run'] else ""
+        self.stdout.write(
+            f"{prefix}로그 {stats['checked']}건 확인 (디렉토리 {stats['directories']}개, {stats['seconds']}초): "
+            f"존재로 변경 {stats['marked_available']}건, 없음으로 변경 {stats['marked_missing']}건"
+        )
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.23 on 2026-10-19 17:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0009_detectionlog"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="detectionlog",
+            name="clip_path",
+            field=models.CharField(
+                blank=True, help_text="이벤트 영상 클립 경로", max_length=500, null=True
+            ),
+        ),
+    ]
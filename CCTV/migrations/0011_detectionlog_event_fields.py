@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0010_detectionlog_clip_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="detectionlog",
+            name="ended_at",
+            field=models.DateTimeField(
+                blank=True, help_text="이벤트 종료 시각", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="detectionlog",
+            name="frame_count",
+            field=models.PositiveIntegerField(
+                default=1, help_text="이벤트 동안 탐지된 횟수"
+            ),
+        ),
+        migrations.AddField(
+            model_name="detectionlog",
+            name="last_seen_at",
+            field=models.DateTimeField(
+                blank=True, help_text="이벤트 마지막 확인 시각", null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0011_detectionlog_event_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CameraROI",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "points",
+                    models.TextField(
+                        default="[]",
+                        help_text="폴리곤 꼭짓점 JSON [[x, y], ...] (0.0-1.0 비율)",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(default=True, help_text="활성화 여부"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "camera",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="roi",
+                        to="CCTV.camera",
+                        verbose_name="카메라",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "카메라 관심 영역",
+                "verbose_name_plural": "카메라 관심 영역들",
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0012_cameraroi"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="camera",
+            name="tile_overlap",
+            field=models.FloatField(default=0.2, help_text="타일 겹침 비율 (0.0-0.5)"),
+        ),
+        migrations.AddField(
+            model_name="camera",
+            name="tile_size",
+            field=models.PositiveIntegerField(
+                default=640, help_text="타일 크기 (픽셀, 32 배수)"
+            ),
+        ),
+        migrations.AddField(
+            model_name="camera",
+            name="tiled_inference",
+            field=models.BooleanField(
+                default=False,
+                help_text="겹치는 타일로 나눠 추론 (먼 거리의 작은 사람 탐지)",
+            ),
+        ),
+    ]
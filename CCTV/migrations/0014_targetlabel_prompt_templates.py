@@ -0,0 +1,22 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0013_camera_tiled_inference"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="targetlabel",
+            name="prompt_templates",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="CLIP 프롬프트 (한 줄에 하나, {} 는 객체 탐지 토큰으로 치환)",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0014_targetlabel_prompt_templates"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(fields=["detected_at"], name="detlog_time_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(
+                fields=["camera", "detected_at"], name="detlog_camera_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(
+                fields=["has_alert", "detected_at"], name="detlog_alert_time_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="detectionlog",
+            index=models.Index(
+                fields=["camera", "has_alert", "detected_at"],
+                name="detlog_cam_alert_time_idx",
+            ),
+        ),
+    ]
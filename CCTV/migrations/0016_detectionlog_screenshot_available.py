@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:23
+
+from django.db import migrations, models
+
+
+def mark_existing_screenshots(apps, schema_editor):
+    # 기존 로그는 경로가 있으면 존재한다고 가정 - 실제 파일 확인은 reconcile_screenshots 명령으로
+    DetectionLog = apps.get_model("CCTV", "DetectionLog")
+    DetectionLog.objects.exclude(screenshot_path__isnull=True).exclude(
+        screenshot_path=""
+    ).update(screenshot_available=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0015_detectionlog_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="detectionlog",
+            name="screenshot_available",
+            field=models.BooleanField(
+                default=False,
+                help_text="스크린샷 파일 존재 여부 (저장 시 설정, 보관 정리/재검증 시 갱신)",
+            ),
+        ),
+        migrations.RunPython(mark_existing_screenshots, migrations.RunPython.noop),
+    ]
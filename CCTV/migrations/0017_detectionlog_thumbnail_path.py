@@ -0,0 +1,20 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0016_detectionlog_screenshot_available"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="detectionlog",
+            name="thumbnail_path",
+            field=models.CharField(
+                blank=True, help_text="목록용 썸네일 경로", max_length=500, null=True
+            ),
+        ),
+    ]
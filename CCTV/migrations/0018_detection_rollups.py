@@ -0,0 +1,139 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:28
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0017_detectionlog_thumbnail_path"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyDetectionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="탐지된 객체 (DetectionLog.detected_object)",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "detection_count",
+                    models.PositiveIntegerField(default=0, help_text="탐지 로그 수"),
+                ),
+                (
+                    "alert_count",
+                    models.PositiveIntegerField(default=0, help_text="경고 로그 수"),
+                ),
+                (
+                    "object_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="탐지된 객체 수 합계"
+                    ),
+                ),
+                (
+                    "confidence_sum",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="신뢰도 합계 (평균 = confidence_sum / detection_count)",
+                    ),
+                ),
+                ("bucket", models.DateField(help_text="집계 날짜")),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="CCTV.camera"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "일별 탐지 집계",
+                "verbose_name_plural": "일별 탐지 집계",
+            },
+        ),
+        migrations.CreateModel(
+            name="HourlyDetectionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "label",
+                    models.CharField(
+                        help_text="탐지된 객체 (DetectionLog.detected_object)",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "detection_count",
+                    models.PositiveIntegerField(default=0, help_text="탐지 로그 수"),
+                ),
+                (
+                    "alert_count",
+                    models.PositiveIntegerField(default=0, help_text="경고 로그 수"),
+                ),
+                (
+                    "object_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="탐지된 객체 수 합계"
+                    ),
+                ),
+                (
+                    "confidence_sum",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="신뢰도 합계 (평균 = confidence_sum / detection_count)",
+                    ),
+                ),
+                ("bucket", models.DateTimeField(help_text="집계 시간 (정시)")),
+                (
+                    "camera",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="CCTV.camera"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "시간별 탐지 집계",
+                "verbose_name_plural": "시간별 탐지 집계",
+                "indexes": [
+                    models.Index(fields=["bucket"], name="hourly_rollup_bucket_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="hourlydetectionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("camera", "label", "bucket"), name="hourly_rollup_unique"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dailydetectionrollup",
+            index=models.Index(fields=["bucket"], name="daily_rollup_bucket_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailydetectionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("camera", "label", "bucket"), name="daily_rollup_unique"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-19 18:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("CCTV", "0018_detection_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="detectionlog",
+            name="screenshot_archived",
+            field=models.BooleanField(
+                default=False,
+                help_text="스크린샷이 날짜별 tar 로 압축 보관됨 (CCTV/retention.py)",
+            ),
+        ),
+    ]
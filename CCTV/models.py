@@ -1,5 +1,6 @@
 # CCTV/models.py
 from django.db import models
+from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import json
@@ -9,6 +10,10 @@ class Camera(models.Model):
     name = models.CharField(max_length=100)
     location = models.CharField(max_length=200)
     rtsp_url = models.CharField(max_length=500)
+    # 고해상도 광역 카메라용 타일 추론 (CCTV/tiling.py)
+    tiled_inference = models.BooleanField(default=False, help_text="겹치는 타일로 나눠 추론 (먼 거리의 작은 사람 탐지)")
+    tile_size = models.PositiveIntegerField(default=640, help_text="타일 크기 (픽셀, 32 배수)")
+    tile_overlap = models.FloatField(default=0.2, help_text="타일 겹침 비율 (0.0-0.5)")
 
     def __str__(self):
         return f"{self.name} @ {self.location}"
@@ -18,11 +23,67 @@ class TargetLabel(models.Model):
     display_name = models.CharField(max_length=100, help_text="화면에 표시할 이름")
     label_name = models.CharField(max_length=200,  help_text="객체 탐지 자연어 토큰")   # CLIP용 입력 텍스트
     has_alert = models.BooleanField(default=False, verbose_name="경고 여부")            # 경고할건지 안할건지
-    
+    # CLIP 프롬프트 앙상블 (CCTV/prompt_embeddings.py) - 비어 있으면 "a photo of {label_name}" 하나만 사용
+    prompt_templates = models.TextField(
+        blank=True,
+        default='',
+        help_text="CLIP 프롬프트 (한 줄에 하나, {} 는 객체 탐지 토큰으로 치환)",
+    )
+
+    DEFAULT_PROMPT_TEMPLATE = "a photo of {}"
 
     def __str__(self):
         return f"[{self.camera.name}] {self.display_name or self.label_name}"
 
+    def get_prompts(self):
+        """CLIP 에 넣을 프롬프트 목록 ({} 가 없는 줄은 그대로 사용 - 동의어 지정용)"""
+        templates = [line.strip() for line in (self.prompt_templates or '').splitlines() if line.strip()]
+        templates = templates or [self.DEFAULT_PROMPT_TEMPLATE]
+        prompts = []
+        for template in templates:
+            prompt = template.replace('{}', self.label_name) if '{}' in template else template
+            if prompt not in prompts:
+                prompts.append(prompt)
+        return prompts
+
+class CameraROI(models.Model):
+    """카메라별 관심 영역(ROI) 폴리곤 - 좌표는 프레임 크기 대비 비율 (0.0-1.0)"""
+    camera = models.OneToOneField(Camera, on_delete=models.CASCADE, related_name='roi', verbose_name="카메라")
+    points = models.TextField(default='[]', help_text="폴리곤 꼭짓점 JSON [[x, y], ...] (0.0-1.0 비율)")
+    is_active = models.BooleanField(default=True, help_text="활성화 여부")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "카메라 관심 영역"
+        verbose_name_plural = "카메라 관심 영역들"
+
+    def __str__(self):
+        return f"{self.camera.name} ROI ({len(self.get_points())}점)"
+
+    def get_points(self):
+        """[[x, y], ...] 리스트 (파싱 실패 시 빈 리스트)"""
+        try:
+            return [[float(x), float(y)] for x, y in json.loads(self.points or '[]')]
+        except (TypeError, ValueError):
+            return []
+
+    def set_points(self, points):
+        self.points = json.dumps([[round(float(x), 4), round(float(y), 4)] for x, y in points])
+
+    def clean(self):
+        from django.core.exceptions import ValidationError
+        try:
+            points = json.loads(self.points or '[]')
+            valid = all(len(point) == 2 and 0.0 <= float(point[0]) <= 1.0 and 0.0 <= float(point[1]) <= 1.0
+                        for point in points)
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            raise ValidationError({'points': "꼭짓점은 [[x, y], ...] 형식의 0.0-1.0 비율이어야 합니다."})
+        if len(points) < 3:
+            raise ValidationError({'points': "폴리곤은 최소 3개의 꼭짓점이 필요합니다."})
+
 class DetectionLog(models.Model):
     camera = models.ForeignKey(Camera, on_delete=models.CASCADE, related_name='detection_logs')
     camera_name = models.CharField(max_length=100, help_text="카메라 이름 (로그용)")
@@ -32,19 +93,86 @@ class DetectionLog(models.Model):
     confidence = models.FloatField(help_text="탐지 신뢰도 (0.0-1.0)")
     has_alert = models.BooleanField(default=False, help_text="경고 객체 여부")
     screenshot_path = models.CharField(max_length=500, blank=True, null=True, help_text="스크린샷 파일 경로")
+    screenshot_available = models.BooleanField(
+        default=False, help_text="스크린샷 파일 존재 여부 (저장 시 설정, 보관 정리/재검증 시 갱신)"
+    )
+    screenshot_archived = models.BooleanField(
+        default=False, help_text="스크린샷이 날짜별 tar 로 압축 보관됨 (CCTV/retention.py)"
+    )
+    thumbnail_path = models.CharField(max_length=500, blank=True, null=True, help_text="목록용 썸네일 경로")
+    clip_path = models.CharField(max_length=500, blank=True, null=True, help_text="이벤트 영상 클립 경로")
     detected_at = models.DateTimeField(default=timezone.now, help_text="탐지 시각")
+    last_seen_at = models.DateTimeField(blank=True, null=True, help_text="이벤트 마지막 확인 시각")
+    ended_at = models.DateTimeField(blank=True, null=True, help_text="이벤트 종료 시각")
+    frame_count = models.PositiveIntegerField(default=1, help_text="이벤트 동안 탐지된 횟수")
     
     class Meta:
         ordering = ['-detected_at']
+        # 목록/필터 조회는 (detected_at, id) 키셋 페이징 (CCTV/pagination.py)
+        indexes = [
+            models.Index(fields=['detected_at'], name='detlog_time_idx'),
+            models.Index(fields=['camera', 'detected_at'], name='detlog_camera_time_idx'),
+            models.Index(fields=['has_alert', 'detected_at'], name='detlog_alert_time_idx'),
+            models.Index(fields=['camera', 'has_alert', 'detected_at'], name='detlog_cam_alert_time_idx'),
+        ]
         verbose_name = "탐지 로그"
         verbose_name_plural = "탐지 로그들"
     
     def __str__(self):
         return f"[{self.detected_at.strftime('%Y-%m-%d %H:%M:%S')}] {self.camera_name}: {self.detected_object} ({self.object_count}개)"
     
+    @property
+    def clip_url(self):
+        """이벤트 클립의 MEDIA URL (없으면 None)"""
+        if not self.clip_path:
+            return None
+        relative_path = os.path.relpath(self.clip_path, settings.MEDIA_ROOT)
+        return settings.MEDIA_URL + relative_path.replace(os.sep, '/')
+
     @property
     def screenshot_exists(self):
-        """스크린샷 파일이 존재하는지 확인"""
+        """스크린샷 파일이 존재하는지 파일 시스템에서 직접 확인 (목록 조회는 screenshot_available 사용)"""
         if self.screenshot_path and os.path.exists(self.screenshot_path):
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+class DetectionRollup(models.Model):
+    """카메라 × 라벨 × 기간 탐지 집계 (CCTV/rollups.py 에서 로그 저장 시 증분 갱신)"""
+    camera = models.ForeignKey(Camera, on_delete=models.CASCADE)
+    label = models.CharField(max_length=100, help_text="탐지된 객체 (DetectionLog.detected_object)")
+    detection_count = models.PositiveIntegerField(default=0, help_text="탐지 로그 수")
+    alert_count = models.PositiveIntegerField(default=0, help_text="경고 로그 수")
+    object_count = models.PositiveIntegerField(default=0, help_text="탐지된 객체 수 합계")
+    confidence_sum = models.FloatField(default=0.0, help_text="신뢰도 합계 (평균 = confidence_sum / detection_count)")
+
+    class Meta:
+        abstract = True
+
+
+class HourlyDetectionRollup(DetectionRollup):
+    bucket = models.DateTimeField(help_text="집계 시간 (정시)")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['camera', 'label', 'bucket'], name='hourly_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='hourly_rollup_bucket_idx'),
+        ]
+        verbose_name = "시간별 탐지 집계"
+        verbose_name_plural = "시간별 탐지 집계"
+
+
+class DailyDetectionRollup(DetectionRollup):
+    bucket = models.DateField(help_text="집계 날짜")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['camera', 'label', 'bucket'], name='daily_rollup_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['bucket'], name='daily_rollup_bucket_idx'),
+        ]
+        verbose_name = "일별 탐지 집계"
+        verbose_name_plural = "일별 탐지 집계"
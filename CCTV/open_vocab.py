@@ -0,0 +1,172 @@
+# CCTV/open_vocab.py
+"""
+단일 단계 오픈 어휘 탐지 엔진 (YOLOE / YOLO-World)
+
+기본 엔진(two_stage)은 YOLO 로 person 만 찾은 뒤 클러스터마다 CLIP 을 한 번 더 돌린다.
+open_vocab 엔진은 카메라의 TargetLabel 프롬프트를 탐지기 어휘로 지정해 한 번의 추론으로
+라벨별 박스를 얻는다 (TEST/test_yoloe.py, TEST/test_yoloworld.py). CLIP 단계가 없어지므로
+정확도가 충분한 배포에서 settings.CCTV_DETECTION_ENGINE = 'open_vocab' 으로 켠다.
+
+모델은 하나를 모든 카메라가 공유하고 어휘는 모델 상태이므로,
+어휘 지정 + 추론을 lock 안에서 수행한다. 어휘(프롬프트 목록)별 텍스트 임베딩은 메모리에 캐시하여
+카메라가 번갈아 추론해도 텍스트 인코더를 다시 돌리지 않고 임베딩만 교체한다.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger('CCTV.detection')
+
+ENGINE_TWO_STAGE = 'two_stage'
+ENGINE_OPEN_VOCAB = 'open_vocab'
+ENGINES = (ENGINE_TWO_STAGE, ENGINE_OPEN_VOCAB)
+
+KIND_YOLOE = 'yoloe'
+KIND_WORLD = 'yolo_world'
+
+# 탐지 엔진 (two_stage: YOLO + CLIP, open_vocab: YOLOE / YOLO-World 단일 추론)
+DETECTION_ENGINE = getattr(settings, 'CCTV_DETECTION_ENGINE', ENGINE_TWO_STAGE)
+# 오픈 어휘 모델 가중치 (CCTV/ 아래 파일 또는 ultralytics 자동 다운로드 이름)
+OPEN_VOCAB_MODEL = getattr(settings, 'CCTV_OPEN_VOCAB_MODEL', 'yoloe-11l-seg.pt')
+# 오픈 어휘 탐지 최소 신뢰도 (CLIP softmax 가 아니라 박스 점수라 two_stage 임계치보다 낮음)
+OPEN_VOCAB_CONFIDENCE = getattr(settings, 'CCTV_OPEN_VOCAB_CONFIDENCE', 0.25)
+# 메모리에 유지할 어휘 임베딩 수 (카메라별 라벨 구성 수 이상)
+OPEN_VOCAB_CACHE_SIZE = 32
+
+
+def build_vocabulary(target_labels):
+    """
+    타겟 라벨 → (어휘 tuple, 어휘 인덱스별 라벨 인덱스 list)
+
+    라벨의 프롬프트 앙상블은 각각 별도 클래스로 넣고 결과에서 같은 라벨로 합친다.
+    """
+    names = []
+    class_to_label = []
+    for label_idx, target_label in enumerate(target_labels):
+        for prompt in dict.fromkeys(target_label.get_prompts()):
+            names.append(prompt)
+            class_to_label.append(label_idx)
+    return tuple(names), class_to_label
+
+
+def get_model_kind(model_name):
+    return KIND_WORLD if 'world' in os.path.basename(model_name).lower() else KIND_YOLOE
+
+
+class OpenVocabularyDetector:
+    """공유 YOLOE / YOLO-World 모델 + 어휘 임베딩 캐시"""
+
+    def __init__(self, model_name=OPEN_VOCAB_MODEL):
+        self.model_name = model_name
+        self.kind = get_model_kind(model_name)
+        self.model = None
+        self.device = 'cpu'
+        self.lock = threading.Lock()
+        self.embeddings = OrderedDict()  # 어휘 tuple -> 텍스트 임베딩 텐서
+        self.current_names = None
+        self.encoded_count = 0
+        self.swap_count = 0
+
+    def _resolve_path(self):
+        local_path = os.path.join(settings.BASE_DIR, 'CCTV', self.model_name)
+        return local_path if os.path.exists(local_path) else self.model_name
+
+    def load(self, device):
+        from ultralytics import YOLOE, YOLOWorld
+
+        path = self._resolve_path()
+        model_class = YOLOWorld if self.kind == KIND_WORLD else YOLOE
+        with self.lock:
+            self.model = model_class(path)
+            self.device = device
+            self.embeddings.clear()
+            self.current_names = None
+        logger.info("오픈 어휘 탐지 모델 로드 완료: %s (%s, device: %s)", path, self.kind, device)
+
+    def _encode(self, names):
+        """어휘 텍스트 임베딩 계산 (YOLO-World 는 계산과 동시에 어휘가 지정됨)"""
+        if self.kind == KIND_WORLD:
+            self.model.set_classes(list(names))
+            return self.model.model.txt_feats.clone()
+        return self.model.get_text_pe(list(names))
+
+    def _apply(self, names, embedding):
+        """캐시된 임베딩으로 어휘 교체 (텍스트 인코더 재실행 없음)"""
+        if self.kind == KIND_WORLD:
+            # YOLOWorld.set_classes 와 같은 상태를 임베딩 재계산 없이 설정
+            inner = self.model.model
+            inner.txt_feats = embedding
+            inner.model[-1].nc = len(names)
+            inner.names = list(names)
+            if self.model.predictor:
+                self.model.predictor.model.names = list(names)
+        else:
+            self.model.set_classes(list(names), embedding)
+
+    def _set_vocabulary(self, names):
+        """lock 을 잡은 상태에서 호출"""
+        if names == self.current_names:
+            return
+
+        embedding = self.embeddings.get(names)
+        if embedding is None:
+            embedding = self._encode(names)
+            self.encoded_count += 1
+            self.embeddings[names] = embedding
+            while len(self.embeddings) > OPEN_VOCAB_CACHE_SIZE:
+                self.embeddings.popitem(last=False)
+            logger.info("오픈 어휘 임베딩 계산: %s", list(names))
+            if self.kind == KIND_WORLD:
+                self.current_names = names
+                self.swap_count += 1
+                return
+        else:
+            self.embeddings.move_to_end(names)
+
+        self._apply(names, embedding)
+        self.current_names = names
+        self.swap_count += 1
+
+    def detect(self, image, names, conf=OPEN_VOCAB_CONFIDENCE, imgsz=None):
+        """
+        어휘 names 로 단일 추론
+
+        Returns:
+            (boxes (N, 4), confidences (N,), classes (N,)) - classes 는 names 인덱스
+        """
+        if self.model is None or not names:
+            return np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=int)
+
+        kwargs = {'conf': conf, 'device': self.device, 'verbose': False}
+        if imgsz:
+            kwargs['imgsz'] = imgsz
+        with self.lock:
+            self._set_vocabulary(names)
+            results = self.model.predict(image, **kwargs)
+
+        if not results or results[0].boxes is None or len(results[0].boxes) == 0:
+            return np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=int)
+        result_boxes = results[0].boxes
+        return (
+            result_boxes.xyxy.cpu().numpy(),
+            result_boxes.conf.cpu().numpy(),
+            result_boxes.cls.cpu().numpy().astype(int),
+        )
+
+    def get_status(self):
+        return {
+            'model': self.model_name,
+            'kind': self.kind,
+            'loaded': self.model is not None,
+            'vocabularies_cached': len(self.embeddings),
+            'encoded': self.encoded_count,
+            'swaps': self.swap_count,
+        }
+
+
+# 싱글톤 인스턴스
+open_vocab_detector = OpenVocabularyDetector()
@@ -0,0 +1,101 @@
+# CCTV/pagination.py
+"""
+DetectionLog 키셋(커서) 페이지네이션 + 캐시된 전체 건수
+
+OFFSET 페이징은 깊은 페이지일수록 앞의 행을 모두 읽고 버리며, 매 요청 count() 는 필터 조건의
+전체 행을 센다. 로그가 수백만 건이 되면 둘 다 전체 스캔이 되므로
+- (detected_at, id) 내림차순 키셋으로 "이 커서보다 오래된 N건" 을 인덱스 범위 조회
+- 전체 건수는 필터 조건별로 LOG_COUNT_CACHE_SECONDS 동안 캐시 (근사값)
+을 사용한다. 인덱스는 DetectionLog.Meta.indexes 참고.
+
+커서는 마지막(또는 첫) 행의 (detected_at, id) 를 URL-safe base64 로 인코딩한 문자열이다.
+"""
+import base64
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+# 페이지 크기 상한
+MAX_PAGE_SIZE = 100
+# 필터 조건별 전체 건수 캐시 시간 (초)
+LOG_COUNT_CACHE_SECONDS = getattr(settings, 'CCTV_LOG_COUNT_CACHE_SECONDS', 60)
+
+DIRECTION_NEXT = 'next'
+DIRECTION_PREV = 'prev'
+
+
+def encode_cursor(log):
+    raw = f"{log.detected_at.isoformat()}|{log.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """커서 → (detected_at, id) - 형식이 잘못되면 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        detected_at, log_id = base64.urlsafe_b64decode(padded).decode('utf-8').rsplit('|', 1)
+        return datetime.fromisoformat(detected_at), int(log_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"잘못된 커서: {cursor}") from e
+
+
+def clamp_page_size(value, default):
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def paginate_logs(queryset, cursor=None, direction=DIRECTION_NEXT, page_size=20):
+    """
+    (detected_at, id) 내림차순 키셋 페이지
+
+    Args:
+        cursor: 이전 응답의 next_cursor (더 오래된 페이지) 또는 prev_cursor (더 최신 페이지)
+        direction: 'next' | 'prev'
+
+    Returns:
+        {'items': [...], 'next_cursor', 'prev_cursor', 'has_next', 'has_prev'}
+    """
+    position = decode_cursor(cursor) if cursor else None
+
+    if direction == DIRECTION_PREV and position:
+        detected_at, log_id = position
+        page = queryset.filter(
+            Q(detected_at__gt=detected_at) | Q(detected_at=detected_at, id__gt=log_id)
+        ).order_by('detected_at', 'id')
+        items = list(page[:page_size + 1])
+        has_prev = len(items) > page_size
+        items = items[:page_size][::-1]
+        has_next = True
+    else:
+        page = queryset.order_by('-detected_at', '-id')
+        if position:
+            detected_at, log_id = position
+            page = page.filter(Q(detected_at__lt=detected_at) | Q(detected_at=detected_at, id__lt=log_id))
+        items = list(page[:page_size + 1])
+        has_next = len(items) > page_size
+        items = items[:page_size]
+        has_prev = position is not None
+
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1]) if items and has_next else None,
+        'prev_cursor': encode_cursor(items[0]) if items and has_prev else None,
+        'has_next': has_next,
+        'has_prev': has_prev,
+    }
+
+
+def get_cached_count(queryset, ttl=LOG_COUNT_CACHE_SECONDS):
+    """필터 조건(SQL)별 count() 캐시 - 최대 ttl 초 지난 근사값"""
+    key = 'cctv:log_count:' + hashlib.sha1(str(queryset.query).encode('utf-8')).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, ttl)
+    return count
@@ -0,0 +1,124 @@
+# CCTV/prompt_embeddings.py
+"""
+라벨별 프롬프트 앙상블 텍스트 임베딩 캐시
+
+TargetLabel 하나에 여러 프롬프트 템플릿을 둘 수 있다 (TEST/test_SigLIP.py 의 label_map 방식).
+프롬프트별 CLIP 텍스트 임베딩을 정규화 후 평균 → 다시 정규화한 벡터를 라벨 임베딩으로 쓰며,
+(모델 이름 + 프롬프트 목록) 해시를 키로
+- 메모리 (프로세스 내, 매 프레임 조회 비용 없음)
+- 디스크 CCTV/prompt_cache/<해시>.npy (재시작 후에도 재계산 없음)
+에 저장한다. 프롬프트가 바뀌면 해시가 바뀌므로 별도 무효화가 필요 없다.
+"""
+import hashlib
+import logging
+import os
+import threading
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger('CCTV.detection')
+
+# 디스크 캐시 디렉토리
+PROMPT_CACHE_DIR = os.path.join(settings.BASE_DIR, 'CCTV', 'prompt_cache')
+
+
+def get_cache_key(model_name, prompts):
+    """모델 이름 + 프롬프트 목록 해시"""
+    digest = hashlib.sha1()
+    digest.update(model_name.encode('utf-8'))
+    for prompt in prompts:
+        digest.update(b'\0')
+        digest.update(prompt.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PromptEmbeddingCache:
+    """프롬프트 앙상블 임베딩 메모리 + .npy 캐시"""
+
+    def __init__(self, cache_dir=PROMPT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        self.embeddings = {}  # key -> np.ndarray (D,)
+        self.encoded_count = 0
+        self.disk_hits = 0
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _load_from_disk(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return np.load(path)
+        except (OSError, ValueError) as e:
+            logger.warning("프롬프트 임베딩 캐시 읽기 실패 (%s): %s", path, e)
+            return None
+
+    def _save_to_disk(self, key, embedding):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._path(key) + '.tmp.npy'
+            np.save(tmp_path, embedding)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("프롬프트 임베딩 캐시 저장 실패: %s", e)
+
+    def _encode(self, clip_model, device, prompts):
+        """프롬프트별 임베딩 정규화 → 평균 → 재정규화"""
+        import torch
+        import clip
+
+        with torch.no_grad():
+            features = clip_model.encode_text(clip.tokenize(prompts).to(device)).float()
+            features = features / features.norm(dim=-1, keepdim=True)
+            mean = features.mean(dim=0)
+            mean = mean / mean.norm()
+        return mean.cpu().numpy().astype(np.float32)
+
+    def get_embedding(self, clip_model, model_name, device, prompts):
+        """라벨 하나의 앙상블 임베딩 (D,) numpy"""
+        key = get_cache_key(model_name, prompts)
+        embedding = self.embeddings.get(key)
+        if embedding is not None:
+            return embedding
+
+        with self.lock:
+            embedding = self.embeddings.get(key)
+            if embedding is not None:
+                return embedding
+
+            embedding = self._load_from_disk(key)
+            if embedding is not None:
+                self.disk_hits += 1
+            else:
+                embedding = self._encode(clip_model, device, prompts)
+                self.encoded_count += 1
+                self._save_to_disk(key, embedding)
+                logger.info("프롬프트 앙상블 임베딩 계산: %s", prompts)
+            self.embeddings[key] = embedding
+            return embedding
+
+    def get_text_features(self, clip_model, model_name, device, prompt_lists):
+        """
+        라벨별 프롬프트 목록 → 정규화된 (라벨 수, D) float32 텐서
+
+        Args:
+            prompt_lists: [[프롬프트, ...], ...] - 라벨 순서대로 ("other object" 포함)
+        """
+        import torch
+
+        rows = [self.get_embedding(clip_model, model_name, device, prompts) for prompts in prompt_lists]
+        return torch.from_numpy(np.stack(rows)).to(device)
+
+    def get_status(self):
+        return {
+            'cached': len(self.embeddings),
+            'encoded': self.encoded_count,
+            'disk_hits': self.disk_hits,
+        }
+
+
+# 싱글톤 인스턴스
+prompt_embedding_cache = PromptEmbeddingCache()
@@ -0,0 +1,152 @@
+# CCTV/recorder.py
+"""
+이벤트(경고 탐지) 발생 시 전후 영상을 클립으로 저장하는 모듈.
+
+- live_output 의 fMP4 조각 링 버퍼를 pre-event 버퍼로 사용 (인코딩된 패킷 그대로)
+- 경고 탐지 시 N초 전 ~ N초 후 조각을 모아 init segment 와 이어 붙여 저장
+- 추가 디코딩/재인코딩 없음 (fragmented MP4 그대로 재생 가능)
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+from .live_output import live_output_manager
+
+logger = logging.getLogger(__name__)
+
+# 카메라별 pre-event 버퍼 길이 (초)
+RECORDING_BUFFER_SECONDS = 30
+# 이벤트 전/후 클립 길이 (초)
+CLIP_PRE_EVENT_SECONDS = 10
+CLIP_POST_EVENT_SECONDS = 10
+
+
+class EventClipRecorder:
+    """경고 탐지 시 전후 영상 클립 저장"""
+
+    def __init__(self):
+        self.clip_dir = os.path.join(settings.MEDIA_ROOT, 'clips')
+        self.enabled_cameras = {}  # camera_id -> rtsp_url
+        self.pending_clips = {}  # camera_id -> 진행 중인 클립 정보
+        self.lock = threading.Lock()
+
+    def enable_for_camera(self, camera):
+        """카메라의 상시 remux(pre-event 버퍼) 시작"""
+        if not live_output_manager.is_available():
+            return False
+
+        with self.lock:
+            old_url = self.enabled_cameras.get(camera.id)
+            self.enabled_cameras[camera.id] = camera.rtsp_url
+
+        if old_url and old_url != camera.rtsp_url:
+            live_output_manager.unpin(old_url)
+
+        live_output_manager.pin(camera.rtsp_url, RECORDING_BUFFER_SECONDS)
+        logger.info("이벤트 녹화 버퍼 시작: 카메라 '%s' (%s초)", camera.name, RECORDING_BUFFER_SECONDS)
+        return True
+
+    def disable_for_camera(self, camera_id):
+        """카메라의 pre-event 버퍼 해제"""
+        with self.lock:
+            rtsp_url = self.enabled_cameras.pop(camera_id, None)
+        if rtsp_url:
+            live_output_manager.unpin(rtsp_url)
+            logger.info("이벤트 녹화 버퍼 중지: 카메라 ID %s", camera_id)
+
+    def disable_all(self):
+        for camera_id in list(self.enabled_cameras.keys()):
+            self.disable_for_camera(camera_id)
+
+    def request_clip(self, camera, log_id, event_time=None):
+        """
+        경고 탐지 로그에 대한 클립 저장 예약
+
+        같은 카메라에 진행 중인 클립이 이벤트 시각을 포함하면 해당 클립에 로그만 추가
+        (연속 경고마다 클립이 중복 생성되지 않도록)
+        """
+        event_time = event_time or time.time()
+
+        if camera.id not in self.enabled_cameras:
+            # 버퍼가 없던 카메라 - 지금부터라도 버퍼링 (pre-event 구간은 짧아짐)
+            if not self.enable_for_camera(camera):
+                return False
+
+        with self.lock:
+            pending = self.pending_clips.get(camera.id)
+            if pending and pending['end_time'] >= event_time:
+                pending['log_ids'].append(log_id)
+                return True
+
+            pending = {
+                'camera_id': camera.id,
+                'camera_name': camera.name,
+                'rtsp_url': camera.rtsp_url,
+                'start_time': event_time - CLIP_PRE_EVENT_SECONDS,
+                'end_time': event_time + CLIP_POST_EVENT_SECONDS,
+                'event_time': event_time,
+                'log_ids': [log_id],
+            }
+            self.pending_clips[camera.id] = pending
+
+        # post-event 구간이 버퍼에 쌓인 뒤 저장
+        timer = threading.Timer(
+            CLIP_POST_EVENT_SECONDS + 1.0,
+            self._finalize_clip,
+            args=(pending,)
+        )
+        timer.daemon = True
+        timer.name = f"ClipWriter-{camera.id}"
+        timer.start()
+        return True
+
+    def _finalize_clip(self, pending):
+        """버퍼에서 구간 조각을 모아 파일로 저장하고 로그에 연결"""
+        from .models import DetectionLog
+
+        with self.lock:
+            if self.pending_clips.get(pending['camera_id']) is pending:
+                del self.pending_clips[pending['camera_id']]
+
+        try:
+            remuxer = live_output_manager.get_remuxer(pending['rtsp_url'], start=False)
+            if remuxer is None:
+                logger.warning("클립 저장 실패 (버퍼 없음): %s", pending['camera_name'])
+                return None
+
+            init_segment, fragments = remuxer.get_fragments_between(
+                pending['start_time'], pending['end_time']
+            )
+            if init_segment is None or not fragments:
+                logger.warning("클립 저장 실패 (조각 없음): %s", pending['camera_name'])
+                return None
+
+            event_dt = datetime.fromtimestamp(pending['event_time'])
+            day_dir = os.path.join(self.clip_dir, event_dt.strftime("%Y%m%d"))
+            os.makedirs(day_dir, exist_ok=True)
+
+            filename = f"{pending['camera_id']}_{event_dt.strftime('%H%M%S')}_{pending['log_ids'][0]}.mp4"
+            filepath = os.path.join(day_dir, filename)
+
+            with open(filepath, 'wb') as f:
+                f.write(init_segment)
+                for fragment in fragments:
+                    f.write(fragment['data'])
+
+            duration = sum(fragment['duration'] for fragment in fragments)
+            DetectionLog.objects.filter(id__in=pending['log_ids']).update(clip_path=filepath)
+
+            logger.info("이벤트 클립 저장: %s (%.1f초, 로그 %s개)", filename, duration, len(pending['log_ids']))
+            return filepath
+
+        except Exception as e:
+            logger.exception("이벤트 클립 저장 오류: %s", e)
+            return None
+
+
+# 싱글톤 인스턴스
+event_clip_recorder = EventClipRecorder()
@@ -0,0 +1,443 @@
+# CCTV/retention.py
+"""
+DetectionLog / 탐지 스크린샷 보관 정책
+
+탐지 스크린샷은 media/all_detections/{alerts,normal}/YYYYMMDD/... 에 쌓이고 로그는 계속 늘어나므로
+다음 세 단계로 디스크 사용량을 일정하게 유지한다.
+
+1. 보관 (hot): ARCHIVE_AFTER_DAYS 일 이내 날짜 폴더는 그대로 둔다.
+2. 압축 (archive): 그보다 오래된 날짜 폴더는 media/archive/all_detections/<구분>/YYYYMMDD.tar 로 묶고
+   같은 이름의 .index.json (로그 ID → tar 멤버) 을 함께 남긴 뒤 폴더를 지운다.
+   경고 로그는 DB 에 media/screenshots/ 의 호환성 사본 경로가 기록되므로 (utils._process_detection)
+   그 날짜의 screenshots/ 파일도 같은 alerts tar 에 넣는다.
+   로그 행은 유지하되 screenshot_available 을 해제하고 썸네일 경로를 비우며 screenshot_archived 를 설정한다
+   (썸네일은 압축하지 않음 - 썸네일 요청 시 read_archived_log_screenshot 으로 원본을 꺼내 만든다).
+3. 삭제 (delete): 보관 기간이 지난 로그 행을 RETENTION_BATCH_SIZE 건씩 지우고 (청크마다 짧은 트랜잭션,
+   청크 사이 RETENTION_BATCH_PAUSE 초 대기로 탐지 스레드의 INSERT 가 끼어들 수 있게 함)
+   행이 가리키던 스크린샷/썸네일/더 이상 참조되지 않는 클립 파일과 기간이 지난 날짜의 폴더/screenshots/ 파일/tar 를 지운다.
+
+보관 기간은 경고 여부별 RETENTION_DAYS 를 기본으로 하고, RETENTION_LABEL_DAYS 에 있는 라벨
+(DetectionLog.detected_object = TargetLabel.display_name) 은 경고 여부와 관계없이 그 기간을 쓴다.
+"""
+import json
+import logging
+import os
+import shutil
+import tarfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('CCTV.screenshots')
+
+CLASS_ALERT = 'alert'
+CLASS_NORMAL = 'normal'
+# 보관 구분 → all_detections 하위 폴더 이름 (utils._save_all_detection_screenshot)
+CLASS_DIRECTORIES = {CLASS_ALERT: 'alerts', CLASS_NORMAL: 'normal'}
+
+# 경고 여부별 로그/스크린샷 보관 일수
+RETENTION_DAYS = getattr(settings, 'CCTV_RETENTION_DAYS', {CLASS_NORMAL: 7, CLASS_ALERT: 180})
+# 라벨(표시 이름)별 보관 일수 - 경고 여부별 기간보다 우선
+RETENTION_LABEL_DAYS = getattr(settings, 'CCTV_RETENTION_LABEL_DAYS', {})
+# 이 일수보다 오래된 스크린샷 날짜 폴더를 tar 로 압축 (0 이면 압축 안 함)
+ARCHIVE_AFTER_DAYS = getattr(settings, 'CCTV_RETENTION_ARCHIVE_AFTER_DAYS', 2)
+# 백그라운드 보관 정책 실행 주기 (초, 0 이면 끔)
+RETENTION_INTERVAL = getattr(settings, 'CCTV_RETENTION_INTERVAL', 6 * 3600)
+# 한 트랜잭션에서 지울 로그 수, 청크 사이 대기 시간 (초)
+RETENTION_BATCH_SIZE = 500
+RETENTION_BATCH_PAUSE = 0.05
+
+DAY_FORMAT = '%Y%m%d'
+THUMBNAIL_MARKER = '.thumb.'
+
+
+def get_screenshot_dir():
+    """경고 스크린샷 호환성 사본 폴더 (utils._save_screenshot_with_boxes, 파일명 <카메라ID>_YYYYMMDD_HHMMSS_<라벨>.jpg)"""
+    return os.path.join(settings.MEDIA_ROOT, 'screenshots')
+
+
+def get_archive_root():
+    return os.path.join(settings.MEDIA_ROOT, 'archive', 'all_detections')
+
+
+def get_archive_paths(retention_class, day):
+    """(tar 경로, 인덱스 경로)"""
+    base = os.path.join(get_archive_root(), CLASS_DIRECTORIES[retention_class], day)
+    return f"{base}.tar", f"{base}.index.json"
+
+
+def _class_days(retention_class):
+    return RETENTION_DAYS.get(retention_class, RETENTION_DAYS.get(CLASS_NORMAL, 7))
+
+
+def _directory_retention_days(retention_class):
+    """날짜 폴더/tar 는 모든 라벨이 섞여 있으므로 가장 긴 라벨 기간까지 유지"""
+    return max([_class_days(retention_class), *RETENTION_LABEL_DAYS.values()])
+
+
+def _day_directories(retention_class, older_than):
+    """all_detections/<구분>/ 아래 older_than(date) 보다 오래된 (날짜 문자열, 경로) 목록"""
+    root = os.path.join(settings.MEDIA_ROOT, 'all_detections', CLASS_DIRECTORIES[retention_class])
+    try:
+        with os.scandir(root) as entries:
+            names = sorted(entry.name for entry in entries if entry.is_dir())
+    except OSError:
+        return []
+
+    days = []
+    for name in names:
+        try:
+            day = datetime.strptime(name, DAY_FORMAT).date()
+        except ValueError:
+            continue
+        if day < older_than:
+            days.append((name, os.path.join(root, name)))
+    return days
+
+
+def _flat_screenshot_days(older_than):
+    """screenshots/ 아래 older_than(date) 보다 오래된 파일 {날짜 문자열: [경로, ...]} (썸네일 포함)"""
+    root = get_screenshot_dir()
+    try:
+        with os.scandir(root) as entries:
+            names = sorted(entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return {}
+
+    days = {}
+    for name in names:
+        parts = name.split('_')
+        if len(parts) < 3:
+            continue
+        try:
+            day = datetime.strptime(parts[1], DAY_FORMAT).date()
+        except ValueError:
+            continue
+        if day < older_than:
+            days.setdefault(parts[1], []).append(os.path.join(root, name))
+    return days
+
+
+def _logs_by_path(paths):
+    """스크린샷 경로가 paths 중 하나인 로그 [(id, 경로), ...] (SQLite 변수 개수 제한 때문에 나눠서 조회)"""
+    from .models import DetectionLog
+
+    paths = list(paths)
+    logs = []
+    for start in range(0, len(paths), RETENTION_BATCH_SIZE):
+        logs.extend(
+            DetectionLog.objects.filter(screenshot_path__in=paths[start:start + RETENTION_BATCH_SIZE])
+            .values_list('id', 'screenshot_path')
+        )
+    return logs
+
+
+def _load_index(index_path):
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _remove_file(path):
+    if not path:
+        return False
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning("보관 정리 파일 삭제 실패 (%s): %s", path, e)
+        return False
+
+
+def get_expired_querysets(now=None):
+    """보관 기간이 지난 로그 queryset 목록 [(정책 이름, queryset), ...]"""
+    from .models import DetectionLog
+
+    now = now or timezone.now()
+    querysets = []
+    for label, days in RETENTION_LABEL_DAYS.items():
+        querysets.append((
+            f"label:{label}",
+            DetectionLog.objects.filter(detected_object=label, detected_at__lt=now - timedelta(days=days)),
+        ))
+    for retention_class in (CLASS_NORMAL, CLASS_ALERT):
+        querysets.append((
+            retention_class,
+            DetectionLog.objects.filter(
+                has_alert=(retention_class == CLASS_ALERT),
+                detected_at__lt=now - timedelta(days=_class_days(retention_class)),
+            ).exclude(detected_object__in=list(RETENTION_LABEL_DAYS)),
+        ))
+    return querysets
+
+
+def delete_expired_logs(now=None, batch_size=RETENTION_BATCH_SIZE, dry_run=False):
+    """
+    보관 기간이 지난 로그와 그 파일을 청크 단위로 삭제
+
+    Returns:
+        {'policies': {정책 이름: 삭제 건수}, 'deleted_logs', 'deleted_files'}
+    """
+    from .models import DetectionLog
+
+    stats = {'policies': {}, 'deleted_logs': 0, 'deleted_files': 0}
+    for name, queryset in get_expired_querysets(now):
+        if dry_run:
+            stats['policies'][name] = queryset.count()
+            stats['deleted_logs'] += stats['policies'][name]
+            continue
+
+        deleted = 0
+        while True:
+            batch = list(
+                queryset.order_by('id').values_list('id', 'screenshot_path', 'thumbnail_path', 'clip_path')[:batch_size]
+            )
+            if not batch:
+                break
+
+            # 행을 먼저 지워 목록에서 깨진 이미지가 보이지 않게 한다 (파일이 남으면 다음 실행/폴더 정리에서 삭제)
+            DetectionLog.objects.filter(id__in=[row[0] for row in batch]).delete()
+            deleted += len(batch)
+
+            for _, screenshot_path, thumbnail_path, _ in batch:
+                stats['deleted_files'] += _remove_file(screenshot_path) + _remove_file(thumbnail_path)
+
+            # 클립은 한 이벤트의 여러 로그가 공유하므로 남은 참조가 없을 때만 삭제
+            clip_paths = {row[3] for row in batch if row[3]}
+            if clip_paths:
+                referenced = set(
+                    DetectionLog.objects.filter(clip_path__in=clip_paths).values_list('clip_path', flat=True)
+                )
+                for clip_path in clip_paths - referenced:
+                    stats['deleted_files'] += _remove_file(clip_path)
+
+            if len(batch) < batch_size:
+                break
+            time.sleep(RETENTION_BATCH_PAUSE)
+
+        stats['policies'][name] = deleted
+        stats['deleted_logs'] += deleted
+    return stats
+
+
+def archive_day_directory(retention_class, day, directory, extra_files=()):
+    """
+    날짜 폴더(와 extra_files)를 tar + 인덱스로 압축하고 원본 삭제 → 압축한 파일 수
+
+    directory 는 없을 수 있다 (None). 같은 날짜의 tar 가 이미 있으면 기존 멤버와 인덱스를 이어 붙인다.
+    tar 는 임시 이름으로 쓴 뒤 교체하므로 중간에 중단되어도 원본이 그대로 남아 다음 실행에서 다시 시도한다.
+    """
+    from .models import DetectionLog
+    from .screenshots import mark_screenshots_missing
+
+    tar_path, index_path = get_archive_paths(retention_class, day)
+    os.makedirs(os.path.dirname(tar_path), exist_ok=True)
+    media_root = str(settings.MEDIA_ROOT)
+
+    paths = []
+    if directory:
+        for dirpath, _, filenames in os.walk(directory):
+            paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames))
+    paths.extend(extra_files)
+    # 썸네일은 압축하지 않고 원본과 함께 지움
+    thumbnails = [path for path in paths if THUMBNAIL_MARKER in os.path.basename(path)]
+
+    previous = _load_index(index_path) if os.path.exists(tar_path) else None
+    members = {}
+    partial_path = f"{tar_path}.partial"
+    with tarfile.open(partial_path, 'w') as archive:
+        if previous is not None:
+            with tarfile.open(tar_path) as existing:
+                for member in existing.getmembers():
+                    archive.addfile(member, existing.extractfile(member))
+        for path in paths:
+            if THUMBNAIL_MARKER in os.path.basename(path):
+                continue
+            member = os.path.relpath(path, media_root).replace(os.sep, '/')
+            archive.add(path, arcname=member)
+            members[path] = member
+
+    log_members = {str(log_id): members[path] for log_id, path in _logs_by_path(members)}
+    index = {
+        'class': retention_class,
+        'day': day,
+        'created_at': timezone.now().isoformat(),
+        'files': sorted(set(previous['files'] if previous else []) | set(members.values())),
+        'logs': {**(previous['logs'] if previous else {}), **log_members},
+    }
+    with open(f"{index_path}.partial", 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(f"{index_path}.partial", index_path)
+    os.replace(partial_path, tar_path)
+
+    # 파일을 지우기 전에 플래그를 내려 목록이 없는 파일을 가리키지 않게 한다
+    log_ids = [int(log_id) for log_id in log_members]
+    for start in range(0, len(log_ids), RETENTION_BATCH_SIZE):
+        batch = log_ids[start:start + RETENTION_BATCH_SIZE]
+        mark_screenshots_missing(batch)
+        DetectionLog.objects.filter(id__in=batch).update(thumbnail_path=None, screenshot_archived=True)
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+    for path in extra_files:
+        _remove_file(path)
+
+    logger.info(
+        "스크린샷 압축: %s → %s (파일 %s개, 썸네일 삭제 %s개, 로그 %s개)",
+        directory or day, tar_path, len(members), len(thumbnails), len(log_ids),
+    )
+    return len(members)
+
+
+def read_archived_screenshot(log_id, retention_class, day):
+    """압축된 로그 스크린샷 바이트 (없으면 None)"""
+    tar_path, index_path = get_archive_paths(retention_class, day)
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            member = json.load(f)['logs'].get(str(log_id))
+        if member is None:
+            return None
+        with tarfile.open(tar_path) as archive:
+            return archive.extractfile(member).read()
+    except (OSError, KeyError, ValueError, tarfile.TarError):
+        return None
+
+
+def read_archived_log_screenshot(log):
+    """
+    로그의 압축된 스크린샷 바이트 (없으면 None)
+
+    폴더 날짜는 파일 저장 시각, detected_at 은 그 직후 로그 생성 시각이므로 자정 직후 로그는 전날 tar 도 확인한다.
+    """
+    retention_class = CLASS_ALERT if log.has_alert else CLASS_NORMAL
+    detected_day = timezone.localtime(log.detected_at).date()
+    for day in (detected_day, detected_day - timedelta(days=1)):
+        data = read_archived_screenshot(log.id, retention_class, day.strftime(DAY_FORMAT))
+        if data is not None:
+            return data
+    return None
+
+
+def archive_old_days(dry_run=False):
+    """ARCHIVE_AFTER_DAYS 보다 오래된 (삭제 기간 이내) 날짜 폴더 압축 → {'archived_days', 'archived_files'}"""
+    stats = {'archived_days': 0, 'archived_files': 0}
+    if ARCHIVE_AFTER_DAYS <= 0:
+        return stats
+
+    today = datetime.now().date()
+    archive_before = today - timedelta(days=ARCHIVE_AFTER_DAYS)
+    for retention_class in CLASS_DIRECTORIES:
+        expire_before = today - timedelta(days=_directory_retention_days(retention_class))
+        days = dict(_day_directories(retention_class, archive_before))
+        flat_days = _flat_screenshot_days(archive_before) if retention_class == CLASS_ALERT else {}
+        for day in sorted(set(days) | set(flat_days)):
+            if datetime.strptime(day, DAY_FORMAT).date() < expire_before:
+                continue  # 곧 purge_expired_days 가 지움
+            stats['archived_days'] += 1
+            if dry_run:
+                continue
+            try:
+                stats['archived_files'] += archive_day_directory(
+                    retention_class, day, days.get(day), flat_days.get(day, ())
+                )
+            except (OSError, tarfile.TarError) as e:
+                logger.error("스크린샷 압축 실패 (%s/%s): %s", CLASS_DIRECTORIES[retention_class], day, e)
+    return stats
+
+
+def purge_expired_days(dry_run=False):
+    """모든 라벨의 보관 기간이 지난 날짜 폴더, screenshots/ 파일, tar/인덱스 삭제 → {'purged_days'}"""
+    today = datetime.now().date()
+    purged = 0
+    for retention_class, directory_name in CLASS_DIRECTORIES.items():
+        expire_before = today - timedelta(days=_directory_retention_days(retention_class))
+        days = {day: directory for day, directory in _day_directories(retention_class, expire_before)}
+
+        archive_dir = os.path.join(get_archive_root(), directory_name)
+        try:
+            with os.scandir(archive_dir) as entries:
+                archived = {entry.name.split('.', 1)[0] for entry in entries if entry.is_file()}
+        except OSError:
+            archived = set()
+        for day in archived:
+            try:
+                if datetime.strptime(day, DAY_FORMAT).date() < expire_before:
+                    days.setdefault(day, None)
+            except ValueError:
+                continue
+
+        flat_days = _flat_screenshot_days(expire_before) if retention_class == CLASS_ALERT else {}
+        for day in flat_days:
+            days.setdefault(day, None)
+
+        for day, directory in sorted(days.items()):
+            purged += 1
+            if dry_run:
+                continue
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+            for path in [*flat_days.get(day, ()), *get_archive_paths(retention_class, day)]:
+                _remove_file(path)
+    return {'purged_days': purged}
+
+
+def apply_retention(batch_size=RETENTION_BATCH_SIZE, dry_run=False, archive=True):
+    """보관 정책 전체 실행: 로그 삭제 → 기간 지난 날짜 삭제 → 오래된 날짜 압축"""
+    started = time.time()
+    stats = delete_expired_logs(batch_size=batch_size, dry_run=dry_run)
+    stats.update(purge_expired_days(dry_run=dry_run))
+    stats.update(archive_old_days(dry_run=dry_run) if archive else {'archived_days': 0, 'archived_files': 0})
+    stats['seconds'] = round(time.time() - started, 2)
+    return stats
+
+
+class RetentionWorker:
+    """RETENTION_INTERVAL 마다 apply_retention 실행하는 백그라운드 스레드"""
+
+    def __init__(self, interval=RETENTION_INTERVAL):
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_stats = None
+        self.last_run_at = None
+
+    def start(self):
+        if self.interval <= 0 or (self.thread and self.thread.is_alive()):
+            return False
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="RetentionWorker", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.last_stats = apply_retention()
+                self.last_run_at = time.time()
+                logger.info("보관 정책 실행: %s", self.last_stats)
+            except Exception as e:
+                logger.exception("보관 정책 실행 오류: %s", e)
+
+    def get_status(self):
+        return {
+            'interval': self.interval,
+            'running': bool(self.thread and self.thread.is_alive()),
+            'retention_days': RETENTION_DAYS,
+            'label_retention_days': RETENTION_LABEL_DAYS,
+            'archive_after_days': ARCHIVE_AFTER_DAYS,
+            'last_run_at': self.last_run_at,
+            'last_stats': self.last_stats,
+        }
+
+
+# 싱글톤 인스턴스
+retention_worker = RetentionWorker()
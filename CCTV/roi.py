@@ -0,0 +1,89 @@
+# CCTV/roi.py
+"""
+관심 영역(ROI) 기반 부분 추론 헬퍼
+
+- ROI 폴리곤(비율 좌표)의 바운딩 박스만 잘라 YOLO 에 넣고
+- 잘린 영역 크기에 비례해 imgsz 를 줄이며 (32 배수, 최소 ROI_MIN_IMGSZ)
+- 결과 박스를 원본 좌표로 되돌린 뒤 폴리곤 밖의 박스는 CLIP 전에 버린다.
+"""
+import math
+
+import numpy as np
+
+# ROI 크롭 추론 시 최소 입력 크기
+ROI_MIN_IMGSZ = 320
+# ROI 바운딩 박스 여백 (프레임 대비 비율) - 경계에 걸친 사람도 잘리지 않도록
+ROI_CROP_PADDING = 0.05
+
+
+def get_roi_points(camera):
+    """카메라의 활성 ROI 꼭짓점 (없거나 비활성/무효면 None)"""
+    from .models import CameraROI
+
+    try:
+        roi = camera.roi
+    except CameraROI.DoesNotExist:
+        return None
+    if not roi.is_active:
+        return None
+    points = roi.get_points()
+    return points if len(points) >= 3 else None
+
+
+def to_pixel_polygon(points, frame_shape):
+    """비율 좌표 → 픽셀 좌표 (N, 2) float 배열"""
+    frame_h, frame_w = frame_shape[:2]
+    return np.array([[x * frame_w, y * frame_h] for x, y in points], dtype=np.float32)
+
+
+def get_crop_region(polygon, frame_shape, padding=ROI_CROP_PADDING):
+    """폴리곤 바운딩 박스 + 여백 (x1, y1, x2, y2) 정수 픽셀 좌표"""
+    frame_h, frame_w = frame_shape[:2]
+    pad_x = frame_w * padding
+    pad_y = frame_h * padding
+    x1 = max(0, int(polygon[:, 0].min() - pad_x))
+    y1 = max(0, int(polygon[:, 1].min() - pad_y))
+    x2 = min(frame_w, int(math.ceil(polygon[:, 0].max() + pad_x)))
+    y2 = min(frame_h, int(math.ceil(polygon[:, 1].max() + pad_y)))
+    return x1, y1, x2, y2
+
+
+def get_crop_imgsz(crop_region, frame_shape, full_imgsz, min_imgsz=ROI_MIN_IMGSZ):
+    """
+    크롭 영역에 맞는 imgsz
+
+    전체 프레임을 full_imgsz 로 넣을 때와 같은 픽셀 밀도를 유지하도록
+    크롭의 긴 변 비율만큼 줄인다 (32 배수 올림, min_imgsz ~ full_imgsz).
+    """
+    frame_h, frame_w = frame_shape[:2]
+    x1, y1, x2, y2 = crop_region
+    scale = max((x2 - x1) / frame_w, (y2 - y1) / frame_h)
+    imgsz = int(math.ceil(full_imgsz * scale / 32.0) * 32)
+    return max(min_imgsz, min(full_imgsz, imgsz))
+
+
+def point_in_polygon(x, y, polygon):
+    """ray casting 방식 점-폴리곤 포함 판정"""
+    inside = False
+    count = len(polygon)
+    j = count - 1
+    for i in range(count):
+        xi, yi = polygon[i]
+        xj, yj = polygon[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def boxes_in_polygon(boxes, polygon):
+    """
+    박스별 ROI 포함 여부 (bool 배열)
+
+    박스 중심 또는 하단 중앙(발 위치)이 폴리곤 안에 있으면 포함으로 본다.
+    """
+    mask = np.zeros(len(boxes), dtype=bool)
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        cx = (x1 + x2) / 2
+        mask[i] = point_in_polygon(cx, (y1 + y2) / 2, polygon) or point_in_polygon(cx, y2, polygon)
+    return mask
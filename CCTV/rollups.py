@@ -0,0 +1,184 @@
+# CCTV/rollups.py
+"""
+탐지 집계 (카메라 × 라벨 × 시간/일)
+
+"카메라별 시간당 X 탐지 수" 같은 질의를 DetectionLog 스캔 없이 답하기 위해
+로그 저장 시 HourlyDetectionRollup / DailyDetectionRollup 행을 F() 증분으로 갱신한다.
+집계 API 와 대시보드 위젯은 집계 테이블만 읽으므로 원본 로그가 늘어나거나 보관 정책으로
+삭제되어도 몇 달치 추이를 버킷 수만큼의 행으로 조회한다.
+
+집계 시간대는 settings.TIME_ZONE 기준이다. 집계가 어긋나면(기존 로그, 수동 삭제 등)
+python manage.py rebuild_rollups 로 원본 로그가 남아 있는 기간을 다시 계산한다.
+"""
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+GRANULARITY_HOUR = 'hour'
+GRANULARITY_DAY = 'day'
+# 단위별 (기본 조회 범위, 최대 조회 범위) - 버킷 개수
+RANGE_LIMITS = {
+    GRANULARITY_HOUR: (48, 24 * 31),
+    GRANULARITY_DAY: (30, 366 * 2),
+}
+
+
+def _rollup_models():
+    from .models import DailyDetectionRollup, HourlyDetectionRollup
+
+    return {GRANULARITY_HOUR: HourlyDetectionRollup, GRANULARITY_DAY: DailyDetectionRollup}
+
+
+def get_buckets(detected_at):
+    """탐지 시각 → {단위: 버킷} (현재 시간대의 정시 / 날짜)"""
+    local = timezone.localtime(detected_at)
+    return {
+        GRANULARITY_HOUR: local.replace(minute=0, second=0, microsecond=0),
+        GRANULARITY_DAY: local.date(),
+    }
+
+
+def _upsert(model, camera_id, label, bucket, detections, alerts, objects, confidence_sum):
+    """(camera, label, bucket) 행에 증분 더하기 - 없으면 생성, 동시 생성 충돌 시 다시 증분"""
+    increments = {
+        'detection_count': F('detection_count') + detections,
+        'alert_count': F('alert_count') + alerts,
+        'object_count': F('object_count') + objects,
+        'confidence_sum': F('confidence_sum') + confidence_sum,
+    }
+    rows = model.objects.filter(camera_id=camera_id, label=label, bucket=bucket)
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(
+                camera_id=camera_id, label=label, bucket=bucket, detection_count=detections,
+                alert_count=alerts, object_count=objects, confidence_sum=confidence_sum,
+            )
+    except IntegrityError:
+        rows.update(**increments)
+
+
+def record_detection(log):
+    """새 DetectionLog 를 시간/일 집계에 반영 (탐지 스레드에서 로그 저장 직후 호출)"""
+    for granularity, bucket in get_buckets(log.detected_at).items():
+        _upsert(
+            _rollup_models()[granularity], log.camera_id, log.detected_object, bucket,
+            1, int(log.has_alert), log.object_count, log.confidence,
+        )
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, dt_time.min))
+
+
+def rebuild_rollups(since=None):
+    """
+    since 이후 (없으면 전체) 집계를 원본 로그에서 다시 계산
+
+    보관 정책으로 로그가 삭제된 기간은 다시 계산할 수 없으므로 since 를 로그가 남아 있는 기간으로 지정한다.
+
+    Returns:
+        {단위: 생성한 집계 행 수}
+    """
+    from .models import DetectionLog
+
+    stats = {}
+    truncs = {GRANULARITY_HOUR: TruncHour('detected_at'), GRANULARITY_DAY: TruncDate('detected_at')}
+    for granularity, model in _rollup_models().items():
+        logs = DetectionLog.objects.all()
+        rollups = model.objects.all()
+        if since is not None:
+            start = get_buckets(since)[granularity]
+            logs = logs.filter(detected_at__gte=start if granularity == GRANULARITY_HOUR else _day_start(start))
+            rollups = rollups.filter(bucket__gte=start)
+
+        rows = (
+            logs.annotate(bucket=truncs[granularity])
+            .values('camera_id', 'detected_object', 'bucket')
+            .annotate(
+                detections=Count('id'),
+                alerts=Count('id', filter=Q(has_alert=True)),
+                objects=Sum('object_count'),
+                confidences=Sum('confidence'),
+            )
+            .order_by()
+        )
+        new_rollups = [
+            model(
+                camera_id=row['camera_id'], label=row['detected_object'], bucket=row['bucket'],
+                detection_count=row['detections'], alert_count=row['alerts'],
+                object_count=row['objects'] or 0, confidence_sum=row['confidences'] or 0.0,
+            )
+            for row in rows
+        ]
+        with transaction.atomic():
+            rollups.delete()
+            model.objects.bulk_create(new_rollups, batch_size=1000)
+        stats[granularity] = len(new_rollups)
+    return stats
+
+
+def get_detection_stats(granularity=GRANULARITY_HOUR, periods=None, camera_id=None, label=None, now=None):
+    """
+    최근 periods 개 버킷의 탐지 추이 + 라벨/카메라별 합계 (집계 테이블만 조회)
+
+    Returns:
+        {'granularity', 'start', 'end', 'series': [{'bucket', 'detections', 'alerts', 'objects'}, ...],
+         'by_label': [...], 'by_camera': [...]}
+    """
+    default_periods, max_periods = RANGE_LIMITS[granularity]
+    periods = max(1, min(periods or default_periods, max_periods))
+    current = get_buckets(now or timezone.now())[granularity]
+    if granularity == GRANULARITY_HOUR:
+        buckets = [current - timedelta(hours=offset) for offset in range(periods - 1, -1, -1)]
+    else:
+        buckets = [current - timedelta(days=offset) for offset in range(periods - 1, -1, -1)]
+
+    rollups = _rollup_models()[granularity].objects.filter(bucket__gte=buckets[0], bucket__lte=buckets[-1])
+    if camera_id:
+        rollups = rollups.filter(camera_id=camera_id)
+    if label:
+        rollups = rollups.filter(label=label)
+
+    totals = {
+        'detections': Sum('detection_count'),
+        'alerts': Sum('alert_count'),
+        'objects': Sum('object_count'),
+        'confidence_sum': Sum('confidence_sum'),
+    }
+    by_bucket = {row['bucket']: row for row in rollups.values('bucket').annotate(**totals).order_by()}
+    series = []
+    for bucket in buckets:
+        row = by_bucket.get(bucket, {})
+        series.append({
+            'bucket': bucket.isoformat(),
+            'detections': row.get('detections') or 0,
+            'alerts': row.get('alerts') or 0,
+            'objects': row.get('objects') or 0,
+        })
+
+    def _with_average(row):
+        confidence_sum = row.pop('confidence_sum') or 0.0
+        row['avg_confidence'] = round(confidence_sum / row['detections'], 4) if row['detections'] else None
+        return row
+
+    by_label = [
+        _with_average(row)
+        for row in rollups.values('label').annotate(**totals).order_by('-detections')
+    ]
+    by_camera = [
+        _with_average(row)
+        for row in rollups.values('camera_id', camera_name=F('camera__name')).annotate(**totals).order_by('-detections')
+    ]
+    return {
+        'granularity': granularity,
+        'start': series[0]['bucket'],
+        'end': series[-1]['bucket'],
+        'series': series,
+        'by_label': by_label,
+        'by_camera': by_camera,
+    }
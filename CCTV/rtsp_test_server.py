@@ -0,0 +1,401 @@
+# CCTV/rtsp_test_server.py
+"""
+테스트용 로컬 합성 RTSP 서버 (CCTV/tests.py 의 수집 스트레스 테스트 fixture)
+
+외부 바이너리(ffmpeg, mediamtx 등) 없이 표준 라이브러리 + OpenCV 만으로
+RTSP(RFC 2326) + RTP/JPEG(RFC 2435, TCP interleaved) 스트림을 제공한다.
+경로마다 독립 세션이므로 한 서버로 여러 카메라를 시뮬레이션할 수 있다.
+    rtsp://127.0.0.1:<port>/cam0, /cam1, ...
+
+설정/제어
+    fps, width, height : 스트림 FPS 와 해상도 (16 배수, 최대 2032)
+    packet_loss        : RTP 패킷 손실률 (0.0-1.0, 손실된 프레임은 디코딩 오류로 나타남)
+    disconnect_all()   : 모든 세션 소켓 강제 종료 (카메라 재부팅/네트워크 단절)
+    set_available()    : False 인 동안 새 연결을 즉시 끊음 (장시간 장애)
+
+    with running_rtsp_server(fps=10, width=640, height=360) as server:
+        url = server.url('cam0')
+"""
+import random
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+# RTP 페이로드 타입 (JPEG, RFC 3551)
+RTP_PAYLOAD_JPEG = 26
+# RTP 패킷당 최대 크기 (바이트)
+RTP_MAX_PACKET = 1400
+# 미리 렌더링해 반복 재생할 프레임 수
+SYNTHETIC_LOOP_FRAMES = 50
+
+
+class JpegFrame:
+    """RFC 2435 전송에 필요한 JPEG 구성 요소"""
+
+    def __init__(self, jpeg_type, width, height, qtables, scan):
+        self.jpeg_type = jpeg_type  # 0: 4:2:2, 1: 4:2:0
+        self.width = width
+        self.height = height
+        self.qtables = qtables  # 휘도 + 색차 양자화 테이블 (각 64바이트, zig-zag 순서)
+        self.scan = scan  # 엔트로피 부호화 데이터 (SOS 헤더 이후 ~ EOI 이전)
+
+
+def parse_jpeg(data):
+    """baseline JPEG → JpegFrame (restart marker / 16비트 양자화 테이블 미지원)"""
+    qtables = {}
+    jpeg_type = width = height = None
+    pos = 2  # SOI 다음
+    while pos < len(data) - 1:
+        if data[pos] != 0xFF:
+            raise ValueError("잘못된 JPEG 마커 위치")
+        marker = data[pos + 1]
+        pos += 2
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            continue
+        length = int.from_bytes(data[pos:pos + 2], 'big')
+        segment = data[pos + 2:pos + length]
+
+        if marker == 0xDB:  # DQT
+            index = 0
+            while index < len(segment):
+                precision, table_id = segment[index] >> 4, segment[index] & 0x0F
+                if precision:
+                    raise ValueError("16비트 양자화 테이블은 지원하지 않음")
+                qtables[table_id] = bytes(segment[index + 1:index + 65])
+                index += 65
+        elif marker == 0xC0:  # SOF0
+            height = int.from_bytes(segment[1:3], 'big')
+            width = int.from_bytes(segment[3:5], 'big')
+            sampling = (segment[7] >> 4, segment[7] & 0x0F)
+            jpeg_type = {(2, 1): 0, (2, 2): 1}.get(sampling)
+            if jpeg_type is None:
+                raise ValueError(f"지원하지 않는 크로마 서브샘플링: {sampling}")
+        elif marker == 0xDD:  # DRI
+            raise ValueError("restart marker 는 지원하지 않음")
+        elif marker == 0xDA:  # SOS
+            end = data.rfind(b'\xff\xd9')
+            scan = bytes(data[pos + length:end if end > 0 else len(data)])
+            if jpeg_type is None or 0 not in qtables or 1 not in qtables:
+                raise ValueError("SOF0/DQT 가 없는 JPEG")
+            return JpegFrame(jpeg_type, width, height, qtables[0] + qtables[1], scan)
+        pos += length
+    raise ValueError("SOS 가 없는 JPEG")
+
+
+def packetize_jpeg(frame, seq, timestamp, ssrc, max_packet=RTP_MAX_PACKET):
+    """
+    JpegFrame → RTP 패킷 리스트 (RFC 2435, Q=255 + 인밴드 양자화 테이블)
+
+    Returns:
+        (packets, 다음 sequence number)
+    """
+    packets = []
+    offset = 0
+    quant_header = bytes([0, 0]) + len(frame.qtables).to_bytes(2, 'big') + frame.qtables
+    while offset < len(frame.scan):
+        jpeg_header = (
+            bytes([0]) + offset.to_bytes(3, 'big')
+            + bytes([frame.jpeg_type, 255, frame.width // 8, frame.height // 8])
+        )
+        extra = quant_header if offset == 0 else b''
+        chunk = frame.scan[offset:offset + max_packet - 12 - len(jpeg_header) - len(extra)]
+        offset += len(chunk)
+        marker = 0x80 if offset >= len(frame.scan) else 0
+        rtp_header = (
+            bytes([0x80, marker | RTP_PAYLOAD_JPEG])
+            + (seq & 0xFFFF).to_bytes(2, 'big')
+            + (timestamp & 0xFFFFFFFF).to_bytes(4, 'big')
+            + ssrc.to_bytes(4, 'big')
+        )
+        packets.append(rtp_header + jpeg_header + extra + chunk)
+        seq += 1
+    return packets, seq
+
+
+def render_synthetic_frames(width, height, count=SYNTHETIC_LOOP_FRAMES, quality=80):
+    """움직이는 사각형 + 프레임 번호가 있는 합성 프레임을 JpegFrame 리스트로"""
+    gradient = np.tile(np.linspace(40, 120, width, dtype=np.uint8), (height, 1))
+    frames = []
+    for index in range(count):
+        image = cv2.merge([gradient, gradient, np.full_like(gradient, 60)])
+        box_w, box_h = max(16, width // 10), max(32, height // 3)
+        x = int((width - box_w) * index / max(1, count - 1))
+        y = (height - box_h) // 2
+        cv2.rectangle(image, (x, y), (x + box_w, y + box_h), (230, 230, 230), -1)
+        cv2.putText(image, f"#{index:03d}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ok:
+            raise RuntimeError("합성 프레임 JPEG 인코딩 실패")
+        frames.append(parse_jpeg(encoded.tobytes()))
+    return frames
+
+
+class _RtspSession(threading.Thread):
+    """클라이언트 연결 1개 (RTSP 요청 처리 + PLAY 후 RTP 송신)"""
+
+    def __init__(self, server, sock, address):
+        super().__init__(daemon=True, name=f"RtspSession-{address[1]}")
+        self.server = server
+        self.sock = sock
+        self.reader = sock.makefile('rb')
+        self.send_lock = threading.Lock()
+        self.session_id = f"{random.getrandbits(32):08x}"
+        self.ssrc = random.getrandbits(32)
+        self.seq = random.getrandbits(16)
+        self.closed = threading.Event()
+        self.sender = None
+
+    def run(self):
+        try:
+            while not self.closed.is_set():
+                request = self._read_request()
+                if request is None:
+                    break
+                self._handle(*request)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.server._remove_session(self)
+
+    def _read_request(self):
+        """RTSP 요청 1개 → (method, uri, headers) - 인터리브된 RTCP 는 건너뜀"""
+        while True:
+            first = self.reader.read(1)
+            if not first:
+                return None
+            if first == b'$':
+                header = self.reader.read(3)
+                if len(header) < 3:
+                    return None
+                self.reader.read(int.from_bytes(header[1:3], 'big'))
+                continue
+            if first in (b'\r', b'\n'):
+                continue
+            break
+
+        request_line = (first + self.reader.readline()).decode('utf-8', 'replace').strip()
+        headers = {}
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.decode('utf-8', 'replace').strip()
+            if not line:
+                break
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0) or 0)
+        if length:
+            self.reader.read(length)
+
+        method, uri, _ = (request_line.split(' ') + ['', ''])[:3]
+        return method.upper(), uri, headers
+
+    def _send(self, data):
+        with self.send_lock:
+            self.sock.sendall(data)
+
+    def _respond(self, headers, status=200, reason='OK', extra=None, body=b''):
+        lines = [f"RTSP/1.0 {status} {reason}", f"CSeq: {headers.get('cseq', '0')}", "Server: CCTV-synthetic"]
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        self._send(('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body)
+
+    def _handle(self, method, uri, headers):
+        base_uri = uri.split('?', 1)[0].rstrip('/')
+        session = {'Session': f"{self.session_id};timeout=60"}
+
+        if method == 'OPTIONS':
+            self._respond(headers, extra={'Public': 'OPTIONS, DESCRIBE, SETUP, PLAY, TEARDOWN, GET_PARAMETER'})
+        elif method == 'DESCRIBE':
+            sdp = (
+                "v=0\r\n"
+                f"o=- {self.session_id} 1 IN IP4 {self.server.host}\r\n"
+                "s=CCTV synthetic stream\r\n"
+                "c=IN IP4 0.0.0.0\r\n"
+                "t=0 0\r\n"
+                f"m=video 0 RTP/AVP {RTP_PAYLOAD_JPEG}\r\n"
+                f"a=rtpmap:{RTP_PAYLOAD_JPEG} JPEG/90000\r\n"
+                f"a=framerate:{self.server.fps}\r\n"
+                "a=control:track1\r\n"
+            ).encode('utf-8')
+            self._respond(
+                headers,
+                extra={'Content-Base': f"{base_uri}/", 'Content-Type': 'application/sdp'},
+                body=sdp,
+            )
+        elif method == 'SETUP':
+            # UDP 는 지원하지 않음 → 461 을 받으면 FFmpeg 는 TCP 로 다시 시도
+            if 'TCP' not in headers.get('transport', '').upper():
+                self._respond(headers, status=461, reason='Unsupported Transport')
+                return
+            self._respond(headers, extra={**session, 'Transport': 'RTP/AVP/TCP;unicast;interleaved=0-1'})
+        elif method == 'PLAY':
+            self._respond(headers, extra={**session, 'Range': 'npt=0.000-'})
+            if self.sender is None:
+                self.sender = threading.Thread(target=self._stream, daemon=True, name=f"{self.name}-rtp")
+                self.sender.start()
+        elif method in ('GET_PARAMETER', 'SET_PARAMETER'):
+            self._respond(headers, extra=session)
+        elif method == 'TEARDOWN':
+            self._respond(headers, extra=session)
+            self.close()
+        else:
+            self._respond(headers, status=501, reason='Not Implemented')
+
+    def _stream(self):
+        """PLAY 이후 fps 에 맞춰 RTP/JPEG 패킷 송신 (packet_loss 확률로 패킷 누락)"""
+        server = self.server
+        interval = 1.0 / server.fps
+        next_time = time.perf_counter()
+        index = 0
+        try:
+            while not self.closed.is_set():
+                frame = server.frames[index % len(server.frames)]
+                timestamp = int(index * 90000 / server.fps)
+                packets, self.seq = packetize_jpeg(frame, self.seq, timestamp, self.ssrc)
+                for packet in packets:
+                    if server.packet_loss and server.rng.random() < server.packet_loss:
+                        server.packets_dropped += 1
+                        continue
+                    self._send(b'$\x00' + len(packet).to_bytes(2, 'big') + packet)
+                server.frames_sent += 1
+                index += 1
+
+                next_time += interval
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_time = time.perf_counter()
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+
+class SyntheticRtspServer:
+    """로컬 합성 RTSP 서버"""
+
+    def __init__(self, host='127.0.0.1', port=0, fps=10, width=640, height=360,
+                 packet_loss=0.0, jpeg_quality=80, seed=None):
+        if width % 16 or height % 16 or width > 2032 or height > 2032:
+            raise ValueError("width/height 는 16 배수, 최대 2032 이어야 합니다")
+        self.host = host
+        self.port = port
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.packet_loss = packet_loss
+        self.jpeg_quality = jpeg_quality
+        self.rng = random.Random(seed)
+        self.frames = []
+        self.sessions = set()
+        self.lock = threading.Lock()
+        self.available = True
+        self.listener = None
+        self.accept_thread = None
+
+        # 통계
+        self.connections = 0
+        self.rejected = 0
+        self.frames_sent = 0
+        self.packets_dropped = 0
+
+    def start(self):
+        self.frames = render_synthetic_frames(self.width, self.height, quality=self.jpeg_quality)
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.listener.listen(128)
+        self.port = self.listener.getsockname()[1]
+        self.accept_thread = threading.Thread(target=self._accept_loop, daemon=True, name="RtspTestServer")
+        self.accept_thread.start()
+        return self
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, address = self.listener.accept()
+            except OSError:
+                break
+            if not self.available:
+                self.rejected += 1
+                sock.close()
+                continue
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            session = _RtspSession(self, sock, address)
+            with self.lock:
+                self.sessions.add(session)
+                self.connections += 1
+            session.start()
+
+    def _remove_session(self, session):
+        with self.lock:
+            self.sessions.discard(session)
+
+    def url(self, path='cam0'):
+        return f"rtsp://{self.host}:{self.port}/{path}"
+
+    @property
+    def active_sessions(self):
+        with self.lock:
+            return len(self.sessions)
+
+    def disconnect_all(self):
+        """모든 세션 강제 종료"""
+        with self.lock:
+            sessions = list(self.sessions)
+        for session in sessions:
+            session.close()
+        return len(sessions)
+
+    def set_available(self, available):
+        """False 인 동안 새 연결 거부 (기존 세션은 유지 - 필요하면 disconnect_all 과 함께 사용)"""
+        self.available = available
+
+    def stop(self):
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
+        self.disconnect_all()
+
+    def get_status(self):
+        return {
+            'url': self.url(''),
+            'fps': self.fps,
+            'resolution': f"{self.width}x{self.height}",
+            'packet_loss': self.packet_loss,
+            'active_sessions': self.active_sessions,
+            'connections': self.connections,
+            'rejected': self.rejected,
+            'frames_sent': self.frames_sent,
+            'packets_dropped': self.packets_dropped,
+        }
+
+
+@contextmanager
+def running_rtsp_server(**kwargs):
+    """with 블록 동안 SyntheticRtspServer 실행"""
+    server = SyntheticRtspServer(**kwargs).start()
+    try:
+        yield server
+    finally:
+        server.stop()
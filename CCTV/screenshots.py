@@ -0,0 +1,146 @@
+# CCTV/screenshots.py
+"""
+DetectionLog.screenshot_available 재검증
+
+목록 API 는 파일 시스템을 보지 않고 screenshot_available 플래그만 사용한다.
+플래그는 스크린샷 저장이 끝난 뒤 로그 생성 시 설정되고, 보관 정리 작업이 파일을 지우면
+mark_screenshots_missing() 으로 해제한다. 그 밖의 경로(수동 삭제, 스토리지 장애 등)로 어긋난 플래그는
+reconcile_screenshots() 가 주기적으로 바로잡는다.
+
+행마다 os.path.exists 를 호출하지 않고 디렉토리별로 한 번만 목록을 읽어(os.scandir) 비교하므로
+네트워크 스토리지에서도 디렉토리 수만큼의 요청으로 끝난다.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Max, Q
+
+logger = logging.getLogger('CCTV.screenshots')
+
+# 백그라운드 재검증 주기 (초, 0 이면 끔)
+SCREENSHOT_RECONCILE_INTERVAL = getattr(settings, 'CCTV_SCREENSHOT_RECONCILE_INTERVAL', 3600)
+# 한 번에 읽고 갱신할 로그 수
+RECONCILE_BATCH_SIZE = 2000
+
+
+def _directory_listing(directory, listings):
+    """디렉토리 파일 이름 집합 (실행 중 캐시, 없는 디렉토리는 빈 집합)"""
+    names = listings.get(directory)
+    if names is None:
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries}
+        except OSError:
+            names = set()
+        listings[directory] = names
+    return names
+
+
+def mark_screenshots_missing(log_ids):
+    """파일을 삭제한 로그의 플래그 해제 (보관 정리 작업용) → 갱신 행 수"""
+    from .models import DetectionLog
+
+    if not log_ids:
+        return 0
+    return DetectionLog.objects.filter(id__in=log_ids, screenshot_available=True).update(screenshot_available=False)
+
+
+def reconcile_screenshots(batch_size=RECONCILE_BATCH_SIZE, dry_run=False):
+    """
+    모든 로그의 screenshot_available 을 실제 파일과 비교해 갱신
+
+    Returns:
+        {'checked', 'marked_available', 'marked_missing', 'directories', 'seconds'}
+    """
+    from .models import DetectionLog
+
+    started = time.time()
+    stats = {'checked': 0, 'marked_available': 0, 'marked_missing': 0}
+    listings = {}
+    # 실행 중에 생성된 로그는 이미 읽은 디렉토리 목록에 없으므로 시작 시점까지의 로그만 검사
+    max_id = DetectionLog.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    logs = DetectionLog.objects.filter(id__lte=max_id).exclude(screenshot_path__isnull=True).exclude(screenshot_path='')
+
+    last_id = 0
+    while True:
+        batch = list(
+            logs.filter(id__gt=last_id).order_by('id')
+            .values_list('id', 'screenshot_path', 'screenshot_available')[:batch_size]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
+
+        found, missing = [], []
+        for log_id, path, available in batch:
+            exists = os.path.basename(path) in _directory_listing(os.path.dirname(path), listings)
+            if exists and not available:
+                found.append(log_id)
+            elif available and not exists:
+                missing.append(log_id)
+
+        stats['checked'] += len(batch)
+        stats['marked_available'] += len(found)
+        stats['marked_missing'] += len(missing)
+        if not dry_run:
+            if found:
+                DetectionLog.objects.filter(id__in=found).update(screenshot_available=True)
+            if missing:
+                DetectionLog.objects.filter(id__in=missing).update(screenshot_available=False)
+
+    # 경로가 없는데 플래그가 켜진 로그
+    no_path = DetectionLog.objects.filter(
+        Q(screenshot_path__isnull=True) | Q(screenshot_path=''), id__lte=max_id, screenshot_available=True
+    )
+    stats['marked_missing'] += no_path.count() if dry_run else no_path.update(screenshot_available=False)
+
+    stats['directories'] = len(listings)
+    stats['seconds'] = round(time.time() - started, 2)
+    return stats
+
+
+class ScreenshotReconciler:
+    """SCREENSHOT_RECONCILE_INTERVAL 마다 reconcile_screenshots 실행하는 백그라운드 스레드"""
+
+    def __init__(self, interval=SCREENSHOT_RECONCILE_INTERVAL):
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_stats = None
+        self.last_run_at = None
+
+    def start(self):
+        if self.interval <= 0 or (self.thread and self.thread.is_alive()):
+            return False
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self._run, name="ScreenshotReconciler", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.last_stats = reconcile_screenshots()
+                self.last_run_at = time.time()
+                if self.last_stats['marked_available'] or self.last_stats['marked_missing']:
+                    logger.info("스크린샷 플래그 재검증: %s", self.last_stats)
+            except Exception as e:
+                logger.exception("스크린샷 재검증 오류: %s", e)
+
+    def get_status(self):
+        return {
+            'interval': self.interval,
+            'running': bool(self.thread and self.thread.is_alive()),
+            'last_run_at': self.last_run_at,
+            'last_stats': self.last_stats,
+        }
+
+
+# 싱글톤 인스턴스
+screenshot_reconciler = ScreenshotReconciler()
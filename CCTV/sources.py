@@ -0,0 +1,188 @@
+# CCTV/sources.py
+"""
+카메라 소스 추상화 (RTSP / 파일 재생)
+
+CameraStreamer 는 cv2.VideoCapture 인터페이스(isOpened/grab/retrieve/read/set/get/release)만 사용하므로
+파일 기반 소스도 같은 인터페이스로 감싸 카메라 없이 파이프라인을 재현/벤치마크할 수 있게 한다.
+
+카메라 URL 형식 (Camera.rtsp_url 에 그대로 저장)
+    rtsp://...                                    실제 IP 카메라
+    file:///data/sample.mp4?speed=realtime        동영상 파일 (끝나면 처음부터 반복)
+    file:///root/package/clip_images?fps=5        이미지 디렉토리 (파일 이름순으로 반복)
+
+쿼리 파라미터
+    speed : realtime (원본 FPS 로 재생, 기본) | max (대기 없이 최대 속도)
+    fps   : 재생 FPS (동영상 기본: 파일 FPS, 이미지 기본: SOURCE_DEFAULT_FPS)
+    loop  : 1 (기본, 반복) | 0 (한 번 재생 후 종료 → 연결 끊김으로 처리)
+    그 외 파라미터(예: cam=3)는 무시되므로 같은 파일로 여러 카메라를 만들 때 URL 구분용으로 쓸 수 있다.
+"""
+import glob
+import os
+import time
+from urllib.parse import parse_qs, urlparse
+from urllib.request import url2pathname
+
+import cv2
+
+SPEED_REALTIME = 'realtime'
+SPEED_MAX = 'max'
+
+# FPS 정보가 없을 때 재생 FPS
+SOURCE_DEFAULT_FPS = 10.0
+# 이미지 디렉토리 소스가 읽는 확장자
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def is_file_source(url):
+    return url.startswith('file://')
+
+
+def parse_source_url(url):
+    """file:// URL → (경로, 옵션 dict)"""
+    parsed = urlparse(url)
+    # 퍼센트 디코딩 + Windows 드라이브 경로 변환 (file:///C:/data/a.mp4 → C:\data\a.mp4)
+    path = url2pathname(parsed.path)
+    query = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+    fps = query.get('fps')
+    options = {
+        'speed': SPEED_MAX if query.get('speed') == SPEED_MAX else SPEED_REALTIME,
+        'fps': float(fps) if fps else None,
+        'loop': query.get('loop', '1') not in ('0', 'false', 'no'),
+    }
+    return path, options
+
+
+class FileSource:
+    """cv2.VideoCapture 호환 파일 재생 소스 (공통 재생 속도 제어)"""
+
+    is_live = False
+
+    def __init__(self, fps, speed=SPEED_REALTIME, loop=True):
+        self.fps = fps or SOURCE_DEFAULT_FPS
+        self.speed = speed
+        self.loop = loop
+        self.opened = False
+        self.frames_read = 0
+        self._next_frame_time = None
+        self._frame = None
+
+    def _pace(self):
+        """realtime 모드: 다음 프레임 시각까지 대기"""
+        if self.speed != SPEED_REALTIME:
+            return
+        now = time.perf_counter()
+        if self._next_frame_time is None:
+            self._next_frame_time = now
+        delay = self._next_frame_time - now
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # 처리가 밀렸으면 따라잡지 않고 현재 시각 기준으로 다시 맞춤
+            self._next_frame_time = max(self._next_frame_time, now - 1.0 / self.fps)
+        self._next_frame_time += 1.0 / self.fps
+
+    def _next_frame(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        return self.opened
+
+    def grab(self):
+        if not self.opened:
+            return False
+        self._pace()
+        self._frame = self._next_frame()
+        if self._frame is None:
+            return False
+        self.frames_read += 1
+        return True
+
+    def retrieve(self):
+        if self._frame is None:
+            return False, None
+        return True, self._frame.copy()
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def set(self, prop, value):
+        # RTSP 용 속성(버퍼 크기, 타임아웃 등)은 파일 소스에서 의미 없음
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self):
+        self.opened = False
+        self._frame = None
+
+
+class VideoFileSource(FileSource):
+    """동영상 파일 반복 재생"""
+
+    def __init__(self, path, fps=None, speed=SPEED_REALTIME, loop=True):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0
+        super().__init__(fps or file_fps or SOURCE_DEFAULT_FPS, speed, loop)
+        self.opened = self.cap.isOpened()
+
+    def _next_frame(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+
+class ImageDirectorySource(FileSource):
+    """이미지 디렉토리를 파일 이름순으로 반복 재생 (디코딩 결과는 메모리에 캐시)"""
+
+    def __init__(self, path, fps=None, speed=SPEED_REALTIME, loop=True):
+        super().__init__(fps, speed, loop)
+        self.path = path
+        self.files = sorted(
+            file for file in glob.glob(os.path.join(path, '*'))
+            if file.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.images = {}
+        self.index = 0
+        self.opened = bool(self.files)
+
+    def _next_frame(self):
+        if self.index >= len(self.files):
+            if not self.loop:
+                return None
+            self.index = 0
+        path = self.files[self.index]
+        self.index += 1
+        image = self.images.get(path)
+        if image is None:
+            image = cv2.imread(path)
+            if image is None:
+                return None
+            self.images[path] = image
+        return image
+
+
+def open_source(url, backend=None):
+    """
+    카메라 URL 에 맞는 캡처 객체
+
+    file:// 은 FileSource, 그 외(rtsp://)는 cv2.VideoCapture 를 그대로 반환한다.
+    """
+    if not is_file_source(url):
+        return cv2.VideoCapture(url, backend) if backend is not None else cv2.VideoCapture(url)
+
+    path, options = parse_source_url(url)
+    if os.path.isdir(path):
+        return ImageDirectorySource(path, **options)
+    return VideoFileSource(path, **options)
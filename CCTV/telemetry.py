@@ -0,0 +1,239 @@
+# CCTV/telemetry.py
+"""
+카메라별 파이프라인 계측 (카운터 + 지연시간 히스토그램)
+
+CameraStreamer / AIDetectionSystem 의 각 단계에서 observe()/incr() 를 호출하고,
+JSON API 와 Prometheus 텍스트 포맷으로 노출한다.
+카메라 키는 rtsp_url 을 사용하며, 노출 시 Camera(id, name)로 변환한다.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# 히스토그램 버킷 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 계측 단계 (표시 순서)
+PIPELINE_STAGES = (
+    'capture_to_queue',  # 프레임 grab → 프레임 큐 적재
+    'queue_wait',        # 프레임 큐 적재 → 탐지 워커 수신
+    'detection',         # _detect_objects 전체
+    'yolo',              # YOLO 추론
+    'clustering',        # person 박스 클러스터링
+    'clip',              # CLIP 분류 (탐지 1회 전체)
+    'open_vocab',        # 오픈 어휘 단일 추론 (open_vocab 엔진)
+    'screenshot',        # 스크린샷 저장
+    'db_write',          # DetectionLog 저장
+    'alert_fanout',      # 실시간 알림 전송
+)
+
+
+class LatencyHistogram:
+    """고정 버킷 지연시간 히스토그램 (Prometheus 호환 누적 버킷)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """버킷 기반 근사 분위수 (버킷 상한값 반환)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def cumulative_buckets(self):
+        cumulative = 0
+        result = []
+        for i, count in enumerate(self.counts):
+            cumulative += count
+            bound = self.buckets[i] if i < len(self.buckets) else '+Inf'
+            result.append((bound, cumulative))
+        return result
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'buckets': {str(bound): count for bound, count in self.cumulative_buckets()},
+        }
+
+
+class PipelineTelemetry:
+    """카메라별 카운터/히스토그램 저장소 (스레드 안전)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cameras = {}
+        self.started_at = time.time()
+
+    def _get_camera(self, key):
+        camera = self.cameras.get(key)
+        if camera is None:
+            camera = {
+                'counters': defaultdict(int),
+                'histograms': {},
+            }
+            self.cameras[key] = camera
+        return camera
+
+    def incr(self, key, name, amount=1):
+        """카운터 증가"""
+        with self.lock:
+            self._get_camera(key)['counters'][name] += amount
+
+    def observe(self, key, stage, seconds):
+        """단계별 소요 시간 기록"""
+        with self.lock:
+            histograms = self._get_camera(key)['histograms']
+            histogram = histograms.get(stage)
+            if histogram is None:
+                histogram = histograms[stage] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, key, stage):
+        """with telemetry.timer(rtsp_url, 'yolo'): ... 형태로 구간 측정"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(key, stage, time.perf_counter() - start)
+
+    def remove(self, key):
+        with self.lock:
+            self.cameras.pop(key, None)
+
+    def reset(self):
+        with self.lock:
+            self.cameras.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """{key: {'counters': {...}, 'stages': {stage: histogram snapshot}}}"""
+        with self.lock:
+            result = {}
+            for key, camera in self.cameras.items():
+                stages = {}
+                ordered = [s for s in PIPELINE_STAGES if s in camera['histograms']]
+                ordered += sorted(s for s in camera['histograms'] if s not in PIPELINE_STAGES)
+                for stage in ordered:
+                    stages[stage] = camera['histograms'][stage].snapshot()
+                result[key] = {
+                    'counters': dict(camera['counters']),
+                    'stages': stages,
+                }
+            return result
+
+    def aggregate(self, keys):
+        """여러 카메라 키의 카운터 합계 + 단계별 히스토그램 병합 (snapshot 과 같은 형식)"""
+        counters = defaultdict(int)
+        merged = {}
+        with self.lock:
+            for key in keys:
+                camera = self.cameras.get(key)
+                if camera is None:
+                    continue
+                for name, value in camera['counters'].items():
+                    counters[name] += value
+                for stage, histogram in camera['histograms'].items():
+                    target = merged.get(stage)
+                    if target is None:
+                        target = merged[stage] = LatencyHistogram(histogram.buckets)
+                    target.counts = [a + b for a, b in zip(target.counts, histogram.counts)]
+                    target.total += histogram.total
+                    target.count += histogram.count
+                    target.max = max(target.max, histogram.max)
+
+        ordered = [s for s in PIPELINE_STAGES if s in merged]
+        ordered += sorted(s for s in merged if s not in PIPELINE_STAGES)
+        return {
+            'counters': dict(counters),
+            'stages': {stage: merged[stage].snapshot() for stage in ordered},
+        }
+
+    def render_prometheus(self, camera_labels, gauges=None):
+        """
+        Prometheus 텍스트 포맷 생성
+
+        Args:
+            camera_labels: {key: {'camera_id': .., 'camera_name': ..}} - 등록되지 않은 키는 제외
+            gauges: {metric_name: {key: value}} - FPS 등 현재값 게이지 (선택)
+        """
+        lines = []
+        counter_lines = defaultdict(list)
+        histogram_lines = []
+
+        with self.lock:
+            for key, camera in self.cameras.items():
+                labels = camera_labels.get(key)
+                if labels is None:
+                    continue
+                base = _format_labels(labels)
+
+                for name, value in camera['counters'].items():
+                    counter_lines[name].append(f'cctv_{name}_total{{{base}}} {value}')
+
+                for stage, histogram in camera['histograms'].items():
+                    stage_labels = f'{base},stage="{_escape(stage)}"'
+                    for bound, count in histogram.cumulative_buckets():
+                        histogram_lines.append(
+                            f'cctv_stage_latency_seconds_bucket{{{stage_labels},le="{bound}"}} {count}'
+                        )
+                    histogram_lines.append(f'cctv_stage_latency_seconds_sum{{{stage_labels}}} {histogram.total:.6f}')
+                    histogram_lines.append(f'cctv_stage_latency_seconds_count{{{stage_labels}}} {histogram.count}')
+
+        for name in sorted(counter_lines):
+            lines.append(f'# TYPE cctv_{name}_total counter')
+            lines.extend(counter_lines[name])
+
+        if histogram_lines:
+            lines.append('# HELP cctv_stage_latency_seconds Pipeline stage latency per camera')
+            lines.append('# TYPE cctv_stage_latency_seconds histogram')
+            lines.extend(histogram_lines)
+
+        for name, values in (gauges or {}).items():
+            lines.append(f'# TYPE cctv_{name} gauge')
+            for key, value in values.items():
+                labels = camera_labels.get(key)
+                if labels is not None:
+                    lines.append(f'cctv_{name}{{{_format_labels(labels)}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+# 싱글톤 인스턴스
+pipeline_telemetry = PipelineTelemetry()
@@ -1,3 +1,438 @@
-from django.test import TestCase
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from .events import EventEngine
+from .log import RateLimitFilter
+from .models import Camera, DetectionLog, TargetLabel
+from .retention import (
+    ARCHIVE_AFTER_DAYS, CLASS_ALERT, DAY_FORMAT, archive_old_days, get_screenshot_dir, read_archived_screenshot,
+)
+from .tracking import TRACK_CLASSIFY_TTL, ObjectTracker
+
+try:
+    import cv2
+    from .crop_cache import CropCache
+    HAS_CV2 = True
+except ImportError:
+    HAS_CV2 = False
+
+try:
+    from .rtsp_test_server import packetize_jpeg, parse_jpeg, running_rtsp_server
+    from .utils import CameraStreamer
+    HAS_FFMPEG = cv2.videoio_registry.hasBackend(cv2.CAP_FFMPEG)
+except (ImportError, NameError):
+    HAS_FFMPEG = False
+
+# 장시간 스트레스 테스트는 명시적으로 켰을 때만 실행
+#   CCTV_STRESS_TESTS=1 CCTV_STRESS_CAMERAS=32 CCTV_STRESS_SECONDS=300 python manage.py test CCTV
+RUN_STRESS = os.environ.get('CCTV_STRESS_TESTS') == '1'
+STRESS_CAMERAS = int(os.environ.get('CCTV_STRESS_CAMERAS', 32))
+STRESS_SECONDS = float(os.environ.get('CCTV_STRESS_SECONDS', 300))
+# 강제 단절 간격 (초)
+STRESS_DISCONNECT_EVERY = 60.0
+
+# 단절 후 다시 프레임을 받기까지 허용 시간 (초) - 버퍼 비우기 2초 + 연결 여유
+MAX_RECONNECT_SECONDS = 15.0
+# 워밍업 이후 허용하는 RSS 증가량 (MB)
+MAX_RSS_GROWTH_MB = 150.0
+
+
+def current_rss_mb():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def wait_for(condition, timeout, interval=0.1):
+    """condition() 이 참이 될 때까지 대기 → 걸린 시간 (시간 초과면 None)"""
+    start = time.time()
+    while time.time() - start < timeout:
+        if condition():
+            return time.time() - start
+        time.sleep(interval)
+    return None
+
+
+def is_connected(streamer, url):
+    return streamer.get_camera_stream(url)['is_connected']
+
+
+def has_frame(streamer, url):
+    frame_queue = streamer.frame_queues.get(url)
+    return frame_queue is not None and not frame_queue.empty()
+
+
+def shutdown_camera(streamer, url):
+    """백그라운드 스트리밍 중지 → 리소스 정리 → 리더 스레드 종료 확인"""
+    reader = streamer.reader_threads.get(url)
+    streamer.stop_background_streaming(url)
+    streamer.cleanup_camera(url)
+    if reader is not None:
+        reader.join(timeout=10)
+
+
+def supervise(streamer, urls, stop_event, reconnect_times, disconnected_at):
+    """
+    끊긴 카메라 재연결 루프 - 뷰어의 generate_frames 와 같은 방식으로 connect_camera 호출
+    재연결 시간은 disconnected_at[url] 기준으로 reconnect_times 에 기록
+    """
+    while not stop_event.is_set():
+        for url in urls:
+            if not is_connected(streamer, url):
+                disconnected_at.setdefault(url, time.time())
+                streamer.connect_camera(url)
+            elif url in disconnected_at:
+                reconnect_times.append(time.time() - disconnected_at.pop(url))
+        stop_event.wait(0.5)
+
+
+@unittest.skipUnless(HAS_FFMPEG, "OpenCV FFmpeg 백엔드 필요")
+class SyntheticRtspServerTests(SimpleTestCase):
+    def test_jpeg_packetization_roundtrip(self):
+        ok, encoded = cv2.imencode('.jpg', np.full((64, 64, 3), 128, dtype=np.uint8))
+        self.assertTrue(ok)
+        frame = parse_jpeg(encoded.tobytes())
+        packets, _ = packetize_jpeg(frame, seq=65535, timestamp=0, ssrc=1)
+
+        payload = b''
+        for packet in packets:
+            offset = int.from_bytes(packet[13:16], 'big')
+            body = packet[20:]
+            if offset == 0:
+                body = body[4 + len(frame.qtables):]
+            self.assertEqual(offset, len(payload))
+            payload += body
+        self.assertEqual(payload, frame.scan)
+        self.assertEqual(packets[-1][1] >> 7, 1)  # 마지막 패킷 marker
+
+    def test_opencv_reads_stream(self):
+        with running_rtsp_server(fps=10, width=320, height=240) as server:
+            cap = cv2.VideoCapture(server.url('cam0'), cv2.CAP_FFMPEG)
+            try:
+                self.assertTrue(cap.isOpened())
+                ret, frame = cap.read()
+                self.assertTrue(ret)
+                self.assertEqual(frame.shape, (240, 320, 3))
+            finally:
+                cap.release()
+
+
+@unittest.skipUnless(HAS_FFMPEG, "OpenCV FFmpeg 백엔드 필요")
+class CameraStreamerReconnectTests(SimpleTestCase):
+    def test_reconnects_after_forced_disconnect(self):
+        streamer = CameraStreamer()
+        with running_rtsp_server(fps=10, width=320, height=240) as server:
+            url = server.url('cam0')
+            try:
+                self.assertTrue(streamer.start_background_streaming(url))
+                self.assertIsNotNone(wait_for(lambda: has_frame(streamer, url), 10))
+
+                server.disconnect_all()
+                # 연속 실패 15회 초과 → 리더 스레드 종료 → is_connected False
+                self.assertIsNotNone(wait_for(lambda: not is_connected(streamer, url), 30))
+                self.assertNotIn(url, streamer.reader_threads)
+
+                reconnected = wait_for(lambda: streamer.connect_camera(url), MAX_RECONNECT_SECONDS, 0.5)
+                self.assertIsNotNone(reconnected)
+                self.assertIsNotNone(wait_for(lambda: has_frame(streamer, url), 10))
+            finally:
+                shutdown_camera(streamer, url)
+
+    def test_outage_respects_reconnect_backoff(self):
+        streamer = CameraStreamer()
+        with running_rtsp_server(fps=10, width=320, height=240) as server:
+            url = server.url('cam0')
+            try:
+                self.assertTrue(streamer.start_background_streaming(url))
+                server.set_available(False)
+                server.disconnect_all()
+                self.assertIsNotNone(wait_for(lambda: not is_connected(streamer, url), 30))
+
+                # 3회 실패 후 30초 동안은 연결을 시도하지 않아야 함
+                for _ in range(5):
+                    streamer.connect_camera(url)
+                rejected = server.rejected
+                self.assertLessEqual(rejected, 3)
+                self.assertFalse(streamer.connect_camera(url))
+                self.assertEqual(server.rejected, rejected)
+            finally:
+                server.set_available(True)
+                shutdown_camera(streamer, url)
+
+
+@unittest.skipUnless(HAS_FFMPEG and RUN_STRESS, "CCTV_STRESS_TESTS=1 일 때만 실행")
+class CameraStreamerStressTests(SimpleTestCase):
+    """STRESS_CAMERAS 대 카메라를 STRESS_SECONDS 동안 스트리밍하며 주기적으로 강제 단절"""
+
+    def test_many_cameras_long_run(self):
+        streamer = CameraStreamer()
+        with running_rtsp_server(fps=10, width=640, height=352, packet_loss=0.01, seed=1) as server:
+            urls = [server.url(f"cam{index}") for index in range(STRESS_CAMERAS)]
+            stop_event = threading.Event()
+            reconnect_times = []
+            disconnected_at = {}
+            supervisor = None
+            try:
+                with ThreadPoolExecutor(max_workers=16) as pool:
+                    connected = list(pool.map(streamer.start_background_streaming, urls))
+                self.assertTrue(all(connected), f"연결 실패: {connected.count(False)}대")
+
+                # 워밍업 후 기준 스레드 수 / 메모리
+                time.sleep(10)
+                baseline_threads = threading.active_count()
+                baseline_rss = current_rss_mb()
+
+                supervisor = threading.Thread(
+                    target=supervise,
+                    args=(streamer, urls, stop_event, reconnect_times, disconnected_at),
+                    daemon=True,
+                )
+                supervisor.start()
+
+                peak_threads = baseline_threads + 1
+                peak_rss = baseline_rss
+                started = time.time()
+                last_disconnect = started
+                disconnects = 0
+                while time.time() - started < STRESS_SECONDS:
+                    time.sleep(1)
+                    peak_threads = max(peak_threads, threading.active_count())
+                    peak_rss = max(peak_rss, current_rss_mb())
+                    if time.time() - last_disconnect >= STRESS_DISCONNECT_EVERY:
+                        server.disconnect_all()
+                        disconnects += 1
+                        last_disconnect = time.time()
+
+                # 마지막 단절 이후 재연결 완료 대기
+                wait_for(lambda: not disconnected_at, MAX_RECONNECT_SECONDS + 20, 0.5)
+                stalled = [url for url in urls if not wait_for(lambda: has_frame(streamer, url), 5)]
+
+                self.assertFalse(disconnected_at, f"재연결되지 않은 카메라: {sorted(disconnected_at)}")
+                self.assertFalse(stalled, f"프레임이 들어오지 않는 카메라: {stalled}")
+                if disconnects:
+                    self.assertGreaterEqual(len(reconnect_times), STRESS_CAMERAS * disconnects)
+                    self.assertLessEqual(max(reconnect_times), MAX_RECONNECT_SECONDS)
+                # 카메라당 리더 스레드 1개 + 감시 스레드 - 재연결 시 스레드가 새지 않아야 함
+                self.assertLessEqual(peak_threads, baseline_threads + 1 + 4)
+                self.assertLessEqual(peak_rss - baseline_rss, MAX_RSS_GROWTH_MB)
+            finally:
+                stop_event.set()
+                if supervisor is not None:
+                    supervisor.join(timeout=5)
+                for url in urls:
+                    shutdown_camera(streamer, url)
+
+
+class RateLimitFilterTests(SimpleTestCase):
+    def make_record(self, *args):
+        return logging.LogRecord('CCTV.streaming', logging.INFO, __file__, 1, "카메라 연결 성공: %s", args, None)
+
+    def test_different_arguments_pass(self):
+        rate_limit = RateLimitFilter(interval=10.0)
+        self.assertTrue(rate_limit.filter(self.make_record('cam0')))
+        self.assertTrue(rate_limit.filter(self.make_record('cam1')))
+        self.assertTrue(rate_limit.filter(self.make_record('cam2')))
+
+    def test_repeated_message_suppressed(self):
+        rate_limit = RateLimitFilter(interval=10.0)
+        self.assertTrue(rate_limit.filter(self.make_record('cam0')))
+        self.assertFalse(rate_limit.filter(self.make_record('cam0')))
+
+
+@unittest.skipUnless(HAS_CV2, "OpenCV 필요")
+class CropCacheTrackerTests(SimpleTestCase):
+    """크롭 캐시는 트랙 캐시가 재분류를 요구한 뒤에 조회되므로 그 경우에 적중해야 함"""
+
+    CROP_HASH = 0x0123456789ABCDEF
+    BOX = [100, 100, 200, 300]
+
+    def setUp(self):
+        self.tracker = ObjectTracker()
+        self.cache = CropCache()
+        self.now = 1000.0
+
+    def classify(self, track):
+        """CLIP 분류 결과를 트랙/크롭 캐시에 저장 (utils 의 캐시 미스 경로와 같은 순서)"""
+        self.tracker.set_classification(track, 7, 0.9, now=self.now)
+        self.cache.store(self.CROP_HASH, track.box, 7, 0.9, now=self.now)
+
+    def lookup(self, track):
+        """트랙 캐시 미스 → 크롭 캐시 조회 (적중 시 트랙 분류 갱신)"""
+        self.assertTrue(self.tracker.needs_classification(track, now=self.now))
+        cached = self.cache.lookup(self.CROP_HASH, track.box, now=self.now)
+        if cached is not None:
+            self.tracker.set_classification(track, *cached, now=self.now)
+        return cached
+
+    def test_hit_after_track_ttl_expiry(self):
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.classify(track)
+
+        # 정지 장면: 트랙 TTL 이 만료되어도 크롭 캐시 TTL 안에서는 적중
+        self.now += TRACK_CLASSIFY_TTL + 1
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.assertEqual(self.lookup(track), (7, 0.9))
+
+    def test_static_scene_reclassified_after_cache_ttl(self):
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.classify(track)
+        stored_at = self.now
+
+        # 적중해도 저장 시각은 갱신되지 않음 → 저장 후 CROP_CACHE_TTL 이 지나면 다시 분류
+        while self.now + TRACK_CLASSIFY_TTL + 1 <= stored_at + self.cache.ttl:
+            self.now += TRACK_CLASSIFY_TTL + 1
+            track, = self.tracker.update([self.BOX], now=self.now)
+            self.assertEqual(self.lookup(track), (7, 0.9))
+        self.now += TRACK_CLASSIFY_TTL + 1
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.assertIsNone(self.lookup(track))
+
+    def test_hit_after_box_drift(self):
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.classify(track)
+
+        # 분류 당시 박스와 IoU 0.6 (트랙 재분류 기준 0.7 미만)
+        self.now += 1
+        track, = self.tracker.update([[125, 100, 225, 300]], now=self.now)
+        self.assertEqual(self.lookup(track), (7, 0.9))
+
+    def test_miss_for_different_crop(self):
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.classify(track)
+
+        self.now += TRACK_CLASSIFY_TTL + 1
+        track, = self.tracker.update([self.BOX], now=self.now)
+        self.assertIsNone(self.cache.lookup(~self.CROP_HASH & (2 ** 64 - 1), track.box, now=self.now))
+
+
+class EventEngineFrameCountTests(TestCase):
+    """이벤트 종료 시 DetectionLog.frame_count 기록"""
+
+    def setUp(self):
+        self.camera = Camera.objects.create(name='cam', location='lobby', rtsp_url='rtsp://127.0.0.1/cam')
+        self.label = TargetLabel.objects.create(camera=self.camera, label_name='fight', display_name='fight')
+        self.engine = EventEngine(cooldown=30, close_after=10)
+
+    def detect(self, track_id, now):
+        detection = {'label': self.label, 'boxes': [{'track_id': track_id, 'confidence': 0.9}]}
+        return self.engine.update(self.camera.id, [detection], now=now)
+
+    def open_log(self, track_id, now):
+        opened = self.detect(track_id, now)
+        self.assertEqual(len(opened), 1)
+        log = DetectionLog.objects.create(
+            camera=self.camera, camera_name=self.camera.name, camera_location=self.camera.location,
+            detected_object=self.label.display_name, object_count=1, confidence=0.9,
+        )
+        self.engine.attach_log(self.camera.id, opened[0], log.id)
+        return log
+
+    def frame_count(self, log):
+        log.refresh_from_db()
+        return log.frame_count
+
+    def test_close_records_frames(self):
+        log = self.open_log(1, now=1000.0)
+        self.detect(1, now=1001.0)
+        self.detect(1, now=1002.0)
+
+        self.assertEqual(self.engine.close_expired(self.camera.id, now=1013.0), [log.id])
+        self.assertEqual(self.frame_count(log), 3)
+
+    def test_reopen_within_cooldown_adds_frames(self):
+        log = self.open_log(1, now=1000.0)
+        self.detect(1, now=1001.0)
+        self.detect(1, now=1002.0)
+        self.engine.close_expired(self.camera.id, now=1013.0)
+
+        # 종료 후 쿨다운(30초) 안에 새 트랙 → 새 로그 없이 같은 로그에 합침
+        self.assertEqual(self.detect(2, now=1020.0), [])
+        self.detect(2, now=1021.0)
+
+        self.assertEqual(self.engine.close_expired(self.camera.id, now=1032.0), [log.id])
+        self.assertEqual(self.frame_count(log), 5)
+        self.assertEqual(DetectionLog.objects.count(), 1)
+
+
+
+class RetentionArchiveTests(TestCase):
+    """경고 로그는 screenshots/ 의 호환성 사본을 가리키므로 그 파일도 압축/인덱스되어야 함"""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = self.settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.day = (datetime.now().date() - timedelta(days=ARCHIVE_AFTER_DAYS + 1)).strftime(DAY_FORMAT)
+        self.camera = Camera.objects.create(name='cam', location='lobby', rtsp_url='rtsp://127.0.0.1/cam')
+        self.day_dir = os.path.join(media_root, 'all_detections', 'alerts', self.day, 'cam_lobby', 'person')
+        os.makedirs(self.day_dir)
+        os.makedirs(get_screenshot_dir())
+
+    def write(self, path):
+        with open(path, 'wb') as f:
+            f.write(os.path.basename(path).encode())
+        return path
+
+    def create_alert_log(self, time_str):
+        self.write(os.path.join(self.day_dir, f"{time_str}.jpg"))
+        screenshot = self.write(os.path.join(get_screenshot_dir(), f"{self.camera.id}_{self.day}_{time_str}_person.jpg"))
+        thumbnail = self.write(os.path.join(get_screenshot_dir(), f"{self.camera.id}_{self.day}_{time_str}_person.thumb.jpg"))
+        return DetectionLog.objects.create(
+            camera=self.camera, camera_name='cam', camera_location='lobby', detected_object='person',
+            object_count=1, confidence=0.9, has_alert=True, screenshot_path=screenshot,
+            screenshot_available=True, thumbnail_path=thumbnail,
+            detected_at=timezone.make_aware(datetime.strptime(f"{self.day}{time_str}", '%Y%m%d%H%M%S')),
+        )
+
+    def test_archives_alert_screenshot_copies(self):
+        log = self.create_alert_log('120000')
+        archive_old_days()
+
+        self.assertEqual(os.listdir(get_screenshot_dir()), [])
+        self.assertEqual(read_archived_screenshot(log.id, CLASS_ALERT, self.day), os.path.basename(log.screenshot_path).encode())
+        log.refresh_from_db()
+        self.assertFalse(log.screenshot_available)
+        self.assertIsNone(log.thumbnail_path)
+
+    def test_rearchive_keeps_previous_members(self):
+        first = self.create_alert_log('120000')
+        archive_old_days()
+        os.makedirs(self.day_dir)
+        second = self.create_alert_log('130000')
+        archive_old_days()
+
+        self.assertIsNotNone(read_archived_screenshot(first.id, CLASS_ALERT, self.day))
+        self.assertIsNotNone(read_archived_screenshot(second.id, CLASS_ALERT, self.day))
+
+    @unittest.skipUnless(HAS_CV2, "OpenCV 필요")
+    def test_thumbnail_served_from_archive(self):
+        from django.contrib.auth.models import User
+
+        log = self.create_alert_log('120000')
+        ok, jpeg = cv2.imencode('.jpg', np.zeros((480, 640, 3), np.uint8))
+        with open(log.screenshot_path, 'wb') as f:
+            f.write(jpeg.tobytes())
+        archive_old_days()
+
+        self.client.force_login(User.objects.create_user('viewer'))
+        logs = self.client.get('/cctv/api/detection-logs/').json()['logs']
+        self.assertIsNotNone(logs[0]['thumbnail_url'])
+        response = self.client.get(logs[0]['thumbnail_url'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR).shape[1], 320)
@@ -0,0 +1,85 @@
+# CCTV/thumbnails.py
+"""
+탐지 스크린샷 썸네일
+
+대시보드/갤러리 목록은 원본(품질 90~95 JPEG) 대신 폭 THUMBNAIL_WIDTH 썸네일을 받는다.
+스크린샷 저장 시 메모리에 있는 주석 프레임으로 바로 만들어 원본 옆에 저장하고
+(<원본 이름>.thumb.jpg), 경로는 DetectionLog.thumbnail_path 에 기록한다.
+썸네일이 없는 이전 로그는 썸네일 요청 시 원본을 읽어 만든다 (지연 백필).
+tar 로 압축 보관된 스크린샷은 저장하지 않고 요청마다 메모리에서 만든다 (encode_thumbnail).
+"""
+import logging
+import os
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger('CCTV.screenshots')
+
+# 썸네일 폭 (px, 원본이 더 작으면 크기 유지)
+THUMBNAIL_WIDTH = getattr(settings, 'CCTV_THUMBNAIL_WIDTH', 320)
+# 썸네일 형식: 'jpg' | 'webp'
+THUMBNAIL_FORMAT = getattr(settings, 'CCTV_THUMBNAIL_FORMAT', 'jpg')
+THUMBNAIL_QUALITY = 80
+
+_ENCODE_PARAMS = {
+    'jpg': [cv2.IMWRITE_JPEG_QUALITY, THUMBNAIL_QUALITY],
+    'webp': [cv2.IMWRITE_WEBP_QUALITY, THUMBNAIL_QUALITY],
+}
+CONTENT_TYPES = {
+    'jpg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+
+
+def get_thumbnail_path(image_path, image_format=THUMBNAIL_FORMAT):
+    root, _ = os.path.splitext(image_path)
+    return f"{root}.thumb.{image_format}"
+
+
+def get_content_type(thumbnail_path):
+    return CONTENT_TYPES.get(thumbnail_path.rsplit('.', 1)[-1], 'application/octet-stream')
+
+
+def resize_to_width(image, width=THUMBNAIL_WIDTH):
+    height, original_width = image.shape[:2]
+    if original_width <= width:
+        return image
+    new_height = max(1, round(height * width / original_width))
+    return cv2.resize(image, (width, new_height), interpolation=cv2.INTER_AREA)
+
+
+def write_thumbnail(image, image_path, image_format=THUMBNAIL_FORMAT):
+    """BGR 이미지로 image_path 옆에 썸네일 저장 → 썸네일 경로 (실패 시 None)"""
+    thumbnail_path = get_thumbnail_path(image_path, image_format)
+    try:
+        if cv2.imwrite(thumbnail_path, resize_to_width(image), _ENCODE_PARAMS[image_format]):
+            return thumbnail_path
+        logger.warning("썸네일 저장 실패: %s", thumbnail_path)
+    except (cv2.error, KeyError) as e:
+        logger.warning("썸네일 저장 오류 (%s): %s", thumbnail_path, e)
+    return None
+
+
+def create_thumbnail_from_file(image_path):
+    """기존 스크린샷 파일로 썸네일 생성 (지연 백필) → 썸네일 경로 (원본이 없으면 None)"""
+    if not image_path:
+        return None
+    image = cv2.imread(image_path)
+    if image is None:
+        return None
+    return write_thumbnail(image, image_path)
+
+
+def encode_thumbnail(data, image_format=THUMBNAIL_FORMAT):
+    """인코딩된 원본 이미지 바이트 → 썸네일 바이트 (압축 보관된 스크린샷용, 디코딩 실패 시 None)"""
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    try:
+        ok, encoded = cv2.imencode(f'.{image_format}', resize_to_width(image), _ENCODE_PARAMS[image_format])
+    except (cv2.error, KeyError) as e:
+        logger.warning("썸네일 인코딩 오류: %s", e)
+        return None
+    return encoded.tobytes() if ok else None
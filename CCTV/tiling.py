@@ -0,0 +1,136 @@
+# CCTV/tiling.py
+"""
+고해상도 광역 카메라용 타일 추론 (SAHI 방식)
+
+프레임을 겹치는 타일로 나눠 타일마다 tile_size 그대로 YOLO 에 넣어
+먼 거리의 작은 사람도 놓치지 않도록 한다.
+- 축소한 전체 프레임 1장 + 타일들을 한 번의 배치 forward 로 추론 (torch 백엔드)
+- 타일 좌표 → 원본 좌표로 되돌린 뒤 클래스별 NMS 로 중복 박스 병합
+  (타일 경계에서 잘린 박스가 온전한 박스에 흡수되도록 IoS 기준 사용)
+결과는 기존 _cluster_person_boxes → CLIP 흐름에 그대로 들어간다.
+"""
+import math
+
+import numpy as np
+
+# 기본 타일 크기 (픽셀, 32 배수)
+TILE_DEFAULT_SIZE = 640
+# 기본 타일 겹침 비율
+TILE_DEFAULT_OVERLAP = 0.2
+# 타일 병합 NMS 임계치 (IoS: 교집합 / 작은 박스 면적)
+TILE_NMS_THRESHOLD = 0.5
+# 타일 크기 범위
+TILE_MIN_SIZE = 320
+TILE_MAX_SIZE = 1920
+
+
+def normalize_tile_params(tile_size, overlap):
+    """타일 크기(32 배수, 범위 제한)와 겹침 비율(0~0.5) 정규화"""
+    tile_size = int(tile_size or TILE_DEFAULT_SIZE)
+    tile_size = max(TILE_MIN_SIZE, min(TILE_MAX_SIZE, tile_size))
+    tile_size = int(math.ceil(tile_size / 32.0) * 32)
+    overlap = TILE_DEFAULT_OVERLAP if overlap is None else float(overlap)
+    return tile_size, max(0.0, min(0.5, overlap))
+
+
+def _axis_starts(length, tile_size, stride):
+    if length <= tile_size:
+        return [0]
+    starts = list(range(0, length - tile_size, stride))
+    # 마지막 타일은 프레임 끝에 맞춤
+    starts.append(length - tile_size)
+    return starts
+
+
+def get_tile_grid(frame_shape, tile_size=TILE_DEFAULT_SIZE, overlap=TILE_DEFAULT_OVERLAP):
+    """겹치는 타일 영역 [(x1, y1, x2, y2)] - 프레임이 타일보다 작으면 프레임 전체 1개"""
+    frame_h, frame_w = frame_shape[:2]
+    stride = max(1, int(tile_size * (1 - overlap)))
+    return [
+        (x, y, min(frame_w, x + tile_size), min(frame_h, y + tile_size))
+        for y in _axis_starts(frame_h, tile_size, stride)
+        for x in _axis_starts(frame_w, tile_size, stride)
+    ]
+
+
+def nms_merge(boxes, scores, classes, threshold=TILE_NMS_THRESHOLD):
+    """
+    클래스별 greedy NMS (IoS 기준)
+
+    Returns:
+        남길 박스 인덱스 배열 (신뢰도 내림차순)
+    """
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=int)
+
+    areas = np.maximum(0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0, boxes[:, 3] - boxes[:, 1])
+    order = np.argsort(-scores)
+    keep = []
+    suppressed = np.zeros(len(boxes), dtype=bool)
+
+    for position, index in enumerate(order):
+        if suppressed[index]:
+            continue
+        keep.append(index)
+        rest = order[position + 1:]
+        rest = rest[~suppressed[rest] & (classes[rest] == classes[index])]
+        if len(rest) == 0:
+            continue
+
+        x1 = np.maximum(boxes[index, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[index, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[index, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[index, 3], boxes[rest, 3])
+        intersection = np.maximum(0, x2 - x1) * np.maximum(0, y2 - y1)
+        smaller = np.minimum(areas[index], areas[rest])
+        ios = np.divide(intersection, smaller, out=np.zeros_like(intersection), where=smaller > 0)
+        suppressed[rest[ios >= threshold]] = True
+
+    return np.array(keep, dtype=int)
+
+
+def run_tiled_inference(model, frame, tile_size=TILE_DEFAULT_SIZE, overlap=TILE_DEFAULT_OVERLAP,
+                        conf=0.5, batched=True, fixed_imgsz=None):
+    """
+    타일 추론 + 병합
+
+    Args:
+        model: ultralytics YOLO 모델
+        frame: BGR 프레임 (ROI 크롭 포함)
+        batched: True 면 전체 프레임 + 타일을 한 번의 호출로 배치 추론
+                 (export 모델은 배치 1 고정이라 False 로 타일마다 호출)
+        fixed_imgsz: export 모델의 고정 입력 크기 (None 이면 tile_size 사용)
+    Returns:
+        (boxes[N, 4], confidences[N], classes[N], names) - 원본(frame) 좌표
+    """
+    tile_size, overlap = normalize_tile_params(tile_size, overlap)
+    imgsz = fixed_imgsz or tile_size
+    regions = [(0, 0, frame.shape[1], frame.shape[0])] + get_tile_grid(frame.shape, tile_size, overlap)
+    images = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions]
+
+    if batched:
+        results = model(images, conf=conf, imgsz=imgsz, verbose=False)
+    else:
+        results = [model(image, conf=conf, imgsz=imgsz, verbose=False)[0] for image in images]
+
+    all_boxes, all_confidences, all_classes = [], [], []
+    names = {}
+    for (x1, y1, _, _), result in zip(regions, results):
+        names = getattr(result, 'names', names)
+        if result.boxes is None or len(result.boxes) == 0:
+            continue
+        boxes = result.boxes.xyxy.cpu().numpy()
+        boxes[:, [0, 2]] += x1
+        boxes[:, [1, 3]] += y1
+        all_boxes.append(boxes)
+        all_confidences.append(result.boxes.conf.cpu().numpy())
+        all_classes.append(result.boxes.cls.cpu().numpy())
+
+    if not all_boxes:
+        return np.zeros((0, 4), dtype=np.float32), np.zeros(0), np.zeros(0), names
+
+    boxes = np.concatenate(all_boxes)
+    confidences = np.concatenate(all_confidences)
+    classes = np.concatenate(all_classes)
+    keep = nms_merge(boxes, confidences, classes)
+    return boxes[keep], confidences[keep], classes[keep], names
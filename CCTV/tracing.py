@@ -0,0 +1,131 @@
+# CCTV/tracing.py
+"""
+프레임 단위 종단 간 지연 추적
+
+프레임 리더가 프레임마다 FrameTrace 를 만들어 frame_data['trace'] 로 넘기고,
+탐지 워커의 각 단계(decode, queue, YOLO, CLIP, annotate, save, DB, alert emit)가
+mark() 로 시각을 찍는다. 처리가 끝난 트레이스 중 느린 것만 링 버퍼에 보관하여
+"이벤트 발생 후 대시보드 알림까지 왜 4초가 걸렸는지" 를 단계별로 확인할 수 있게 한다.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+# 이 시간(초) 이상 걸린 프레임만 링 버퍼에 보관
+TRACE_SLOW_THRESHOLD = 1.0
+# 링 버퍼 크기
+TRACE_RING_SIZE = 200
+
+_trace_ids = itertools.count(1)
+
+
+class FrameTrace:
+    """프레임 하나의 단계별 타임스탬프 기록"""
+
+    __slots__ = ('id', 'rtsp_url', 'captured_at', 'timestamp_str', 'marks', 'info', 'status', 'finished_at')
+
+    def __init__(self, rtsp_url, captured_at=None, timestamp_str=''):
+        self.id = next(_trace_ids)
+        self.rtsp_url = rtsp_url
+        self.captured_at = captured_at or time.time()
+        self.timestamp_str = timestamp_str
+        self.marks = []  # [(stage, time.time()), ...] - 같은 단계가 여러 번 찍힐 수 있음 (탐지 결과별)
+        self.info = {}
+        self.status = None
+        self.finished_at = None
+
+    def mark(self, stage):
+        """단계 종료 시각 기록"""
+        self.marks.append((stage, time.time()))
+
+    def add_info(self, key, value):
+        """트레이스에 부가 정보 추가 (리스트로 누적)"""
+        self.info.setdefault(key, []).append(value)
+
+    @property
+    def total_seconds(self):
+        end = self.finished_at or (self.marks[-1][1] if self.marks else self.captured_at)
+        return end - self.captured_at
+
+    def to_dict(self):
+        stages = []
+        previous = self.captured_at
+        for stage, stamp in self.marks:
+            stages.append({
+                'stage': stage,
+                'offset_ms': round((stamp - self.captured_at) * 1000, 1),
+                'duration_ms': round((stamp - previous) * 1000, 1),
+            })
+            previous = stamp
+
+        return {
+            'id': self.id,
+            'rtsp_url': self.rtsp_url,
+            'captured_at': self.captured_at,
+            'timestamp_str': self.timestamp_str,
+            'status': self.status,
+            'total_ms': round(self.total_seconds * 1000, 1),
+            'stages': stages,
+            'info': dict(self.info),
+        }
+
+
+class FrameTracer:
+    """완료된 느린 트레이스를 보관하는 링 버퍼"""
+
+    def __init__(self, slow_threshold=TRACE_SLOW_THRESHOLD, ring_size=TRACE_RING_SIZE):
+        self.slow_threshold = slow_threshold
+        self.lock = threading.Lock()
+        self.traces = deque(maxlen=ring_size)
+        self.finished_count = 0
+        self.slow_count = 0
+
+    def start(self, rtsp_url, captured_at=None, timestamp_str=''):
+        return FrameTrace(rtsp_url, captured_at, timestamp_str)
+
+    def finish(self, trace, status='done'):
+        """트레이스 종료 - 임계값 이상이면 링 버퍼에 보관"""
+        if trace is None:
+            return
+        trace.status = status
+        trace.finished_at = time.time()
+
+        with self.lock:
+            self.finished_count += 1
+            if trace.total_seconds >= self.slow_threshold:
+                self.slow_count += 1
+                self.traces.append(trace)
+
+    def get_traces(self, rtsp_urls=None, log_id=None, limit=50):
+        """최근 느린 트레이스 목록 (최신순)"""
+        with self.lock:
+            traces = list(self.traces)
+
+        result = []
+        for trace in reversed(traces):
+            if rtsp_urls is not None and trace.rtsp_url not in rtsp_urls:
+                continue
+            if log_id is not None and log_id not in trace.info.get('log_ids', []):
+                continue
+            result.append(trace.to_dict())
+            if len(result) >= limit:
+                break
+        return result
+
+    def get_status(self):
+        with self.lock:
+            return {
+                'slow_threshold': self.slow_threshold,
+                'finished': self.finished_count,
+                'slow': self.slow_count,
+                'buffered': len(self.traces),
+            }
+
+    def clear(self):
+        with self.lock:
+            self.traces.clear()
+
+
+# 싱글톤 인스턴스
+frame_tracer = FrameTracer()
@@ -0,0 +1,196 @@
+# CCTV/tracking.py
+"""
+카메라별 다중 객체 추적 (IoU 기반, ByteTrack 방식의 2단계 매칭)
+
+탐지 주기마다 클러스터링된 person 그룹 박스를 기존 트랙에 연결하고,
+트랙별로 CLIP 분류 결과(라벨, 신뢰도)를 캐시한다.
+다음 경우에만 다시 분류한다.
+- 새 트랙
+- 마지막 분류 시점 박스와의 IoU 가 TRACK_RECLASSIFY_IOU 미만 (자세/위치가 크게 바뀜)
+- 캐시된 결과가 TRACK_CLASSIFY_TTL 초보다 오래됨
+- 카메라의 타겟 라벨 구성이 바뀜 (전체 무효화)
+정지해 있는 사람을 매 주기 CLIP 에 다시 넣지 않기 위한 용도.
+"""
+import itertools
+import threading
+import time
+
+# 트랙 매칭 최소 IoU (1단계: 활성 트랙)
+TRACK_MATCH_IOU = 0.3
+# 놓친 트랙 재연결 최소 IoU (2단계: 직전 주기에 놓친 트랙)
+TRACK_LOST_MATCH_IOU = 0.2
+# 연속으로 놓친 주기가 이 값을 넘으면 트랙 삭제
+TRACK_MAX_MISSED = 3
+# 분류 당시 박스와의 IoU 가 이 값 미만이면 재분류
+TRACK_RECLASSIFY_IOU = 0.7
+# 분류 결과 캐시 유효 시간 (초)
+TRACK_CLASSIFY_TTL = 10.0
+
+
+def box_iou(box1, box2):
+    """두 박스 [x1, y1, x2, y2] 의 IoU"""
+    x1 = max(box1[0], box2[0])
+    y1 = max(box1[1], box2[1])
+    x2 = min(box1[2], box2[2])
+    y2 = min(box1[3], box2[3])
+
+    intersection = max(0, x2 - x1) * max(0, y2 - y1)
+    area1 = (box1[2] - box1[0]) * (box1[3] - box1[1])
+    area2 = (box2[2] - box2[0]) * (box2[3] - box2[1])
+    union = area1 + area2 - intersection
+
+    return intersection / union if union > 0 else 0
+
+
+class Track:
+    """추적 중인 객체 하나 (분류 결과 캐시 포함)"""
+
+    def __init__(self, track_id, box, now):
+        self.id = track_id
+        self.box = [float(v) for v in box]
+        self.created_at = now
+        self.last_seen = now
+        self.hits = 1
+        self.missed = 0
+
+        # CLIP 분류 캐시 (label_id=None 이면 'other object' 또는 신뢰도 미달)
+        self.classified = False
+        self.classified_box = None
+        self.classified_at = None
+        self.label_id = None
+        self.confidence = 0.0
+
+    def update(self, box, now):
+        self.box = [float(v) for v in box]
+        self.last_seen = now
+        self.hits += 1
+        self.missed = 0
+
+
+class ObjectTracker:
+    """카메라 하나의 트랙 목록 관리"""
+
+    def __init__(self, match_iou=TRACK_MATCH_IOU, lost_match_iou=TRACK_LOST_MATCH_IOU,
+                 max_missed=TRACK_MAX_MISSED, reclassify_iou=TRACK_RECLASSIFY_IOU,
+                 classify_ttl=TRACK_CLASSIFY_TTL):
+        self.match_iou = match_iou
+        self.lost_match_iou = lost_match_iou
+        self.max_missed = max_missed
+        self.reclassify_iou = reclassify_iou
+        self.classify_ttl = classify_ttl
+        self.tracks = []
+        self.label_signature = None
+        self._ids = itertools.count(1)
+
+    def _match(self, tracks, boxes, box_indices, min_iou):
+        """IoU 내림차순 greedy 매칭 → [(track, box_index)]"""
+        candidates = []
+        for track in tracks:
+            for index in box_indices:
+                iou = box_iou(track.box, boxes[index])
+                if iou >= min_iou:
+                    candidates.append((iou, track.id, track, index))
+        candidates.sort(key=lambda item: (-item[0], item[1]))
+
+        matched_tracks = set()
+        matched_boxes = set()
+        matches = []
+        for _, _, track, index in candidates:
+            if track.id in matched_tracks or index in matched_boxes:
+                continue
+            matched_tracks.add(track.id)
+            matched_boxes.add(index)
+            matches.append((track, index))
+        return matches
+
+    def update(self, boxes, now=None):
+        """
+        이번 주기 박스들로 트랙 갱신
+
+        Returns:
+            boxes 와 같은 순서의 Track 리스트
+        """
+        now = now or time.time()
+        assigned = [None] * len(boxes)
+        remaining = set(range(len(boxes)))
+
+        # 1단계: 직전 주기에 보였던 트랙과 매칭
+        # 2단계: 남은 트랙(놓쳤던 트랙 포함)과 낮은 IoU 로 재매칭 (ByteTrack 의 lost track 재연결)
+        matched = set()
+        stages = (
+            (lambda track: track.missed == 0, self.match_iou),
+            (lambda track: track.id not in matched, self.lost_match_iou),
+        )
+        for select, min_iou in stages:
+            candidates = [track for track in self.tracks if track.id not in matched and select(track)]
+            for track, index in self._match(candidates, boxes, remaining, min_iou):
+                track.update(boxes[index], now)
+                matched.add(track.id)
+                assigned[index] = track
+                remaining.discard(index)
+
+        for track in self.tracks:
+            if track.id not in matched:
+                track.missed += 1
+        self.tracks = [track for track in self.tracks if track.missed <= self.max_missed]
+
+        for index in sorted(remaining):
+            track = Track(next(self._ids), boxes[index], now)
+            self.tracks.append(track)
+            assigned[index] = track
+
+        return assigned
+
+    def needs_classification(self, track, now=None):
+        """CLIP 재분류가 필요한지 판단"""
+        if not track.classified:
+            return True
+        now = now or time.time()
+        if now - track.classified_at > self.classify_ttl:
+            return True
+        return box_iou(track.classified_box, track.box) < self.reclassify_iou
+
+    def set_classification(self, track, label_id, confidence, now=None):
+        track.classified = True
+        track.classified_box = list(track.box)
+        track.classified_at = now or time.time()
+        track.label_id = label_id
+        track.confidence = confidence
+
+    def sync_labels(self, label_signature):
+        """타겟 라벨 구성이 바뀌면 모든 분류 캐시 무효화"""
+        if label_signature != self.label_signature:
+            self.label_signature = label_signature
+            for track in self.tracks:
+                track.classified = False
+
+    def reset(self):
+        self.tracks = []
+        self.label_signature = None
+
+
+class TrackerRegistry:
+    """카메라 ID 별 ObjectTracker 보관"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.trackers = {}
+
+    def get(self, camera_id):
+        with self.lock:
+            tracker = self.trackers.get(camera_id)
+            if tracker is None:
+                tracker = self.trackers[camera_id] = ObjectTracker()
+            return tracker
+
+    def remove(self, camera_id):
+        with self.lock:
+            self.trackers.pop(camera_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.trackers.clear()
+
+
+# 싱글톤 인스턴스
+tracker_registry = TrackerRegistry()
@@ -13,6 +13,10 @@ urlpatterns = [
     path('camera/create/', views.camera_create, name='camera_create'),
     path('camera/<int:camera_id>/edit/', views.camera_edit, name='camera_edit'),
     path('camera/<int:camera_id>/delete/', views.camera_delete, name='camera_delete'),
+
+    # 카메라 관심 영역(ROI)
+    path('camera/<int:camera_id>/roi/', views.camera_roi_editor, name='camera_roi_editor'),
+    path('camera/<int:camera_id>/roi/update/', views.camera_roi_update, name='camera_roi_update'),
     
     # 타겟 라벨 CRUD
     path('camera/<int:camera_id>/target-label/create/', views.target_label_create, name='target_label_create'),
@@ -21,16 +25,27 @@ urlpatterns = [
     
     # 스트리밍 및 API
     path('camera/<int:camera_id>/stream/', views.camera_stream, name='camera_stream'),
+    path('camera/<int:camera_id>/hls/index.m3u8', views.camera_hls_playlist, name='camera_hls_playlist'),
+    path('camera/<int:camera_id>/hls/init.mp4', views.camera_hls_init, name='camera_hls_init'),
+    path('camera/<int:camera_id>/hls/<int:sequence>.m4s', views.camera_hls_segment, name='camera_hls_segment'),
     path('api/camera-status/', views.camera_status_api, name='camera_status_api'),
     path('multi-camera/', views.multi_camera_view, name='multi_camera_view'),
     
     # AI 탐지 관련
     path('api/detection-logs/', views.detection_logs_api, name='detection_logs_api'),
+    path('api/detection-logs/export/', views.detection_logs_export, name='detection_logs_export'),
+    path('api/detection-stats/', views.detection_stats_api, name='detection_stats_api'),
+    path('detection/<int:log_id>/thumbnail/', views.detection_thumbnail, name='detection_thumbnail'),
     path('detection/start/', views.start_detection, name='start_detection'),
     path('detection/stop/', views.stop_detection, name='stop_detection'),
     
     # 백그라운드 스트리밍 상태
     path('api/background-streaming-status/', views.background_streaming_status, name='background_streaming_status'),
+
+    # 파이프라인 텔레메트리
+    path('api/telemetry/', views.telemetry_api, name='telemetry_api'),
+    path('metrics/', views.telemetry_metrics, name='telemetry_metrics'),
+    path('api/traces/', views.frame_traces_api, name='frame_traces_api'),
     
     # 실시간 알림 (SSE)
     path('alerts/stream/', views.detection_alerts_stream, name='detection_alerts_stream'),
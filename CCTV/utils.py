@@ -1,5 +1,6 @@
 # CCTV/utils.py
 import cv2
+import logging
 import threading
 import time
 import queue
@@ -9,13 +10,43 @@ from django.conf import settings
 import json
 import numpy as np
 from collections import deque
-from ultralytics import YOLO
-import torch
 from PIL import Image, ImageDraw, ImageFont
-import clip
 import threading
 from datetime import datetime
-from sklearn.cluster import DBSCAN
+from .recorder import event_clip_recorder
+from .telemetry import pipeline_telemetry
+from .tracing import frame_tracer
+from .yolo_backend import YOLO_IMGSZ, load_yolo_model
+from .clip_quantization import is_quantized, quantize_clip_visual
+from .tracking import tracker_registry
+from .crop_cache import crop_cache_registry, dhash
+from .sources import is_file_source, open_source
+from .events import event_engine
+from .roi import boxes_in_polygon, get_crop_imgsz, get_crop_region, get_roi_points, to_pixel_polygon
+from .tiling import nms_merge, run_tiled_inference
+from .classification import clip_classifier
+from .prompt_embeddings import prompt_embedding_cache
+from .thumbnails import write_thumbnail
+from .rollups import record_detection
+from .open_vocab import DETECTION_ENGINE, ENGINE_OPEN_VOCAB, build_vocabulary, open_vocab_detector
+
+stream_logger = logging.getLogger('CCTV.streaming')
+detection_logger = logging.getLogger('CCTV.detection')
+
+# CLIP 모델 (프롬프트 임베딩 캐시 키에도 사용)
+CLIP_MODEL_NAME = "ViT-L/14@336px"
+
+# AI 모델 로딩 상태
+MODEL_STATE_IDLE = 'idle'
+MODEL_STATE_LOADING = 'loading'
+MODEL_STATE_READY = 'ready'
+MODEL_STATE_FAILED = 'failed'
+
+# 카메라별 탐지 주기 사이 대기 시간 (초) - 벤치마크에서는 0 으로 최대 처리량 측정
+DETECTION_INTERVAL = getattr(settings, 'CCTV_DETECTION_INTERVAL', 1.5)
+
+# cleanup_camera 가 프레임 리더 스레드 종료를 기다리는 최대 시간 (초) - RTSP grab() 은 수 초 걸릴 수 있음
+READER_JOIN_TIMEOUT = 5.0
 
 # 전역 알림 큐 (모든 인스턴스가 공유)
 GLOBAL_ALERT_QUEUE = queue.Queue(maxsize=100)
@@ -35,7 +66,7 @@ class CameraStreamer:
         try:
             from .models import Camera
             
-            print("🔄 스트리밍 시스템 카메라 목록 업데이트")
+            stream_logger.info("스트리밍 시스템 카메라 목록 업데이트")
             
             # 현재 DB의 카메라 목록 가져오기
             current_cameras = Camera.objects.all()
@@ -48,29 +79,27 @@ class CameraStreamer:
             removed_urls = active_background - current_rtsp_urls
             for rtsp_url in removed_urls:
                 try:
-                    print(f"⏹️ 삭제된 카메라 스트리밍 중지: {rtsp_url}")
+                    stream_logger.info("삭제된 카메라 스트리밍 중지: %s", rtsp_url)
                     self.stop_background_streaming(rtsp_url)
                     # 직접 정리하지 말고 다음 사이클에서 자동 정리되도록 남겨둡시
                     # self.cleanup_camera(rtsp_url)  # 이 라인을 주석 처리
                 except Exception as e:
-                    print(f"⚠️ 카메라 스트리밍 중지 오류: {e}")
+                    stream_logger.warning("카메라 스트리밍 중지 오류: %s", e)
             
             # 2. 새로 추가된 카메라들의 스트리밍 시작
             new_urls = current_rtsp_urls - active_background
             for camera in current_cameras:
                 if camera.rtsp_url in new_urls:
                     try:
-                        print(f"🚀 새 카메라 백그라운드 스트리밍 시작: {camera.name}")
+                        stream_logger.info("새 카메라 백그라운드 스트리밍 시작: %s", camera.name)
                         self.start_background_streaming(camera.rtsp_url)
                     except Exception as e:
-                        print(f"❌ 백그라운드 스트리밍 시작 실패: {e}")
+                        stream_logger.error("백그라운드 스트리밍 시작 실패: %s", e)
             
-            print("✅ 스트리밍 시스템 업데이트 완료")
+            stream_logger.info("스트리밍 시스템 업데이트 완료")
             
         except Exception as e:
-            print(f"❌ 스트리밍 시스템 업데이트 중 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            stream_logger.exception("스트리밍 시스템 업데이트 중 오류: %s", e)
     
     def get_camera_stream(self, rtsp_url):
         # print(f"🔐 global_lock 획득 시도: {rtsp_url}")
@@ -140,45 +169,50 @@ class CameraStreamer:
                         camera_info['cap'].release()
                         time.sleep(0.1)
                     
-                    # FFmpeg 백엔드 사용 (안정성 향상)
-                    backend = cv2.CAP_FFMPEG
+                    if is_file_source(rtsp_url):
+                        # 파일 재생 소스 (카메라 없는 환경의 재현/벤치마크용, CCTV/sources.py)
+                        stream_logger.info("파일 소스 연결 시도: %s", rtsp_url)
+                        cap = open_source(rtsp_url)
+                    else:
+                        # FFmpeg 백엔드 사용 (안정성 향상)
+                        backend = cv2.CAP_FFMPEG
                     
-                    # RTSP URL에 파라미터 추가 (낮은 지연시간 및 안정성)
-                    rtsp_url_optimized = rtsp_url
-                    if '?' not in rtsp_url:
-                        # TCP 사용 + 추가 안정성 옵션
-                        rtsp_url_optimized = f"{rtsp_url}?tcp&timeout=5000000&stimeout=5000000"
+                        # RTSP URL에 파라미터 추가 (낮은 지연시간 및 안정성)
+                        rtsp_url_optimized = rtsp_url
+                        if '?' not in rtsp_url:
+                            # TCP 사용 + 추가 안정성 옵션
+                            rtsp_url_optimized = f"{rtsp_url}?tcp&timeout=5000000&stimeout=5000000"
                     
-                    print(f"🔗 RTSP 연결 시도: {rtsp_url_optimized}")
-                    cap = cv2.VideoCapture(rtsp_url_optimized, backend)
+                        stream_logger.info("RTSP 연결 시도: %s", rtsp_url_optimized)
+                        cap = cv2.VideoCapture(rtsp_url_optimized, backend)
                     
-                    # 버퍼 크기 최소화 (멀티 스트림 안정성 향상)
-                    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                        # 버퍼 크기 최소화 (멀티 스트림 안정성 향상)
+                        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                     
-                    # FFmpeg 안정성 옵션
-                    try:
-                        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'H264'))
-                        cap.set(cv2.CAP_PROP_FPS, 25)
+                        # FFmpeg 안정성 옵션
+                        try:
+                            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'H264'))
+                            cap.set(cv2.CAP_PROP_FPS, 25)
                         
-                        # 타임아웃 설정 (짧게 설정하여 빠른 실패 감지)
-                        cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 3000)
-                        cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 3000)
+                            # 타임아웃 설정 (짧게 설정하여 빠른 실패 감지)
+                            cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 3000)
+                            cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 3000)
                         
-                        # FFmpeg 스레드 안정성 옵션
-                        if hasattr(cv2, 'CAP_PROP_FRAME_MSEC'):
-                            cap.set(cv2.CAP_PROP_FRAME_MSEC, 40)  # 25 FPS = 40ms
+                            # FFmpeg 스레드 안정성 옵션
+                            if hasattr(cv2, 'CAP_PROP_FRAME_MSEC'):
+                                cap.set(cv2.CAP_PROP_FRAME_MSEC, 40)  # 25 FPS = 40ms
                             
-                    except Exception as prop_error:
-                        print(f"⚠️ 카메라 속성 설정 오류: {prop_error}")
+                        except Exception as prop_error:
+                            stream_logger.warning("카메라 속성 설정 오류: %s", prop_error)
                     
                     if cap.isOpened():
-                        # 버퍼 비우기 - 최신 프레임까지 스킵
-                        print(f"🔄 버퍼 비우기 시작: {rtsp_url}")
+                        # 버퍼 비우기 - 최신 프레임까지 스킵 (파일 소스는 쌓인 버퍼가 없으므로 생략)
+                        stream_logger.debug("버퍼 비우기 시작: %s", rtsp_url)
                         flush_start = time.time()
                         frames_flushed = 0
                         
                         # 최대 2초 동안 버퍼 비우기
-                        while time.time() - flush_start < 2.0:
+                        while not is_file_source(rtsp_url) and time.time() - flush_start < 2.0:
                             ret = cap.grab()  # grab()은 read()보다 빠름
                             if not ret:
                                 break
@@ -190,7 +224,7 @@ class CameraStreamer:
                                 if not ret or test_frame is None:
                                     break
                         
-                        print(f"✅ 버퍼 비우기 완료: {frames_flushed}개 프레임 스킵")
+                        stream_logger.debug("버퍼 비우기 완료: %s개 프레임 스킵", frames_flushed)
                         
                         # 최신 프레임 테스트
                         ret, test_frame = cap.read()
@@ -198,13 +232,14 @@ class CameraStreamer:
                             camera_info['cap'] = cap
                             camera_info['is_connected'] = True
                             camera_info['reconnect_attempts'] = 0
+                            pipeline_telemetry.incr(rtsp_url, 'connects')
                             
-                            print(f"✅ 카메라 연결 성공: {rtsp_url}")
+                            stream_logger.info("카메라 연결 성공: %s", rtsp_url)
                             
                             # 기존 스레드가 살아있는지 안전하게 확인
                             old_thread = self.reader_threads.get(rtsp_url)
                             if old_thread and old_thread.is_alive():
-                                print(f"⚠️ 기존 스레드 종료 대기: {rtsp_url}")
+                                stream_logger.warning("기존 스레드 종료 대기: %s", rtsp_url)
                                 try:
                                     old_thread.join(timeout=1.0)
                                 except:
@@ -220,7 +255,7 @@ class CameraStreamer:
                                 )
                                 self.reader_threads[rtsp_url] = reader_thread
                                 reader_thread.start()
-                                print(f"🚀 프레임 리더 스레드 시작: {reader_thread.name}")
+                                stream_logger.debug("프레임 리더 스레드 시작: %s", reader_thread.name)
                             
                             return True
                         else:
@@ -233,7 +268,7 @@ class CameraStreamer:
                         camera_info['last_reconnect_time'] = current_time
                         return False
                 except Exception as e:
-                    print(f"Camera connection error: {e}")
+                    stream_logger.error("Camera connection error: %s", e)
                     if 'cap' in locals() and cap:
                         cap.release()
                     camera_info['reconnect_attempts'] += 1
@@ -244,13 +279,13 @@ class CameraStreamer:
     def _frame_reader_thread_optimized(self, rtsp_url):
         """프레임 읽기 스레드 - FFmpeg 안정성 강화 버전"""
         thread_name = threading.current_thread().name
-        print(f"📺 프레임 리더 시작: {thread_name} ({rtsp_url})")
+        stream_logger.info("프레임 리더 시작: %s (%s)", thread_name, rtsp_url)
         
         camera_info = self.cameras.get(rtsp_url)
         frame_queue = self.frame_queues.get(rtsp_url)
         
         if not camera_info or not frame_queue:
-            print(f"❌ 카메라 정보 또는 큐가 없음: {rtsp_url}")
+            stream_logger.error("카메라 정보 또는 큐가 없음: %s", rtsp_url)
             return
         
         consecutive_failures = 0
@@ -266,11 +301,11 @@ class CameraStreamer:
                     with camera_info['lock']:
                         cap = camera_info['cap']
                         if not cap or not camera_info['is_connected']:
-                            print(f"🛑 카메라 연결 종료: {thread_name}")
+                            stream_logger.info("카메라 연결 종료: %s", thread_name)
                             break
                         stream_count = camera_info['stream_count']
                 except Exception as lock_error:
-                    print(f"⚠️ 락 오류: {lock_error}")
+                    stream_logger.warning("락 오류: %s", lock_error)
                     time.sleep(1.0)
                     continue
                 
@@ -300,7 +335,7 @@ class CameraStreamer:
                         ret = cap_ref.grab()
                     except Exception as grab_error:
                         if current_time - last_error_log > 5.0:  # 5초마다 로그
-                            print(f"⚠️ 프레임 grab 오류: {grab_error}")
+                            stream_logger.warning("프레임 grab 오류: %s", grab_error)
                             last_error_log = current_time
                         ret = False
                     
@@ -310,6 +345,7 @@ class CameraStreamer:
                             # 큐가 3개 이상이면 하나 빼고 새로 넣기
                             try:
                                 old_frame = frame_queue.get_nowait()
+                                pipeline_telemetry.incr(rtsp_url, 'frames_dropped')
                             except queue.Empty:
                                 pass
                         
@@ -318,7 +354,7 @@ class CameraStreamer:
                             ret, frame = cap_ref.retrieve()
                         except Exception as retrieve_error:
                             if current_time - last_error_log > 5.0:
-                                print(f"⚠️ 프레임 retrieve 오류: {retrieve_error}")
+                                stream_logger.warning("프레임 retrieve 오류: %s", retrieve_error)
                                 last_error_log = current_time
                             ret, frame = False, None
                         
@@ -334,22 +370,31 @@ class CameraStreamer:
                             # cv2.putText(frame, timestamp_str, (10, 30), 
                             #            cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
                             
+                            trace = frame_tracer.start(rtsp_url, current_time, timestamp_str)
+                            trace.mark('decode')
+
                             frame_data = {
                                 'frame': frame,
                                 'timestamp': current_time,
-                                'timestamp_str': timestamp_str
+                                'timestamp_str': timestamp_str,
+                                'trace': trace,
                             }
                             
-                            # 새 프레임 추가
+                            # 새 프레임 추가 - put 직후 탐지 스레드가 바로 꺼내 'dequeue' 를 찍을 수 있으므로 먼저 기록
+                            trace.mark('queue')
                             try:
                                 frame_queue.put_nowait(frame_data)
                             except queue.Full:
                                 # 큐가 가득 차면 가장 오래된 것 제거 후 추가
                                 try:
                                     frame_queue.get_nowait()
+                                    pipeline_telemetry.incr(rtsp_url, 'frames_dropped')
                                     frame_queue.put_nowait(frame_data)
                                 except:
                                     pass
+
+                            pipeline_telemetry.incr(rtsp_url, 'frames_captured')
+                            pipeline_telemetry.observe(rtsp_url, 'capture_to_queue', time.time() - current_time)
                             
                             # FPS 계산
                             with camera_info['lock']:
@@ -361,13 +406,15 @@ class CameraStreamer:
                         else:
                             # 프레임 retrieve 실패 시 연속 실패 카운터 증가
                             consecutive_failures += 1
+                            pipeline_telemetry.incr(rtsp_url, 'read_failures')
                     else:
                         # grab 실패 시 연속 실패 카운터 증가
                         consecutive_failures += 1
+                        pipeline_telemetry.incr(rtsp_url, 'read_failures')
                     
                     # 연속 실패 체크
                     if consecutive_failures > 15:  # 연속 실패 허용 횟수 초과
-                        print(f"⏹️ 연속 실패 초과 - 스레드 종료: {thread_name}")
+                        stream_logger.info("연속 실패 초과 - 스레드 종료: %s", thread_name)
                         break
                     
                     # CPU 사용량 제어 및 FFmpeg 안정성
@@ -375,32 +422,32 @@ class CameraStreamer:
                     
                 except Exception as thread_error:
                     if current_time - last_error_log > 10.0:  # 10초마다 오류 로그
-                        print(f"❌ 프레임 리더 오류 ({thread_name}): {thread_error}")
+                        stream_logger.exception("프레임 리더 오류 (%s): %s", thread_name, thread_error)
                         last_error_log = current_time
-                        import traceback
-                        traceback.print_exc()
                     
                     consecutive_failures += 1
                     if consecutive_failures > 15:  # 연속 실패 허용 횟수 초과
-                        print(f"⏹️ 연속 실패 초과 - 스레드 종료: {thread_name}")
+                        stream_logger.info("연속 실패 초과 - 스레드 종료: %s", thread_name)
                         break
                     
                     # 오류 후 짧은 대기
                     time.sleep(0.5)
                     
         except Exception as critical_error:
-            print(f"❌ 프레임 리더 스레드 치명적 오류: {critical_error}")
-            import traceback
-            traceback.print_exc()
+            stream_logger.exception("프레임 리더 스레드 치명적 오류: %s", critical_error)
             
         finally:
-            print(f"📺 프레임 리더 종료: {thread_name} ({rtsp_url})")
+            stream_logger.info("프레임 리더 종료: %s (%s)", thread_name, rtsp_url)
             # 스레드 종료 시 정리
             try:
                 # 카메라 연결 상태 업데이트
                 if camera_info:
                     with camera_info['lock']:
                         camera_info['is_connected'] = False
+                        # cleanup_camera 가 기다리다 포기한 경우 캡처 해제를 넘겨받음
+                        if camera_info.get('release_on_exit') and camera_info['cap']:
+                            camera_info['cap'].release()
+                            camera_info['cap'] = None
                 
                 # 스레드 딕셔너리에서 제거
                 if rtsp_url in self.reader_threads:
@@ -414,7 +461,7 @@ class CameraStreamer:
                         break
                         
             except Exception as cleanup_error:
-                print(f"⚠️ 정리 중 오류: {cleanup_error}")
+                stream_logger.warning("정리 중 오류: %s", cleanup_error)
 
     def flush_camera_buffer(self, rtsp_url):
         """수동으로 카메라 버퍼 비우기. 자동으로 사용하지는 않음"""
@@ -427,7 +474,7 @@ class CameraStreamer:
             if not cap:
                 return False
             
-            print(f"🔄 버퍼 플러시 시작: {rtsp_url}")
+            stream_logger.debug("버퍼 플러시 시작: %s", rtsp_url)
             frames_flushed = 0
             flush_start = time.time()
             
@@ -441,20 +488,20 @@ class CameraStreamer:
                 if frames_flushed >= 30:  # 최대 30프레임
                     break
             
-            print(f"✅ 버퍼 플러시 완료: {frames_flushed}개 프레임 제거")
+            stream_logger.debug("버퍼 플러시 완료: %s개 프레임 제거", frames_flushed)
             return True
         
     def generate_frames(self, rtsp_url):
         """영상 스트리밍 - FFmpeg 안정성 강화 버전"""
         stream_id = f"stream_{id(threading.current_thread())}"
-        print(f"📹 스트리밍 시작: {stream_id} ({rtsp_url})")
+        stream_logger.info("스트리밍 시작: %s (%s)", stream_id, rtsp_url)
         
         try:
             camera_info = self.get_camera_stream(rtsp_url)
             frame_queue = self.frame_queues.get(rtsp_url)
             
             if not camera_info or not frame_queue:
-                print(f"❌ 카메라 정보 또는 큐가 없음: {rtsp_url}")
+                stream_logger.error("카메라 정보 또는 큐가 없음: %s", rtsp_url)
                 return
             
             # 스트림 카운터 증가 (안전하게)
@@ -462,13 +509,13 @@ class CameraStreamer:
                 with camera_info['lock']:
                     camera_info['stream_count'] += 1
                     current_streams = camera_info['stream_count']
-                print(f"📊 스트림 카운터 증가: {current_streams}개 ({stream_id})")
+                stream_logger.debug("스트림 카운터 증가: %s개 (%s)", current_streams, stream_id)
             except Exception as lock_error:
-                print(f"⚠️ 스트림 카운터 증가 오류: {lock_error}")
+                stream_logger.warning("스트림 카운터 증가 오류: %s", lock_error)
                 return
                 
         except Exception as e:
-            print(f"❌ generate_frames 초기화 오류: {e}")
+            stream_logger.error("generate_frames 초기화 오류: %s", e)
             return
         
         last_frame = None
@@ -488,7 +535,7 @@ class CameraStreamer:
                     if not connection_result:
                         error_count += 1
                         if error_count > max_errors:
-                            print(f"❌ 연결 실패 초과 - 스트리밍 종료: {stream_id}")
+                            stream_logger.error("연결 실패 초과 - 스트리밍 종료: %s", stream_id)
                             break
                             
                         yield (b'--frame\r\n'
@@ -503,7 +550,7 @@ class CameraStreamer:
                 except Exception as connect_error:
                     current_time = time.time()
                     if current_time - last_error_time > 5.0:
-                        print(f"⚠️ 연결 시도 오류: {connect_error}")
+                        stream_logger.warning("연결 시도 오류: %s", connect_error)
                         last_error_time = current_time
                     time.sleep(1)
                     continue
@@ -536,7 +583,7 @@ class CameraStreamer:
                 except Exception as frame_error:
                     current_time = time.time()
                     if current_time - last_error_time > 3.0:
-                        print(f"⚠️ 프레임 가져오기 오류: {frame_error}")
+                        stream_logger.warning("프레임 가져오기 오류: %s", frame_error)
                         last_error_time = current_time
                     
                     # 마지막 프레임 사용 또는 오류 프레임 전송
@@ -564,12 +611,10 @@ class CameraStreamer:
         except GeneratorExit:
             pass
         except Exception as stream_error:
-            print(f"❌ 스트리밍 오류: {stream_error}")
-            import traceback
-            traceback.print_exc()
+            stream_logger.exception("스트리밍 오류: %s", stream_error)
             
         finally:
-            print(f"📹 스트리밍 종료: {stream_id} ({rtsp_url})")
+            stream_logger.info("스트리밍 종료: %s (%s)", stream_id, rtsp_url)
             
             # 스트림 카운터 감소 (안전하게)
             try:
@@ -578,11 +623,11 @@ class CameraStreamer:
                     remaining_streams = camera_info['stream_count']
                     is_background = self.background_streaming.get(rtsp_url, False)
                     
-                    print(f"📊 스트림 카운터 감소: {remaining_streams}개 남음")
+                    stream_logger.debug("스트림 카운터 감소: %s개 남음", remaining_streams)
                     
                     # 모든 스트림이 종료되고 백그라운드가 아닌 경우 리소스 정리
                     if remaining_streams <= 0 and not is_background:
-                        print(f"🧹 카메라 리소스 자동 정리: {rtsp_url}")
+                        stream_logger.info("카메라 리소스 자동 정리: %s", rtsp_url)
                         
                         # 카메라 연결 해제
                         if camera_info['cap']:
@@ -601,7 +646,7 @@ class CameraStreamer:
                             pass
                             
             except Exception as cleanup_error:
-                print(f"⚠️ 스트리밍 정리 오류: {cleanup_error}")
+                stream_logger.warning("스트리밍 정리 오류: %s", cleanup_error)
     
     def get_error_frame(self, message="Camera Error"):
         """에러 메시지가 포함된 프레임 생성"""
@@ -645,40 +690,41 @@ class CameraStreamer:
     
     def cleanup_camera(self, rtsp_url):
         """카메라 리소스 정리 (안전한 버전)"""
-        print(f"🧹 카메라 리소스 정리 시작: {rtsp_url}")
+        stream_logger.info("카메라 리소스 정리 시작: %s", rtsp_url)
         
         try:
             # 락 획득 시도 (타임아웃 설정)
             if not self.global_lock.acquire(timeout=3.0):
-                print(f"⚠️ 카메라 정리 락 타임아웃: {rtsp_url}")
+                stream_logger.warning("카메라 정리 락 타임아웃: %s", rtsp_url)
                 return False
             
             try:
                 if rtsp_url in self.cameras:
                     camera_info = self.cameras[rtsp_url]
                     
+                    # 리더 스레드 중지 신호 - grab() 중인 캡처를 해제하면 FFmpeg 가 segfault 하므로
+                    # 리더가 끝난 뒤에 release() 한다
+                    with camera_info['lock']:
+                        camera_info['is_connected'] = False
+                    
+                    # 스레드 종료 대기
+                    thread = self.reader_threads.pop(rtsp_url, None)
+                    if thread and thread.is_alive() and thread is not threading.current_thread():
+                        stream_logger.info("스레드 종료 대기: %s", rtsp_url)
+                        thread.join(timeout=READER_JOIN_TIMEOUT)
+                    
                     # 카메라 연결 해제 (안전하게)
                     try:
                         with camera_info['lock']:
-                            if camera_info['cap']:
+                            if thread and thread.is_alive():
+                                # grab() 이 아직 끝나지 않음 - 리더가 종료하면서 해제
+                                stream_logger.warning("리더 스레드 종료 지연 - 종료 시 캡처 해제: %s", rtsp_url)
+                                camera_info['release_on_exit'] = True
+                            elif camera_info['cap']:
                                 camera_info['cap'].release()
                                 camera_info['cap'] = None
-                            camera_info['is_connected'] = False
                     except Exception as e:
-                        print(f"⚠️ 카메라 연결 해제 오류: {e}")
-                    
-                    # 스레드 종료 (비동기적으로)
-                    if rtsp_url in self.reader_threads:
-                        thread = self.reader_threads[rtsp_url]
-                        if thread.is_alive():
-                            print(f"🔄 스레드 종료 대기: {rtsp_url}")
-                            try:
-                                thread.join(timeout=1.0)  # 짧은 타임아웃
-                                if thread.is_alive():
-                                    print(f"⚠️ 스레드 강제 종료: {rtsp_url}")
-                            except Exception as e:
-                                print(f"⚠️ 스레드 종료 오류: {e}")
-                        del self.reader_threads[rtsp_url]
+                        stream_logger.warning("카메라 연결 해제 오류: %s", e)
                     
                     # 큐 정리
                     if rtsp_url in self.frame_queues:
@@ -691,46 +737,44 @@ class CameraStreamer:
                                     break
                             del self.frame_queues[rtsp_url]
                         except Exception as e:
-                            print(f"⚠️ 플레임 큐 정리 오류: {e}")
+                            stream_logger.warning("플레임 큐 정리 오류: %s", e)
                     
                     # 카메라 정보 삭제
                     del self.cameras[rtsp_url]
-                    print(f"✅ 카메라 리소스 정리 완료: {rtsp_url}")
+                    stream_logger.info("카메라 리소스 정리 완료: %s", rtsp_url)
                     return True
                 else:
-                    print(f"⚠️ 카메라 정보 없음: {rtsp_url}")
+                    stream_logger.warning("카메라 정보 없음: %s", rtsp_url)
                     return False
                     
             finally:
                 self.global_lock.release()
                 
         except Exception as e:
-            print(f"❌ 카메라 정리 중 치명적 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            stream_logger.exception("카메라 정리 중 치명적 오류: %s", e)
             return False
     
     def start_background_streaming(self, rtsp_url):
         """백그라운드 연속 스트리밍 시작"""
-        print(f"🔄 백그라운드 스트리밍 시작 시도: {rtsp_url}")
+        stream_logger.info("백그라운드 스트리밍 시작 시도: %s", rtsp_url)
         
         # 락 타임아웃으로 데드락 방지
         if self.global_lock.acquire(timeout=3.0):
             try:
                 self.background_streaming[rtsp_url] = True
-                print(f"🔄 백그라운드 스트리밍 플래그 설정: {rtsp_url}")
+                stream_logger.debug("백그라운드 스트리밍 플래그 설정: %s", rtsp_url)
             finally:
                 self.global_lock.release()
         else:
-            print(f"⚠️ 백그라운드 스트리밍 락 타임아웃: {rtsp_url}")
+            stream_logger.warning("백그라운드 스트리밍 락 타임아웃: %s", rtsp_url)
             return False
             
         # 카메라 연결 확인 및 스트림 시작 (락 외부에서)
         if self.connect_camera(rtsp_url):
-            print(f"✅ 백그라운드 스트리밍 활성화: {rtsp_url}")
+            stream_logger.info("백그라운드 스트리밍 활성화: %s", rtsp_url)
             return True
         else:
-            print(f"❌ 백그라운드 스트리밍 실패 (연결 불가): {rtsp_url}")
+            stream_logger.error("백그라운드 스트리밍 실패 (연결 불가): %s", rtsp_url)
             return False
     
     def stop_background_streaming(self, rtsp_url):
@@ -739,7 +783,7 @@ class CameraStreamer:
             if rtsp_url in self.background_streaming:
                 self.background_streaming[rtsp_url] = False
                 del self.background_streaming[rtsp_url]
-                print(f"⏹️ 백그라운드 스트리밍 중지: {rtsp_url}")
+                stream_logger.info("백그라운드 스트리밍 중지: %s", rtsp_url)
     
     def is_background_streaming(self, rtsp_url):
         """백그라운드 스트리밍 상태 확인"""
@@ -750,14 +794,14 @@ class CameraStreamer:
         from .models import Camera
         cameras = Camera.objects.all()  # 매번 최신 카메라 목록을 가져옴
         
-        print(f"🔄 백그라운드 스트리밍 시작: 총 {cameras.count()}개 카메라")
+        stream_logger.info("백그라운드 스트리밍 시작: 총 %s개 카메라", cameras.count())
         
         for camera in cameras:
             try:
                 self.start_background_streaming(camera.rtsp_url)
-                print(f"✅ 카메라 '{camera.name}' 백그라운드 스트리밍 시작")
+                stream_logger.info("카메라 '%s' 백그라운드 스트리밍 시작", camera.name)
             except Exception as e:
-                print(f"❌ 카메라 '{camera.name}' 백그라운드 스트리밍 실패: {e}")
+                stream_logger.error("카메라 '%s' 백그라운드 스트리밍 실패: %s", camera.name, e)
     
     def stop_all_background_streaming(self):
         """모든 백그라운드 스트리밍 중지"""
@@ -767,7 +811,7 @@ class CameraStreamer:
     
     def cleanup_all_resources(self):
         """모든 카메라 리소스 정리 (메모리 누수 방지)"""
-        print("🧹 모든 카메라 리소스 정리 시작...")
+        stream_logger.info("모든 카메라 리소스 정리 시작...")
         
         # 모든 백그라운드 스트리밍 중지
         self.stop_all_background_streaming()
@@ -778,18 +822,28 @@ class CameraStreamer:
             for rtsp_url in rtsp_urls:
                 self.cleanup_camera(rtsp_url)
         
-        print("✅ 모든 카메라 리소스 정리 완료")
+        stream_logger.info("모든 카메라 리소스 정리 완료")
 
 class AIDetectionSystem:
     def __init__(self):
+        # 모델은 생성 시 로드하지 않음 - start_model_loading() 으로 백그라운드 로드
+        # (manage.py 명령이나 views import 시 torch/YOLO/CLIP 로딩 비용이 들지 않도록)
         self.yolo_model = None
         self.clip_model = None
         self.clip_preprocess = None
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = "cpu"
+        self.yolo_backend = None
+        self.yolo_imgsz = YOLO_IMGSZ
+        self.model_state = MODEL_STATE_IDLE
+        self.model_error = None
+        self.model_load_seconds = None
+        self.model_lock = threading.Lock()
+        self.models_ready = threading.Event()
         self.detection_threads = {}
         self.detection_active = {}
+        self.detection_interval = DETECTION_INTERVAL
+        self.detection_engine = DETECTION_ENGINE
         self.screenshot_dir = os.path.join(settings.MEDIA_ROOT, 'screenshots')
-        self.load_models()
         self.ensure_screenshot_dir()
         
         # 전역 큐 사용
@@ -816,13 +870,13 @@ class AIDetectionSystem:
             if os.path.exists(font_path):
                 try:
                     self.korean_font = font_path
-                    print(f"✅ 한글 폰트 로드: {font_path}")
+                    detection_logger.info("한글 폰트 로드: %s", font_path)
                     break
                 except:
                     continue
         
         if not self.korean_font:
-            print("⚠️ 한글 폰트를 찾을 수 없습니다. 영문만 표시됩니다.")
+            detection_logger.warning("한글 폰트를 찾을 수 없습니다. 영문만 표시됩니다.")
     
     def ensure_screenshot_dir(self):
         """스크린샷 저장 디렉토리 생성"""
@@ -834,13 +888,89 @@ class AIDetectionSystem:
         if not os.path.exists(self.all_detection_dir):
             os.makedirs(self.all_detection_dir, exist_ok=True)
     
+    def start_model_loading(self):
+        """백그라운드 스레드에서 모델 로드 시작 (이미 로딩 중이거나 완료되었으면 무시)"""
+        with self.model_lock:
+            if self.model_state in (MODEL_STATE_LOADING, MODEL_STATE_READY):
+                return False
+            self.model_state = MODEL_STATE_LOADING
+            self.model_error = None
+
+        thread = threading.Thread(target=self._model_loader_thread, name="AIModelLoader", daemon=True)
+        thread.start()
+        return True
+
+    def _model_loader_thread(self):
+        load_start = time.time()
+        self.load_models()
+        self.model_load_seconds = round(time.time() - load_start, 2)
+
+        with self.model_lock:
+            if self.detection_engine == ENGINE_OPEN_VOCAB:
+                loaded = open_vocab_detector.model is not None
+                load_error = "오픈 어휘 탐지 모델 로드 실패"
+            else:
+                loaded = self.yolo_model is not None and self.clip_model is not None
+                load_error = "YOLO 또는 CLIP 모델 로드 실패"
+
+            if loaded:
+                if self.detection_engine != ENGINE_OPEN_VOCAB:
+                    # 모든 카메라의 CLIP 크롭을 마이크로 배치로 묶는 분류 서비스
+                    clip_classifier.start(self.clip_model, self.clip_preprocess, self.device)
+                self.model_state = MODEL_STATE_READY
+                self.models_ready.set()
+            else:
+                self.model_state = MODEL_STATE_FAILED
+                self.model_error = self.model_error or load_error
+
+        detection_logger.info("AI 모델 로딩 상태: %s (%s초)", self.model_state, self.model_load_seconds)
+
+    def is_ready(self):
+        return self.models_ready.is_set()
+
+    def wait_until_ready(self, timeout=None):
+        """모델 로드 완료까지 대기 (로드 시작 전이면 시작, 실패 상태는 재시도하지 않음)"""
+        if self.model_state == MODEL_STATE_IDLE:
+            self.start_model_loading()
+        return self.models_ready.wait(timeout)
+
+    def get_model_status(self):
+        """상태 API 용 모델 로딩 상태"""
+        return {
+            'state': self.model_state,
+            'ready': self.models_ready.is_set(),
+            'device': self.device,
+            'detection_engine': self.detection_engine,
+            'open_vocab': open_vocab_detector.get_status() if self.detection_engine == ENGINE_OPEN_VOCAB else None,
+            'yolo_backend': self.yolo_backend,
+            'clip_quantized': self.clip_model is not None and is_quantized(self.clip_model),
+            'clip_batching': clip_classifier.get_status(),
+            'prompt_embeddings': prompt_embedding_cache.get_status(),
+            'error': self.model_error,
+            'load_seconds': self.model_load_seconds,
+        }
+
     def load_models(self):
-        """YOLO11 및 CLIP 모델 로드 (디버그 추가)"""
-        print("\n🔧 AI 모델 로드 시작...")
-        print(f"  - PyTorch 버전: {torch.__version__}")
-        print(f"  - CUDA 사용 가능: {torch.cuda.is_available()}")
+        """YOLO11 및 CLIP 모델 로드 (디버그 추가) - open_vocab 엔진이면 오픈 어휘 모델만 로드"""
+        import torch
+
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+        detection_logger.info("AI 모델 로드 시작... (탐지 엔진: %s)", self.detection_engine)
+        detection_logger.info("PyTorch 버전: %s", torch.__version__)
+        detection_logger.info("CUDA 사용 가능: %s", torch.cuda.is_available())
         if torch.cuda.is_available():
-            print(f"  - CUDA 디바이스: {torch.cuda.get_device_name(0)}")
+            detection_logger.info("CUDA 디바이스: %s", torch.cuda.get_device_name(0))
+
+        if self.detection_engine == ENGINE_OPEN_VOCAB:
+            try:
+                open_vocab_detector.load(self.device)
+            except Exception as e:
+                detection_logger.exception("오픈 어휘 탐지 모델 로드 실패: %s", e)
+                self.model_error = str(e)
+            return
+
+        import clip
         
         try:
             # 리눅스/우분투 환경에서 디스플레이 서버 없이 OpenCV 실행 설정
@@ -853,41 +983,52 @@ class AIDetectionSystem:
             
             # YOLO11 모델 로드
             yolo_path = os.path.join(settings.BASE_DIR, 'CCTV', 'yolo11l.pt')
-            print(f"  - YOLO 모델 경로: {yolo_path}")
-            print(f"  - YOLO 모델 존재: {os.path.exists(yolo_path)}")
+            detection_logger.info("YOLO 모델 경로: %s", yolo_path)
+            detection_logger.info("YOLO 모델 존재: %s", os.path.exists(yolo_path))
             
             if os.path.exists(yolo_path):
-                # 헤드리스 환경에서 YOLO 모델 로드 시 verbose=False 설정
-                self.yolo_model = YOLO(yolo_path)
+                # CUDA 가 없으면 ONNX Runtime / OpenVINO export 모델 사용 (settings.CCTV_YOLO_BACKEND)
+                self.yolo_model, self.yolo_backend = load_yolo_model(
+                    yolo_path,
+                    backend=getattr(settings, 'CCTV_YOLO_BACKEND', 'auto'),
+                    imgsz=self.yolo_imgsz,
+                    cuda_available=torch.cuda.is_available(),
+                )
                 # GPU 사용 불가능한 경우 CPU로 강제 설정
                 if not torch.cuda.is_available():
                     self.device = "cpu"
-                print(f"✅ YOLO11 모델 로드 완료: {yolo_path} (device: {self.device})")
+                detection_logger.info(
+                    "YOLO11 모델 로드 완료: %s (device: %s, backend: %s)", yolo_path, self.device, self.yolo_backend
+                )
                 
                 # YOLO 클래스 정보 출력
                 if hasattr(self.yolo_model, 'model') and hasattr(self.yolo_model.model, 'names'):
-                    print(f"  - YOLO 클래스 수: {len(self.yolo_model.model.names)}")
+                    detection_logger.info("YOLO 클래스 수: %s", len(self.yolo_model.model.names))
                     # print(f"  - YOLO 주요 클래스: {list(self.yolo_model.model.names.values())[:10]}...")
-                    print(f"  - YOLO 주요 클래스: {list(self.yolo_model.model.names.values())}...")
+                    detection_logger.debug("YOLO 주요 클래스: %s...", list(self.yolo_model.model.names.values()))
             else:
-                print(f"❌ YOLO11 모델 파일을 찾을 수 없습니다: {yolo_path}")
+                detection_logger.error("YOLO11 모델 파일을 찾을 수 없습니다: %s", yolo_path)
             
             # CLIP 모델 로드
             try:
-                print(f"\n  - CLIP 모델 로드 중...")
-                self.clip_model, self.clip_preprocess = clip.load("ViT-L/14@336px", device=self.device)
-                print(f"✅ CLIP 모델 로드 완료 (device: {self.device})")
+                detection_logger.info("CLIP 모델 로드 중...")
+                self.clip_model, self.clip_preprocess = clip.load(CLIP_MODEL_NAME, device=self.device)
+                detection_logger.info("CLIP 모델 로드 완료 (device: %s)", self.device)
             except Exception as clip_error:
                 # CLIP 모델 로드 실패 시 CPU로 재시도
-                print(f"⚠️ CLIP GPU 로드 실패, CPU로 재시도: {clip_error}")
+                detection_logger.warning("CLIP GPU 로드 실패, CPU로 재시도: %s", clip_error)
                 self.device = "cpu"
-                self.clip_model, self.clip_preprocess = clip.load("ViT-L/14@336px", device=self.device)
-                print(f"✅ CLIP 모델 CPU 로드 완료")
+                self.clip_model, self.clip_preprocess = clip.load(CLIP_MODEL_NAME, device=self.device)
+                detection_logger.info("CLIP 모델 CPU 로드 완료")
+
+            # CPU 배포에서 선택적으로 이미지 인코더 int8 동적 양자화 (settings.CCTV_CLIP_QUANTIZE)
+            if self.device == "cpu" and getattr(settings, 'CCTV_CLIP_QUANTIZE', False):
+                quantize_clip_visual(self.clip_model)
+                detection_logger.info("CLIP 이미지 인코더 int8 동적 양자화 적용")
             
         except Exception as e:
-            print(f"❌ AI 모델 로드 실패: {e}")
-            import traceback
-            traceback.print_exc()
+            detection_logger.exception("AI 모델 로드 실패: %s", e)
+            self.model_error = str(e)
             # 모델 로드 실패 시에도 시스템이 계속 동작하도록 설정
             self.yolo_model = None
             self.clip_model = None
@@ -898,15 +1039,15 @@ class AIDetectionSystem:
         if camera.id in self.detection_threads:
             old_thread = self.detection_threads[camera.id]
             if old_thread and old_thread.is_alive():
-                print(f"⏳ 카메라 '{camera.name}' 기존 탐지 스레드 종료 대기...")
+                detection_logger.info("카메라 '%s' 기존 탐지 스레드 종료 대기...", camera.name)
                 # 플래그를 False로 설정
                 self.detection_active[camera.id] = False
                 # 스레드가 종료될 때까지 최대 5초 대기
                 old_thread.join(timeout=5.0)
                 if old_thread.is_alive():
-                    print(f"⚠️ 카메라 '{camera.name}' 기존 스레드 강제 종료 (타임아웃)")
+                    detection_logger.warning("카메라 '%s' 기존 스레드 강제 종료 (타임아웃)", camera.name)
                 else:
-                    print(f"✅ 카메라 '{camera.name}' 기존 스레드 정상 종료됨")
+                    detection_logger.info("카메라 '%s' 기존 스레드 정상 종료됨", camera.name)
         
         # 새로운 탐지 스레드 시작
         self.detection_active[camera.id] = True
@@ -918,27 +1059,44 @@ class AIDetectionSystem:
         )
         self.detection_threads[camera.id] = detection_thread
         detection_thread.start()
-        print(f"🎯 카메라 '{camera.name}' 새로운 탐지 스레드 시작")
+        detection_logger.info("카메라 '%s' 새로운 탐지 스레드 시작", camera.name)
+
+        # 경고 라벨이 있는 카메라는 이벤트 클립용 pre-event 버퍼 유지
+        if camera.target_labels.filter(has_alert=True).exists():
+            event_clip_recorder.enable_for_camera(camera)
+        else:
+            event_clip_recorder.disable_for_camera(camera.id)
     
     def stop_detection_for_camera(self, camera_id):
         """특정 카메라에 대한 탐지 중지"""
         if camera_id in self.detection_active:
             self.detection_active[camera_id] = False
-            print(f"⏹️ 카메라 ID {camera_id} 탐지 중지")
+            detection_logger.info("카메라 ID %s 탐지 중지", camera_id)
+        event_clip_recorder.disable_for_camera(camera_id)
+        tracker_registry.remove(camera_id)
+        crop_cache_registry.remove(camera_id)
+        try:
+            event_engine.close_expired(camera_id, force=True)
+        except Exception as e:
+            detection_logger.warning("이벤트 종료 기록 오류: %s", e)
     
     def _detection_worker(self, camera):
         """카메라별 탐지 워커 - 타임스탬프 표시 버전"""
         from .models import TargetLabel, DetectionLog
         
-        print(f"\n🚀 탐지 워커 시작: 카메라 '{camera.name}' (ID: {camera.id})")
+        detection_logger.info("탐지 워커 시작: 카메라 '%s' (ID: %s)", camera.name, camera.id)
         last_detection_time = time.time()
         
         while self.detection_active.get(camera.id, False):
             try:
+                # 모델 로드 완료 전에는 프레임을 소비하지 않고 대기
+                if not self.wait_until_ready(timeout=1.0):
+                    continue
+
                 camera_info = camera_streamer.get_camera_stream(camera.rtsp_url)
                 
                 if not camera_info['is_connected']:
-                    print(f"⚠️ 카메라 '{camera.name}' 연결되지 않음")
+                    detection_logger.warning("카메라 '%s' 연결되지 않음", camera.name)
                     time.sleep(2)
                     continue
                 
@@ -960,11 +1118,18 @@ class AIDetectionSystem:
                     frame = frame_data.get('frame')
                     frame_timestamp = frame_data.get('timestamp_str', 'Unknown')
                     frame_age = time.time() - frame_data.get('timestamp', time.time())
+                    trace = frame_data.get('trace')
                 else:
                     # 구버전 호환성
                     frame = frame_data
                     frame_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                     frame_age = 0
+                    trace = None
+
+                if trace is not None:
+                    trace.mark('dequeue')
+
+                pipeline_telemetry.observe(camera.rtsp_url, 'queue_wait', frame_age)
                 
                 if frame is None:
                     continue
@@ -979,45 +1144,58 @@ class AIDetectionSystem:
                 
                 # 프레임이 너무 오래되었으면 스킵
                 if frame_age > 5.0:
-                    print(f"   ⚠️ 프레임이 너무 오래됨 ({frame_age:.1f}초), 스킵")
+                    detection_logger.warning("프레임이 너무 오래됨 (%.1f초), 스킵", frame_age)
+                    pipeline_telemetry.incr(camera.rtsp_url, 'frames_stale')
+                    frame_tracer.finish(trace, status='stale')
                     continue
                 
                 # 매 루프마다 카메라와 타겟 라벨 정보를 DB에서 새로 가져오기 (중요!)
                 try:
                     from .models import Camera
-                    camera = Camera.objects.prefetch_related('target_labels').get(id=camera.id)
+                    camera = Camera.objects.select_related('roi').prefetch_related('target_labels').get(id=camera.id)
                     target_labels = list(camera.target_labels.all())
                 except Camera.DoesNotExist:
-                    print(f"❌ 카메라 ID {camera.id}가 삭제됨 - 탐지 중지")
+                    detection_logger.error("카메라 ID %s가 삭제됨 - 탐지 중지", camera.id)
                     break
                 
                 if not target_labels:
-                    print(f"⚠️ 카메라 '{camera.name}'에 타겟 라벨이 없음")
+                    detection_logger.warning("카메라 '%s'에 타겟 라벨이 없음", camera.name)
                     time.sleep(5)
                     continue
                 
-                print(f"🎯 타겟 라벨 {len(target_labels)}개로 탐지 시작")
+                detection_logger.debug("타겟 라벨 %s개로 탐지 시작", len(target_labels))
                 
                 # 탐지 시작 시간 기록
                 detection_start = time.time()
                 
                 # 객체 탐지 수행
                 # detections = self._detect_objects(frame, target_labels)
-                detections = self._detect_objects(frame, target_labels, camera)
+                detections = self._detect_objects(frame, target_labels, camera, trace=trace)
 
                 # 탐지 소요 시간
                 detection_duration = time.time() - detection_start
-                print(f"⏱️ 탐지 소요 시간: {detection_duration:.2f}초")
+                detection_logger.debug("탐지 소요 시간: %.2f초", detection_duration)
+                pipeline_telemetry.observe(camera.rtsp_url, 'detection', detection_duration)
+                pipeline_telemetry.incr(camera.rtsp_url, 'detection_cycles')
                 
-                # 탐지 결과 처리
-                if detections:
+                # 탐지 결과 처리 - 새로 열린 이벤트만 로그/스크린샷/알림 생성
+                # (스크린샷은 _process_detection 에서 저장)
+                opened = event_engine.update(camera.id, detections)
+                if opened:
                     # print(f"✨ 탐지 완료! {len(detections)}개 타겟 발견 (시간: {current_time})")
-                    for detection in detections:
-                        self._process_detection(camera, frame, detection, target_labels)
-                        # 매 탐지마다 별도 스크린샷 저장
-                        self._save_all_detection_screenshot(camera, frame, detection)
+                    for detection in opened:
+                        log = self._process_detection(camera, frame, detection, target_labels, trace=trace)
+                        if log is not None:
+                            event_engine.attach_log(camera.id, detection, log.id)
+                    pipeline_telemetry.incr(camera.rtsp_url, 'events_opened', len(opened))
+                    frame_tracer.finish(trace, status='detected')
+                elif detections:
+                    frame_tracer.finish(trace, status='ongoing')
                 else:
-                    pass
+                    frame_tracer.finish(trace, status='empty')
+
+                # 오래 보이지 않은 이벤트 종료
+                event_engine.close_expired(camera.id)
                 
                 # 탐지 간격 계산 및 표시
                 # time_since_last = time.time() - last_detection_time
@@ -1025,15 +1203,13 @@ class AIDetectionSystem:
                 # last_detection_time = time.time()
                 
                 # 탐지 간격
-                time.sleep(1.5)
+                time.sleep(self.detection_interval)
                 
             except Exception as e:
-                print(f"❌ 탐지 워커 오류 (카메라: {camera.name}): {e}")
-                import traceback
-                traceback.print_exc()
+                detection_logger.exception("탐지 워커 오류 (카메라: %s): %s", camera.name, e)
                 time.sleep(2)
         
-        print(f"🛑 탐지 워커 종료: 카메라 '{camera.name}'")
+        detection_logger.info("탐지 워커 종료: 카메라 '%s'", camera.name)
 
     # ==================== 클러스터링 헬퍼 함수들 ====================
 
@@ -1104,6 +1280,7 @@ class AIDetectionSystem:
                     distances[j, i] = dist
 
         # DBSCAN 클러스터링
+        from sklearn.cluster import DBSCAN
         clustering = DBSCAN(eps=distance_threshold, min_samples=1, metric='precomputed')
         labels = clustering.fit_predict(distances)
 
@@ -1129,7 +1306,31 @@ class AIDetectionSystem:
 
     # ==================== 객체 탐지 함수 ====================
 
-    def _detect_objects(self, frame, target_labels, camera):
+    def _prepare_roi_input(self, frame, camera, resize=True):
+        """
+        ROI 바운딩 영역 크롭 → (추론 입력, imgsz, (offset_x, offset_y), ROI 폴리곤 또는 None)
+
+        resize=False 면 입력 크기가 고정된 모델용으로 imgsz 를 줄이지 않는다.
+        """
+        roi_points = get_roi_points(camera)
+        if not roi_points:
+            return frame, self.yolo_imgsz, (0, 0), None
+
+        roi_polygon = to_pixel_polygon(roi_points, frame.shape)
+        crop_x1, crop_y1, crop_x2, crop_y2 = get_crop_region(roi_polygon, frame.shape)
+        if crop_x2 <= crop_x1 or crop_y2 <= crop_y1:
+            return frame, self.yolo_imgsz, (0, 0), roi_polygon
+
+        imgsz = self.yolo_imgsz
+        if resize:
+            imgsz = get_crop_imgsz((crop_x1, crop_y1, crop_x2, crop_y2), frame.shape, self.yolo_imgsz)
+        return frame[crop_y1:crop_y2, crop_x1:crop_x2], imgsz, (crop_x1, crop_y1), roi_polygon
+
+    def _advance_tracks(self, camera):
+        """박스가 없는 주기도 트래커에 반영 (missed 증가 → 오래된 트랙 만료, 새 객체가 이전 트랙 분류를 이어받지 않음)"""
+        tracker_registry.get(camera.id).update([])
+
+    def _detect_objects(self, frame, target_labels, camera, trace=None):
         """
         person 객체만 탐지하는 Softmax 방식 객체 탐지 (클러스터링 적용)
         - YOLO에서 person 클래스만 필터링
@@ -1137,6 +1338,9 @@ class AIDetectionSystem:
         - CLIP이 모든 라벨 + "other object"를 동시에 비교
         - person 객체 탐지 시 20% 확장된 영역 사용
         """
+        if self.detection_engine == ENGINE_OPEN_VOCAB:
+            return self._detect_objects_open_vocab(frame, target_labels, camera, trace=trace)
+
         detections = []
         
         # 임계치 설정
@@ -1144,90 +1348,137 @@ class AIDetectionSystem:
         CLIP_CONFIDENCE_THRESHOLD = 0.73   # CLIP softmax 최소 신뢰도
         
         if self.yolo_model is None or self.clip_model is None:
-            print("⚠️ YOLO 또는 CLIP 모델이 로드되지 않음")
+            detection_logger.warning("YOLO 또는 CLIP 모델이 로드되지 않음")
             return detections
         
         try:
+            # 0. ROI 가 있으면 ROI 바운딩 영역만 작은 imgsz 로 추론
+            #    export 모델(ONNX/OpenVINO)은 입력 크기가 고정이라 imgsz 는 그대로 사용
+            yolo_input, yolo_imgsz, (offset_x, offset_y), roi_polygon = self._prepare_roi_input(
+                frame, camera, resize=self.yolo_backend in (None, 'torch')
+            )
+
             # 1. YOLO로 후보 박스 추출
-            results = self.yolo_model(frame, conf=YOLO_CANDIDATE_THRESHOLD, imgsz=960)
-            
-            if not results or len(results) == 0:
+            #    타일 모드: 전체 프레임 + 겹치는 타일을 배치 추론 후 NMS 로 병합
+            #    (export 모델은 배치/입력 크기가 고정이라 타일마다 고정 imgsz 로 호출)
+            with pipeline_telemetry.timer(camera.rtsp_url, 'yolo'):
+                if camera.tiled_inference:
+                    eager_backend = self.yolo_backend in (None, 'torch')
+                    boxes, confidences, classes, class_names = run_tiled_inference(
+                        self.yolo_model,
+                        yolo_input,
+                        tile_size=camera.tile_size,
+                        overlap=camera.tile_overlap,
+                        conf=YOLO_CANDIDATE_THRESHOLD,
+                        batched=eager_backend,
+                        fixed_imgsz=None if eager_backend else self.yolo_imgsz,
+                    )
+                else:
+                    results = self.yolo_model(yolo_input, conf=YOLO_CANDIDATE_THRESHOLD, imgsz=yolo_imgsz)
+                    if not results or len(results) == 0 or results[0].boxes is None:
+                        self._advance_tracks(camera)
+                        return detections
+                    yolo_result = results[0]
+                    boxes = yolo_result.boxes.xyxy.cpu().numpy()
+                    confidences = yolo_result.boxes.conf.cpu().numpy() if yolo_result.boxes.conf is not None else []
+                    classes = yolo_result.boxes.cls.cpu().numpy() if yolo_result.boxes.cls is not None else []
+                    # YOLO 클래스 이름 가져오기
+                    class_names = yolo_result.names if hasattr(yolo_result, 'names') else {}
+            if trace is not None:
+                trace.mark('yolo')
+
+            if len(boxes) == 0:
+                self._advance_tracks(camera)
                 return detections
+
+            # ROI 크롭 좌표 → 원본 프레임 좌표
+            if offset_x or offset_y:
+                boxes[:, [0, 2]] += offset_x
+                boxes[:, [1, 3]] += offset_y
             
-            yolo_result = results[0]
+            # person 클래스만 필터링 (COCO 데이터셋에서 person은 클래스 0)
+            person_mask = classes == 0  # person 클래스 ID
+
+            # ROI 폴리곤 밖의 박스는 CLIP 전에 제외
+            if roi_polygon is not None and person_mask.any():
+                person_mask &= boxes_in_polygon(boxes, roi_polygon)
             
-            if not hasattr(yolo_result, 'boxes') or yolo_result.boxes is not None:
-                boxes = yolo_result.boxes.xyxy.cpu().numpy()
-                confidences = yolo_result.boxes.conf.cpu().numpy() if yolo_result.boxes.conf is not None else []
-                classes = yolo_result.boxes.cls.cpu().numpy() if yolo_result.boxes.cls is not None else []
-                
-                if len(boxes) == 0:
-                    return detections
-                
-                # YOLO 클래스 이름 가져오기
-                class_names = yolo_result.names if hasattr(yolo_result, 'names') else {}
-                
-                # person 클래스만 필터링 (COCO 데이터셋에서 person은 클래스 0)
-                person_mask = classes == 0  # person 클래스 ID
+            if not person_mask.any():
+                detection_logger.debug("YOLO에서 person 객체를 찾지 못했음")
+                self._advance_tracks(camera)
+                return detections
                 
-                if not person_mask.any():
-                    print("📊 YOLO에서 person 객체를 찾지 못했음")
-                    return detections
-                    
-                # person 객체만 필터링
-                person_boxes = boxes[person_mask]
-                person_confidences = confidences[person_mask]
-                person_classes = classes[person_mask]
+            # person 객체만 필터링
+            person_boxes = boxes[person_mask]
+            person_confidences = confidences[person_mask]
+            person_classes = classes[person_mask]
 
-                print(f"📊 YOLO person 객체: {len(person_boxes)}개 탐지")
+            detection_logger.debug("YOLO person 객체: %s개 탐지", len(person_boxes))
 
-                # 1.5. person 박스 클러스터링 (겹치거나 가까운 박스 병합)
+            # 1.5. person 박스 클러스터링 (겹치거나 가까운 박스 병합)
+            with pipeline_telemetry.timer(camera.rtsp_url, 'clustering'):
                 clustered_groups = self._cluster_person_boxes(
                     person_boxes,
                     distance_threshold=150,  # 중심점 간 최대 거리 (픽셀)
                     iou_threshold=0.3        # IoU 임계값 (30% 이상 겹치면 병합)
                 )
+            if trace is not None:
+                trace.mark('cluster')
 
-                print(f"🔗 클러스터링 결과: {len(person_boxes)}개 박스 → {len(clustered_groups)}개 그룹")
-                for group_idx, group_info in enumerate(clustered_groups):
-                    print(f"   그룹 {group_idx+1}: {group_info['count']}명")
+            detection_logger.debug("클러스터링 결과: %s개 박스 → %s개 그룹", len(person_boxes), len(clustered_groups))
+            for group_idx, group_info in enumerate(clustered_groups):
+                detection_logger.debug("그룹 %s: %s명", group_idx+1, group_info['count'])
 
-                # 2. CLIP을 위한 텍스트 준비 (DB 라벨 + "other object")
-                text_queries = []
-                label_indices = []  # 각 쿼리가 어떤 라벨에 해당하는지 추적
-                
-                # DB에서 가져온 라벨들
-                for i, target_label in enumerate(target_labels):
-                    query = f"a photo of {target_label.label_name}"
-                    text_queries.append(query)
-                    label_indices.append(i)
-                
-                # "other object" 추가 (항상 마지막)
-                text_queries.append("other object")
-                other_object_idx = len(text_queries) - 1
-                
-                # print(f"등록된 객체 이름 : {[tl.display_name for tl in target_labels]}")
-                # print(f"🎯 비교할 라벨: {[tl.label_name for tl in target_labels]} + 'other object'")
-                
-                # 텍스트 토큰화
-                text_tokens = clip.tokenize(text_queries).to(self.device)
-                
-                with torch.no_grad():
-                    text_features = self.clip_model.encode_text(text_tokens)
-                    text_features = text_features / text_features.norm(dim=-1, keepdim=True)
-                
-                # 3. 각 타겟 라벨별로 탐지된 박스들을 수집
-                label_detections = {i: [] for i in range(len(target_labels))}
-                
-                # print(f"🔧 현재 CLIP_CONFIDENCE_THRESHOLD: {CLIP_CONFIDENCE_THRESHOLD}")
+            # 2. CLIP을 위한 텍스트 준비 (DB 라벨별 프롬프트 목록 + "other object")
+            clip_start = time.perf_counter()
+            text_queries = []
+            label_indices = []  # 각 쿼리가 어떤 라벨에 해당하는지 추적
+            
+            # DB에서 가져온 라벨들 (라벨마다 프롬프트 앙상블)
+            for i, target_label in enumerate(target_labels):
+                text_queries.append(target_label.get_prompts())
+                label_indices.append(i)
+            
+            # "other object" 추가 (항상 마지막)
+            text_queries.append(["other object"])
+            other_object_idx = len(text_queries) - 1
+            
+            # print(f"등록된 객체 이름 : {[tl.display_name for tl in target_labels]}")
+            # print(f"🎯 비교할 라벨: {[tl.label_name for tl in target_labels]} + 'other object'")
+            
+            # 3. 각 타겟 라벨별로 탐지된 박스들을 수집
+            label_detections = {i: [] for i in range(len(target_labels))}
+            label_positions = {target_label.id: i for i, target_label in enumerate(target_labels)}
+            
+            # print(f"🔧 현재 CLIP_CONFIDENCE_THRESHOLD: {CLIP_CONFIDENCE_THRESHOLD}")
+
+            # 3.5. 그룹을 트랙에 연결 (트랙별 분류 결과 캐시 재사용)
+            label_signature = tuple((tl.id, tuple(tl.get_prompts())) for tl in target_labels)
+            tracker = tracker_registry.get(camera.id)
+            tracker.sync_labels(label_signature)
+            tracks = tracker.update([group_info['box'] for group_info in clustered_groups])
+            crop_cache = crop_cache_registry.get(camera.id)
+            crop_cache.sync_labels(label_signature)
+            classified_count = 0
+            cache_hits = 0
+            crop_cache_hits = 0
+            crop_cache_misses = 0
 
-                # 4. 각 클러스터링된 그룹에 대해 CLIP으로 분류
-                for group_idx, group_info in enumerate(clustered_groups):
-                    merged_box = group_info['box']
-                    person_count = group_info['count']
+            # 4. 각 클러스터링된 그룹에 대해 CLIP으로 분류
+            #    캐시 미스 크롭은 모아서 배치 분류 서비스에 한 번에 요청 (카메라 간 마이크로 배치)
+            pending = []  # (group_info, track, [x1, y1, x2, y2], pil_crop)
+            for group_idx, group_info in enumerate(clustered_groups):
+                merged_box = group_info['box']
+                person_count = group_info['count']
+                track = tracks[group_idx]
 
-                    x1, y1, x2, y2 = map(int, merged_box)
+                x1, y1, x2, y2 = map(int, merged_box)
 
+                if not tracker.needs_classification(track):
+                    # 캐시된 분류 결과 사용
+                    cache_hits += 1
+                    cached = (track.label_id, track.confidence)
+                else:
                     # 병합된 박스를 10% 확장
                     box_scale_extend = 0.1
 
@@ -1248,89 +1499,188 @@ class AIDetectionSystem:
                     if cropped_region.size == 0:
                         continue
 
-                    print(f"👥 그룹 {group_idx+1}: {person_count}명 (박스 확장: 20%)")
-                    
-                    # CLIP으로 이미지 인코딩
-                    pil_crop = Image.fromarray(cv2.cvtColor(cropped_region, cv2.COLOR_BGR2RGB))
-                    crop_tensor = self.clip_preprocess(pil_crop).unsqueeze(0).to(self.device)
-                    
-                    with torch.no_grad():
-                        crop_features = self.clip_model.encode_image(crop_tensor)
-                        crop_features = crop_features / crop_features.norm(dim=-1, keepdim=True)
-                        
-                        # 모든 텍스트와의 유사도 계산
-                        logits = (crop_features @ text_features.T) * 100.0  # CLIP의 temperature scaling
-                        
-                        # Softmax 적용
-                        probs = logits.softmax(dim=-1).cpu().numpy()[0]
-                    
-                    # 가장 높은 확률의 라벨 찾기
-                    best_idx = int(np.argmax(probs))
-                    best_prob = float(probs[best_idx])
-                    
-                    # print(f"   Box{box_idx} [{yolo_class}]: ", end="")
-                    # for i, (query, prob) in enumerate(zip(text_queries, probs)):
-                    #     if i < len(target_labels):
-                    #         print(f"{target_labels[i].display_name}={prob:.2f} ", end="")
-                    #     else:
-                    #         print(f"other={prob:.2f} ", end="")
-                    
-                    # "other object"가 최고점이면 무시
-                    if best_idx == other_object_idx:
-                        # print(f"      ❌ 'other object'로 분류됨 ({best_prob:.2f}) - 무시")
+                    # 같은 위치의 거의 같은 크롭이면 이전 분류 결과 재사용 (지각 해시 캐시)
+                    crop_hash = dhash(cropped_region)
+                    cached = crop_cache.lookup(crop_hash, [x1, y1, x2, y2])
+                    if cached is None:
+                        crop_cache_misses += 1
+                        detection_logger.debug("그룹 %s: %s명 (박스 확장: 20%%)", group_idx+1, person_count)
+                        pil_crop = Image.fromarray(cv2.cvtColor(cropped_region, cv2.COLOR_BGR2RGB))
+                        pending.append((group_info, track, [x1, y1, x2, y2], pil_crop, crop_hash))
                         continue
+                    crop_cache_hits += 1
+                    tracker.set_classification(track, *cached)
+
+                label_id, confidence = cached
+                if label_id is None:
+                    continue
+                label_idx = label_positions[label_id]
+                label_detections[label_idx].append({
+                    'box': [x1, y1, x2, y2],
+                    'confidence': confidence,
+                    'clip_probability': confidence,
+                    'person_count': person_count,
+                    'cluster_id': group_info['cluster_id'],
+                    'track_id': track.id,
+                })
+
+            if pending:
+                # 라벨별 앙상블 텍스트 임베딩 (최초 1회 계산 후 메모리/디스크 캐시)
+                text_features = prompt_embedding_cache.get_text_features(
+                    self.clip_model, CLIP_MODEL_NAME, self.device, text_queries
+                )
+
+                # CLIP 이미지 인코딩 + softmax (배치 분류 서비스)
+                all_probs = clip_classifier.classify([item[3] for item in pending], text_features)
+            else:
+                all_probs = []
+
+            for (group_info, track, box, _, crop_hash), probs in zip(pending, all_probs):
+                # 가장 높은 확률의 라벨 찾기
+                best_idx = int(np.argmax(probs))
+                best_prob = float(probs[best_idx])
+                classified_count += 1
+                
+                # "other object"가 최고점이면 무시
+                if best_idx == other_object_idx:
+                    tracker.set_classification(track, None, best_prob)
+                    crop_cache.store(crop_hash, box, None, best_prob)
+                    continue
+                
+                # 신뢰도가 임계치 미만이면 무시
+                if best_prob < CLIP_CONFIDENCE_THRESHOLD:
+                    tracker.set_classification(track, None, best_prob)
+                    crop_cache.store(crop_hash, box, None, best_prob)
+                    continue
+                
+                # 해당 라벨로 분류
+                label_idx = label_indices[best_idx]
+                target_label = target_labels[label_idx]
+                tracker.set_classification(track, target_label.id, best_prob)
+                crop_cache.store(crop_hash, box, target_label.id, best_prob)
+                
+                detection_logger.debug("'%s'로 탐지! (신뢰도: %.2f)", target_label.display_name, best_prob)
+
+                # 그룹 정보를 포함하여 저장
+                label_detections[label_idx].append({
+                    'box': box,
+                    'confidence': best_prob,
+                    'clip_probability': best_prob,
+                    'person_count': group_info['count'],  # 그룹 내 person 수
+                    'cluster_id': group_info['cluster_id'],
+                    'track_id': track.id,
+                })
+            
+            pipeline_telemetry.observe(camera.rtsp_url, 'clip', time.perf_counter() - clip_start)
+            if trace is not None:
+                trace.mark('clip')
+            pipeline_telemetry.incr(camera.rtsp_url, 'clip_crops', classified_count)
+            pipeline_telemetry.incr(camera.rtsp_url, 'clip_cache_hits', cache_hits)
+            pipeline_telemetry.incr(camera.rtsp_url, 'crop_cache_hits', crop_cache_hits)
+            pipeline_telemetry.incr(camera.rtsp_url, 'crop_cache_misses', crop_cache_misses)
+
+            # 5. 각 라벨별로 탐지 결과 생성
+            for label_idx, detected_boxes in label_detections.items():
+                if detected_boxes:
+                    target_label = target_labels[label_idx]
+                    avg_confidence = sum(box['confidence'] for box in detected_boxes) / len(detected_boxes)
                     
-                    # 신뢰도가 임계치 미만이면 무시
-                    if best_prob < CLIP_CONFIDENCE_THRESHOLD:
-                        # print(f"      ❌ 신뢰도 부족 ({best_prob:.2f} < {CLIP_CONFIDENCE_THRESHOLD})")
-                        continue
+                    detection = {
+                        'label': target_label,
+                        'confidence': float(avg_confidence),
+                        'count': len(detected_boxes),
+                        'has_alert': target_label.has_alert,
+                        'boxes': detected_boxes
+                    }
                     
-                    # 해당 라벨로 분류
-                    label_idx = label_indices[best_idx]
-                    target_label = target_labels[label_idx]
+                    detections.append(detection)
                     
-                    print(f"      ✅ '{target_label.display_name}'로 탐지! (신뢰도: {best_prob:.2f})")
-
-                    # 그룹 정보를 포함하여 저장
-                    label_detections[label_idx].append({
-                        'box': [x1, y1, x2, y2],
-                        'confidence': best_prob,
-                        'clip_probability': best_prob,
-                        'person_count': person_count,  # 그룹 내 person 수
-                        'cluster_id': group_info['cluster_id']
-                    })
-                
-                # 5. 각 라벨별로 탐지 결과 생성
-                for label_idx, detected_boxes in label_detections.items():
-                    if detected_boxes:
-                        target_label = target_labels[label_idx]
-                        avg_confidence = sum(box['confidence'] for box in detected_boxes) / len(detected_boxes)
-                        
-                        detection = {
-                            'label': target_label,
-                            'confidence': float(avg_confidence),
-                            'count': len(detected_boxes),
-                            'has_alert': target_label.has_alert,
-                            'boxes': detected_boxes
-                        }
-                        
-                        detections.append(detection)
-                        
-                        # print(f"\n🎯 {target_label.display_name} 최종 탐지:")
-                        # print(f"   - 박스 수: {len(detected_boxes)}개")
-                        # print(f"   - 평균 신뢰도: {avg_confidence:.1%}")
-                        # print(f"   - 경고 설정: {'활성' if target_label.has_alert else '비활성'}")
-                
-                if not detections:
-                    print(f"💤 탐지된 person 객체 없음 (모두 'other object'이거나 신뢰도 미달)")
+                    # print(f"\n🎯 {target_label.display_name} 최종 탐지:")
+                    # print(f"   - 박스 수: {len(detected_boxes)}개")
+                    # print(f"   - 평균 신뢰도: {avg_confidence:.1%}")
+                    # print(f"   - 경고 설정: {'활성' if target_label.has_alert else '비활성'}")
+            
+            if not detections:
+                detection_logger.debug("탐지된 person 객체 없음 (모두 'other object'이거나 신뢰도 미달)")
             
         except Exception as e:
-            print(f"❌ 객체 탐지 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            detection_logger.exception("객체 탐지 오류: %s", e)
         
         return detections
 
+    def _detect_objects_open_vocab(self, frame, target_labels, camera, trace=None):
+        """
+        오픈 어휘 단일 추론 탐지 (settings.CCTV_DETECTION_ENGINE = 'open_vocab')
+        - 타겟 라벨 프롬프트를 탐지기 어휘로 지정 (어휘 임베딩 캐시)
+        - 같은 라벨의 여러 프롬프트 박스는 NMS 로 병합
+        - person 클러스터링 / CLIP 단계 없음, 트랙 ID 는 이벤트 중복 제거용으로만 사용
+        """
+        detections = []
+
+        if open_vocab_detector.model is None:
+            detection_logger.warning("오픈 어휘 탐지 모델이 로드되지 않음")
+            return detections
+
+        try:
+            names, class_to_label = build_vocabulary(target_labels)
+            detect_input, imgsz, (offset_x, offset_y), roi_polygon = self._prepare_roi_input(frame, camera)
+
+            with pipeline_telemetry.timer(camera.rtsp_url, 'open_vocab'):
+                boxes, confidences, classes = open_vocab_detector.detect(detect_input, names, imgsz=imgsz)
+            if trace is not None:
+                trace.mark('open_vocab')
+
+            if len(boxes) == 0:
+                self._advance_tracks(camera)
+                return detections
+
+            if offset_x or offset_y:
+                boxes[:, [0, 2]] += offset_x
+                boxes[:, [1, 3]] += offset_y
+
+            # 프롬프트 → 라벨, 같은 라벨끼리 겹치는 박스 병합
+            labels = np.array([class_to_label[int(cls)] for cls in classes], dtype=int)
+            keep = nms_merge(boxes, confidences, labels)
+            if roi_polygon is not None and len(keep):
+                keep = keep[boxes_in_polygon(boxes[keep], roi_polygon)]
+            if len(keep) == 0:
+                self._advance_tracks(camera)
+                return detections
+
+            label_signature = tuple((tl.id, tuple(tl.get_prompts())) for tl in target_labels)
+            tracker = tracker_registry.get(camera.id)
+            tracker.sync_labels(label_signature)
+            tracks = tracker.update([list(map(int, boxes[index])) for index in keep])
+
+            label_detections = {i: [] for i in range(len(target_labels))}
+            for track, index in zip(tracks, keep):
+                confidence = float(confidences[index])
+                tracker.set_classification(track, target_labels[labels[index]].id, confidence)
+                label_detections[labels[index]].append({
+                    'box': list(map(int, boxes[index])),
+                    'confidence': confidence,
+                    'clip_probability': confidence,
+                    'person_count': 1,
+                    'cluster_id': int(index),
+                    'track_id': track.id,
+                })
+
+            for label_idx, detected_boxes in label_detections.items():
+                if detected_boxes:
+                    target_label = target_labels[label_idx]
+                    detections.append({
+                        'label': target_label,
+                        'confidence': float(np.mean([box['confidence'] for box in detected_boxes])),
+                        'count': len(detected_boxes),
+                        'has_alert': target_label.has_alert,
+                        'boxes': detected_boxes,
+                    })
+
+        except Exception as e:
+            detection_logger.exception("오픈 어휘 탐지 오류: %s", e)
+
+        return detections
+
     # ==================== 백업: 기존 _detect_objects 함수 (클러스터링 미적용) ====================
     # 오류 발생 시 아래 주석을 해제하고 위의 _detect_objects 함수를 주석 처리하세요
     # def _detect_objects_backup_without_clustering(self, frame, target_labels, camera):
@@ -1441,36 +1791,50 @@ class AIDetectionSystem:
         
     #     return detections
 
-    def _process_detection(self, camera, frame, detection, target_labels):
+    def _process_detection(self, camera, frame, detection, target_labels, trace=None):
         """탐지 결과 처리 - 바운딩 박스 포함 스크린샷"""
         from .models import DetectionLog
         
         try:
             if detection['has_alert']:
-                print(f"\n📝 탐지 결과 처리:")
-                print(f"  - 카메라: {camera.name}")
-                print(f"  - 객체: {detection['label'].display_name}")
-                print(f"  - 개수: {detection['count']}")
-                print(f"  - 신뢰도: {detection['confidence']:.3f}")
-                print(f"  - 알림 여부: {'예' if detection['has_alert'] else '아니오'}")
+                detection_logger.info(
+                    "경고 탐지: 카메라 '%s' 객체 '%s' %d개 (신뢰도 %.3f)",
+                    camera.name, detection['label'].display_name, detection['count'], detection['confidence'],
+                    extra={'camera_id': camera.id},
+                )
             
+            # 바운딩 박스는 한 번만 그려 통합/호환성 스크린샷과 썸네일에 같이 사용
+            screenshot_start = time.perf_counter()
+            annotated_frame = self._draw_detection_boxes(frame, detection)
+            if trace is not None:
+                trace.mark('annotate')
+
             # 통합된 스크린샷 저장 (모든 탐지에 대해 has_alert 구분하여 저장)
-            screenshot_path = self._save_all_detection_screenshot(camera, frame, detection)
+            screenshot_path = self._save_all_detection_screenshot(
+                camera, frame, detection, annotated_frame=annotated_frame
+            )
             
             # has_alert인 경우 추가로 기존 스크린샷 폴더에도 저장 (호환성 유지)
             if detection['has_alert']:
-                annotated_frame = self._draw_detection_boxes(frame, detection)
                 additional_screenshot = self._save_screenshot_with_boxes(camera, annotated_frame, detection)
                 
                 if screenshot_path:
-                    print(f"  - 📸 통합 스크린샷 저장: {screenshot_path}")
+                    detection_logger.debug("통합 스크린샷 저장: %s", screenshot_path)
                 if additional_screenshot:
-                    print(f"  - 📸 호환성 스크린샷 저장: {additional_screenshot}")
+                    detection_logger.debug("호환성 스크린샷 저장: %s", additional_screenshot)
                 
                 # DB에는 기존 스크린샷 경로 저장 (호환성)
                 screenshot_path = additional_screenshot or screenshot_path
+
+            # 목록용 썸네일 (DB 에 기록되는 스크린샷 옆에 저장)
+            thumbnail_path = write_thumbnail(annotated_frame, screenshot_path) if screenshot_path else None
+
+            pipeline_telemetry.observe(camera.rtsp_url, 'screenshot', time.perf_counter() - screenshot_start)
+            if trace is not None:
+                trace.mark('save')
             
             # 탐지 로그 저장
+            db_start = time.perf_counter()
             log = DetectionLog.objects.create(
                 camera=camera,
                 camera_name=camera.name,
@@ -1479,20 +1843,41 @@ class AIDetectionSystem:
                 object_count=detection['count'],
                 confidence=detection['confidence'],
                 has_alert=detection['has_alert'],
-                screenshot_path=screenshot_path
+                screenshot_path=screenshot_path,
+                # 파일 쓰기가 끝난 뒤 생성하므로 경로가 있으면 존재하는 파일
+                screenshot_available=bool(screenshot_path),
+                thumbnail_path=thumbnail_path,
             )
+            # 시간/일 집계 증분 (실패해도 알림은 계속 진행)
+            try:
+                record_detection(log)
+            except Exception as e:
+                detection_logger.warning("탐지 집계 갱신 오류: %s", e)
             
-            print(f"  - 💾 DB 로그 저장 완료 (ID: {log.id})")
+            pipeline_telemetry.observe(camera.rtsp_url, 'db_write', time.perf_counter() - db_start)
+            pipeline_telemetry.incr(camera.rtsp_url, 'detections')
+            if trace is not None:
+                trace.mark('db')
+                trace.add_info('log_ids', log.id)
+            detection_logger.debug("DB 로그 저장 완료 (ID: %s)", log.id)
             
             # 실시간 알림 전송 (has_alert인 경우)
             if detection['has_alert']:
-                self._send_realtime_alert(log)
-                print(f"  - 📢 실시간 알림 전송 완료")
+                with pipeline_telemetry.timer(camera.rtsp_url, 'alert_fanout'):
+                    self._send_realtime_alert(log)
+                pipeline_telemetry.incr(camera.rtsp_url, 'alerts')
+                if trace is not None:
+                    trace.mark('alert_emit')
+                detection_logger.debug("실시간 알림 전송 완료")
+
+                # 이벤트 전후 영상 클립 저장 예약 (버퍼의 인코딩된 조각 사용)
+                event_clip_recorder.request_clip(camera, log.id)
+
+            return log
             
         except Exception as e:
-            print(f"❌ 탐지 결과 처리 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            detection_logger.exception("탐지 결과 처리 오류: %s", e)
+            return None
 
     def _draw_detection_boxes(self, frame, detection):
         """프레임에 바운딩 박스와 라벨 그리기 (한글 지원)"""
@@ -1621,17 +2006,19 @@ class AIDetectionSystem:
             filepath = os.path.join(self.screenshot_dir, filename)
             
             # 스크린샷 저장 (JPEG 품질 95)
-            cv2.imwrite(filepath, annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            if not cv2.imwrite(filepath, annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 95]):
+                detection_logger.error("스크린샷 저장 실패: %s", filepath)
+                return None
             
-            print(f"    💾 스크린샷 저장 완료: {filename}")
+            detection_logger.debug("스크린샷 저장 완료: %s", filename)
             return filepath
             
         except Exception as e:
-            print(f"❌ 스크린샷 저장 오류: {e}")
+            detection_logger.error("스크린샷 저장 오류: %s", e)
             return None
     
-    def _save_all_detection_screenshot(self, camera, frame, detection):
-        """모든 탐지 결과에 대한 스크린샷 저장 (has_alert별로 구분하여 저장)"""
+    def _save_all_detection_screenshot(self, camera, frame, detection, annotated_frame=None):
+        """모든 탐지 결과에 대한 스크린샷 저장 (has_alert별로 구분하여 저장, 이미 그린 프레임이 있으면 재사용)"""
         try:
             # 날짜별 폴더 생성
             today = datetime.now().strftime("%Y%m%d")
@@ -1667,7 +2054,8 @@ class AIDetectionSystem:
                 os.makedirs(object_dir, exist_ok=True)
             
             # 바운딩 박스가 그려진 프레임 생성
-            annotated_frame = self._draw_detection_boxes(frame, detection)
+            if annotated_frame is None:
+                annotated_frame = self._draw_detection_boxes(frame, detection)
             
             # 파일명 생성 (시간 + 개수 + 신뢰도)
             now = datetime.now()
@@ -1678,13 +2066,18 @@ class AIDetectionSystem:
             filepath = os.path.join(object_dir, filename)
             
             # 스크린샷 저장
-            cv2.imwrite(filepath, annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 90])
+            if not cv2.imwrite(filepath, annotated_frame, [cv2.IMWRITE_JPEG_QUALITY, 90]):
+                detection_logger.error("탐지 스크린샷 저장 실패: %s", filepath)
+                return None
             
-            print(f"    📁 {folder_type} 저장: {today}/{camera_name_safe}_{camera_location_safe}/{safe_object_name}/{filename}")
+            detection_logger.debug(
+                "%s 저장: %s/%s_%s/%s/%s",
+                folder_type, today, camera_name_safe, camera_location_safe, safe_object_name, filename,
+            )
             return filepath
             
         except Exception as e:
-            print(f"❌ 탐지 스크린샷 저장 오류: {e}")
+            detection_logger.error("탐지 스크린샷 저장 오류: %s", e)
             return None
     
     def _save_screenshot(self, camera, frame, detection):
@@ -1705,7 +2098,7 @@ class AIDetectionSystem:
                 'detected_object': log.detected_object,
                 'object_count': log.object_count,
                 'detected_at': log.detected_at.isoformat(),
-                'has_screenshot': bool(log.screenshot_path),
+                'has_screenshot': log.screenshot_available,
                 'confidence': log.confidence,
                 'is_new': True  # 새 알림 플래그
             }
@@ -1720,8 +2113,8 @@ class AIDetectionSystem:
                         pass
                 
                 self.alert_queue.put_nowait(alert_data)
-                print(f"  ✅ 알림 큐에 추가 성공: {alert_data['detected_object']}")
-                print(f"  📊 큐 크기: {self.alert_queue.qsize()}/{self.alert_queue.maxsize}")
+                detection_logger.debug("알림 큐에 추가 성공: %s", alert_data['detected_object'])
+                detection_logger.debug("큐 크기: %s/%s", self.alert_queue.qsize(), self.alert_queue.maxsize)
                 
                 # 모든 SSE 리스너에게 즉시 알림 (선택적)
                 for listener in ALERT_LISTENERS:
@@ -1731,14 +2124,12 @@ class AIDetectionSystem:
                         pass
                         
             except queue.Full:
-                print(f"  ⚠️ 알림 큐가 가득 참")
+                detection_logger.warning("알림 큐가 가득 참")
             except Exception as e:
-                print(f"  ❌ 큐 추가 오류: {e}")
+                detection_logger.error("큐 추가 오류: %s", e)
                 
         except Exception as e:
-            print(f"❌ 실시간 알림 전송 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            detection_logger.exception("실시간 알림 전송 오류: %s", e)
 
     def get_alert_queue(self):
         """알림 큐 반환"""
@@ -1751,25 +2142,25 @@ class AIDetectionSystem:
         cameras = Camera.objects.prefetch_related('target_labels').all()  # 매번 최신 카메라와 라벨 목록을 가져옴
         started_count = 0
         
-        print(f"🔄 AI 탐지 시작: 총 {cameras.count()}개 카메라 확인")
+        detection_logger.info("AI 탐지 시작: 총 %s개 카메라 확인", cameras.count())
         
         for camera in cameras:
             # 타겟 라벨이 있는 카메라만 탐지 시작
             if camera.target_labels.exists():
                 self.start_detection_for_camera(camera)
                 started_count += 1
-                print(f"✅ 카메라 '{camera.name}' AI 탐지 시작 (타겟 라벨: {camera.target_labels.count()}개)")
+                detection_logger.info("카메라 '%s' AI 탐지 시작 (타겟 라벨: %s개)", camera.name, camera.target_labels.count())
             else:
-                print(f"⚠️ 카메라 '{camera.name}'에 타겟 라벨이 없어 AI 탐지를 건너뜁니다")
+                detection_logger.warning("카메라 '%s'에 타겟 라벨이 없어 AI 탐지를 건너뜁니다", camera.name)
         
-        print(f"🤖 총 {started_count}개 카메라에서 AI 탐지 시작됨")
+        detection_logger.info("총 %s개 카메라에서 AI 탐지 시작됨", started_count)
     
     def refresh_cameras(self):
         """카메라 목록 변경 감지 후 스트리밍과 탐지를 실시간 업데이트 (안전한 버전)"""
         try:
             from .models import Camera
             
-            print("🔄 AI 탐지 시스템 카메라 목록 업데이트")
+            detection_logger.info("AI 탐지 시스템 카메라 목록 업데이트")
             
             # 현재 DB의 카메라 목록 가져오기
             current_cameras = Camera.objects.prefetch_related('target_labels').all()
@@ -1782,10 +2173,10 @@ class AIDetectionSystem:
             removed_camera_ids = active_detections - current_camera_ids
             for camera_id in removed_camera_ids:
                 try:
-                    print(f"⏹️ 삭제된 카메라 AI 탐지 중지: {camera_id}")
+                    detection_logger.info("삭제된 카메라 AI 탐지 중지: %s", camera_id)
                     self.stop_detection_for_camera(camera_id)
                 except Exception as e:
-                    print(f"⚠️ AI 탐지 중지 오류: {e}")
+                    detection_logger.warning("AI 탐지 중지 오류: %s", e)
             
             # 2. 새로 추가되거나 수정된 카메라들의 AI 탐지 시작/중지
             for camera in current_cameras:
@@ -1795,29 +2186,27 @@ class AIDetectionSystem:
                     
                     # AI 탐지 시작 (타겟 라벨이 있고 아직 시작되지 않은 경우)
                     if has_labels and not is_detecting:
-                        print(f"🎯 새 카메라 AI 탐지 시작: {camera.name} ({camera.target_labels.count()}개 라벨)")
+                        detection_logger.info("새 카메라 AI 탐지 시작: %s (%s개 라벨)", camera.name, camera.target_labels.count())
                         try:
                             self.start_detection_for_camera(camera)
                         except Exception as e:
-                            print(f"❌ AI 탐지 시작 실패: {e}")
+                            detection_logger.error("AI 탐지 시작 실패: %s", e)
                     
                     # 타겟 라벨이 없어진 경우 AI 탐지 중지
                     elif not has_labels and is_detecting:
-                        print(f"⏹️ 타겟 라벨 없음 - AI 탐지 중지: {camera.name}")
+                        detection_logger.info("타겟 라벨 없음 - AI 탐지 중지: %s", camera.name)
                         try:
                             self.stop_detection_for_camera(camera.id)
                         except Exception as e:
-                            print(f"⚠️ AI 탐지 중지 오류: {e}")
+                            detection_logger.warning("AI 탐지 중지 오류: %s", e)
                             
                 except Exception as e:
-                    print(f"⚠️ 카메라 '{camera.name}' 처리 오류: {e}")
+                    detection_logger.warning("카메라 '%s' 처리 오류: %s", camera.name, e)
             
-            print("✅ AI 탐지 시스템 업데이트 완료")
+            detection_logger.info("AI 탐지 시스템 업데이트 완료")
             
         except Exception as e:
-            print(f"❌ AI 탐지 시스템 업데이트 중 오류: {e}")
-            import traceback
-            traceback.print_exc()
+            detection_logger.exception("AI 탐지 시스템 업데이트 중 오류: %s", e)
     
     def stop_all_detections(self):
         """모든 탐지 중지"""
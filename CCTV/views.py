@@ -1,17 +1,39 @@
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.views import login_required
-from django.http import StreamingHttpResponse, JsonResponse, HttpResponse
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import StreamingHttpResponse, JsonResponse, HttpResponse, FileResponse
+from django.urls import reverse
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
-from .models import Camera, TargetLabel, DetectionLog
+from django.conf import settings
+from .models import Camera, TargetLabel, DetectionLog, CameraROI
 from .utils import camera_streamer, ai_detection_system
+from .live_output import live_output_manager
+from .telemetry import pipeline_telemetry
+from .crop_cache import get_hit_rate
+from .tracing import frame_tracer
+from .tiling import normalize_tile_params
+from .screenshots import mark_screenshots_missing
+from .retention import read_archived_log_screenshot
+from .thumbnails import create_thumbnail_from_file, encode_thumbnail, get_content_type, get_thumbnail_path
+from .export import (
+    CONTENT_TYPES, FORMAT_CSV, FORMAT_PARQUET, FORMATS, filter_logs, get_export_filename, iter_export,
+    parquet_available, parse_date,
+)
+from .rollups import GRANULARITY_HOUR, RANGE_LIMITS, get_detection_stats
+from .pagination import DIRECTION_NEXT, clamp_page_size, get_cached_count, paginate_logs
+import hmac
 import json
+import logging
 import time
 import queue
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
 @login_required
 def camera_stream(request, camera_id):
     """개별 카메라 스트림 엔드포인트"""
@@ -27,6 +49,56 @@ def camera_stream(request, camera_id):
     
     return response
 
+@login_required
+def camera_hls_playlist(request, camera_id):
+    """HLS(fMP4) 플레이리스트 - RTSP H.264를 재인코딩 없이 remux"""
+    camera = get_object_or_404(Camera, id=camera_id)
+
+    if not live_output_manager.is_available():
+        return HttpResponse("ffmpeg를 찾을 수 없습니다.", status=503)
+
+    remuxer = live_output_manager.get_remuxer(camera.rtsp_url)
+    if remuxer is None or not remuxer.wait_for_fragments():
+        return HttpResponse("스트림 준비 중입니다.", status=503)
+
+    playlist = remuxer.build_playlist()
+    if playlist is None:
+        return HttpResponse("스트림 준비 중입니다.", status=503)
+
+    response = HttpResponse(playlist, content_type='application/vnd.apple.mpegurl')
+    response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
+
+@login_required
+def camera_hls_init(request, camera_id):
+    """HLS init segment (ftyp + moov)"""
+    camera = get_object_or_404(Camera, id=camera_id)
+    remuxer = live_output_manager.get_remuxer(camera.rtsp_url, start=False)
+    if remuxer is None or remuxer.init_segment is None:
+        return HttpResponse(status=404)
+
+    remuxer.touch()
+    response = HttpResponse(remuxer.init_segment, content_type='video/mp4')
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+@login_required
+def camera_hls_segment(request, camera_id, sequence):
+    """HLS 미디어 조각 (moof + mdat) - 메모리 링 버퍼에서 제공"""
+    camera = get_object_or_404(Camera, id=camera_id)
+    remuxer = live_output_manager.get_remuxer(camera.rtsp_url, start=False)
+    if remuxer is None:
+        return HttpResponse(status=404)
+
+    remuxer.touch()
+    data = remuxer.get_fragment(sequence)
+    if data is None:
+        return HttpResponse(status=404)
+
+    response = HttpResponse(data, content_type='video/iso.segment')
+    response['Cache-Control'] = 'max-age=60'
+    return response
+
 @login_required
 def camera_status_api(request):
     """카메라 상태 API 엔드포인트"""
@@ -54,6 +126,17 @@ def index(request):
     cameras = Camera.objects.all().prefetch_related('target_labels')
     return render(request, 'cctv/index.html', {'cameras': cameras})
 
+def _apply_tiling_fields(camera, data):
+    """카메라 폼의 타일 추론 설정 반영 (잘못된 값은 기존 값 유지)"""
+    camera.tiled_inference = data.get('tiled_inference') == 'on'
+    try:
+        camera.tile_size, camera.tile_overlap = normalize_tile_params(
+            data.get('tile_size', camera.tile_size),
+            data.get('tile_overlap', camera.tile_overlap),
+        )
+    except (TypeError, ValueError):
+        pass
+
 @login_required
 def camera_create(request):
     """카메라 생성"""
@@ -63,20 +146,22 @@ def camera_create(request):
         rtsp_url = request.POST.get('rtsp_url')
         
         if name and location and rtsp_url:
-            camera = Camera.objects.create(
+            camera = Camera(
                 name=name,
                 location=location,
                 rtsp_url=rtsp_url
             )
+            _apply_tiling_fields(camera, request.POST)
+            camera.save()
             messages.success(request, f'카메라 "{camera.name}"이 성공적으로 추가되었습니다.')
             
             # 카메라 추가 후 스트리밍 및 탐지 시스템 업데이트
             try:
                 camera_streamer.refresh_cameras()
                 ai_detection_system.refresh_cameras()
-                print(f"✅ 카메라 '{camera.name}' 추가 후 시스템 업데이트 완료")
+                logger.info("카메라 '%s' 추가 후 시스템 업데이트 완료", camera.name)
             except Exception as e:
-                print(f"⚠️ 카메라 추가 후 시스템 업데이트 오류: {e}")
+                logger.warning("카메라 추가 후 시스템 업데이트 오류: %s", e)
             
             return redirect('cctv:index')
         else:
@@ -93,6 +178,7 @@ def camera_edit(request, camera_id):
         camera.name = request.POST.get('name', camera.name)
         camera.location = request.POST.get('location', camera.location)
         camera.rtsp_url = request.POST.get('rtsp_url', camera.rtsp_url)
+        _apply_tiling_fields(camera, request.POST)
         camera.save()
         
         messages.success(request, f'카메라 "{camera.name}"이 성공적으로 수정되었습니다.')
@@ -101,9 +187,9 @@ def camera_edit(request, camera_id):
         try:
             camera_streamer.refresh_cameras()
             ai_detection_system.refresh_cameras()
-            print(f"✅ 카메라 '{camera.name}' 수정 후 시스템 업데이트 완료")
+            logger.info("카메라 '%s' 수정 후 시스템 업데이트 완료", camera.name)
         except Exception as e:
-            print(f"⚠️ 카메라 수정 후 시스템 업데이트 오류: {e}")
+            logger.warning("카메라 수정 후 시스템 업데이트 오류: %s", e)
         
         return redirect('cctv:index')
     
@@ -126,14 +212,63 @@ def camera_delete(request, camera_id):
         try:
             camera_streamer.refresh_cameras()
             ai_detection_system.refresh_cameras()
-            print(f"✅ 카메라 '{camera_name}' 삭제 후 시스템 업데이트 완료")
+            logger.info("카메라 '%s' 삭제 후 시스템 업데이트 완료", camera_name)
         except Exception as e:
-            print(f"⚠️ 카메라 삭제 후 시스템 업데이트 오류: {e}")
+            logger.warning("카메라 삭제 후 시스템 업데이트 오류: %s", e)
         
         return redirect('cctv:index')
     
     return render(request, 'cctv/camera_confirm_delete.html', {'camera': camera})
 
+@login_required
+def camera_roi_editor(request, camera_id):
+    """카메라 관심 영역(ROI) 폴리곤 편집 화면"""
+    camera = get_object_or_404(Camera, id=camera_id)
+    roi = CameraROI.objects.filter(camera=camera).first()
+
+    return render(request, 'cctv/camera_roi_editor.html', {
+        'camera': camera,
+        'roi': roi,
+        'roi_points_json': json.dumps(roi.get_points() if roi else []),
+    })
+
+@login_required
+@require_http_methods(["POST"])
+def camera_roi_update(request, camera_id):
+    """ROI 폴리곤 저장/삭제 (AJAX)"""
+    camera = get_object_or_404(Camera, id=camera_id)
+
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'JSON 데이터 파싱 오류'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'status': 'error', 'message': '요청 본문은 JSON 객체여야 합니다.'}, status=400)
+
+    points = data.get('points') or []
+    if not points:
+        # 꼭짓점이 없으면 ROI 삭제 (전체 프레임 탐지)
+        CameraROI.objects.filter(camera=camera).delete()
+        return JsonResponse({'status': 'success', 'message': f"{camera.name} 관심 영역이 삭제되었습니다.", 'points': []})
+
+    roi = CameraROI.objects.filter(camera=camera).first() or CameraROI(camera=camera)
+    try:
+        roi.set_points(points)
+        roi.is_active = bool(data.get('is_active', True))
+        roi.full_clean()
+    except (TypeError, ValueError):
+        return JsonResponse({'status': 'error', 'message': '꼭짓점 형식이 올바르지 않습니다.'}, status=400)
+    except ValidationError as e:
+        return JsonResponse({'status': 'error', 'message': ' '.join(e.messages)}, status=400)
+
+    roi.save()
+    return JsonResponse({
+        'status': 'success',
+        'message': f"{camera.name} 관심 영역이 저장되었습니다.",
+        'points': roi.get_points(),
+        'is_active': roi.is_active,
+    })
+
 @login_required
 def target_label_create(request, camera_id):
     """타겟 라벨 생성"""
@@ -149,7 +284,8 @@ def target_label_create(request, camera_id):
                 camera=camera,
                 display_name=display_name,
                 label_name=label_name,
-                has_alert=has_alert
+                has_alert=has_alert,
+                prompt_templates=request.POST.get('prompt_templates', '').strip()
             )
             messages.success(request, f'타겟 라벨 "{target_label.display_name}"이 성공적으로 추가되었습니다.')
             
@@ -159,14 +295,14 @@ def target_label_create(request, camera_id):
                 def update_detection():
                     try:
                         ai_detection_system.refresh_cameras()
-                        print(f"✅ 타겟 라벨 '{target_label.display_name}' 추가 후 AI 탐지 업데이트 완료")
+                        logger.info("타겟 라벨 '%s' 추가 후 AI 탐지 업데이트 완료", target_label.display_name)
                     except Exception as e:
-                        print(f"⚠️ 타겟 라벨 추가 후 AI 탐지 업데이트 오류: {e}")
+                        logger.warning("타겟 라벨 추가 후 AI 탐지 업데이트 오류: %s", e)
                 
                 update_thread = threading.Thread(target=update_detection, daemon=True)
                 update_thread.start()
             except Exception as e:
-                print(f"⚠️ 비동기 탐지 업데이트 시작 오류: {e}")
+                logger.warning("비동기 탐지 업데이트 시작 오류: %s", e)
             
             return redirect('cctv:index')
         else:
@@ -186,6 +322,7 @@ def target_label_edit(request, label_id):
         target_label.display_name = request.POST.get('display_name', target_label.display_name)
         target_label.label_name = request.POST.get('label_name', target_label.label_name)
         target_label.has_alert = request.POST.get('has_alert') == 'on'
+        target_label.prompt_templates = request.POST.get('prompt_templates', target_label.prompt_templates).strip()
         target_label.save()
         
         messages.success(request, f'타겟 라벨 "{target_label.display_name}"이 성공적으로 수정되었습니다.')
@@ -196,14 +333,14 @@ def target_label_edit(request, label_id):
             def update_detection():
                 try:
                     ai_detection_system.refresh_cameras()
-                    print(f"✅ 타겟 라벨 '{target_label.display_name}' 수정 후 AI 탐지 업데이트 완료")
+                    logger.info("타겟 라벨 '%s' 수정 후 AI 탐지 업데이트 완료", target_label.display_name)
                 except Exception as e:
-                    print(f"⚠️ 타겟 라벨 수정 후 AI 탐지 업데이트 오류: {e}")
+                    logger.warning("타겟 라벨 수정 후 AI 탐지 업데이트 오류: %s", e)
             
             update_thread = threading.Thread(target=update_detection, daemon=True)
             update_thread.start()
         except Exception as e:
-            print(f"⚠️ 비동기 탐지 업데이트 시작 오류: {e}")
+            logger.warning("비동기 탐지 업데이트 시작 오류: %s", e)
         
         return redirect('cctv:index')
     
@@ -229,14 +366,14 @@ def target_label_delete(request, label_id):
             def update_detection():
                 try:
                     ai_detection_system.refresh_cameras()
-                    print(f"✅ 타겟 라벨 '{display_name}' 삭제 후 AI 탐지 업데이트 완료")
+                    logger.info("타겟 라벨 '%s' 삭제 후 AI 탐지 업데이트 완료", display_name)
                 except Exception as e:
-                    print(f"⚠️ 타겟 라벨 삭제 후 AI 탐지 업데이트 오류: {e}")
+                    logger.warning("타겟 라벨 삭제 후 AI 탐지 업데이트 오류: %s", e)
             
             update_thread = threading.Thread(target=update_detection, daemon=True)
             update_thread.start()
         except Exception as e:
-            print(f"⚠️ 비동기 탐지 업데이트 시작 오류: {e}")
+            logger.warning("비동기 탐지 업데이트 시작 오류: %s", e)
         
         return redirect('cctv:index')
     
@@ -255,7 +392,7 @@ def detection_alerts_stream(request):
             detected_at__gte=recent_time
         ).order_by('-detected_at')[:3]  # 최대 3개만
         
-        print(f"📨 SSE 초기 알림: {recent_logs.count()}개")
+        logger.info("SSE 초기 알림: %s개", recent_logs.count())
         
         for log in recent_logs:
             alert_data = {
@@ -266,7 +403,7 @@ def detection_alerts_stream(request):
                 'detected_object': log.detected_object,
                 'object_count': log.object_count,
                 'detected_at': log.detected_at.isoformat(),
-                'has_screenshot': bool(log.screenshot_path),
+                'has_screenshot': log.screenshot_available,
                 'confidence': log.confidence,
                 'is_recent': True
             }
@@ -288,7 +425,7 @@ def detection_alerts_stream(request):
                         # 0.5초 타임아웃으로 큐에서 가져오기
                         alert = alert_queue.get(timeout=0.5)
                         
-                        print(f"🔔 SSE 새 알림 전송: {alert.get('detected_object', 'Unknown')}")
+                        logger.debug("SSE 새 알림 전송: %s", alert.get('detected_object', 'Unknown'))
                         
                         # 새로운 알림 전송
                         alert['is_new'] = True
@@ -301,9 +438,9 @@ def detection_alerts_stream(request):
                         
                         # 디버그: 큐가 비어있는 경우
                         if empty_count % 20 == 0:  # 10초마다 한 번
-                            print(f"💤 SSE 큐 비어있음 (체크 횟수: {empty_count})")
+                            logger.debug("SSE 큐 비어있음 (체크 횟수: %s)", empty_count)
                 else:
-                    print("⚠️ SSE: 알림 큐가 None입니다")
+                    logger.warning("SSE: 알림 큐가 None입니다")
                     time.sleep(1)
                     continue
                 
@@ -311,16 +448,16 @@ def detection_alerts_stream(request):
                 if current_time - last_heartbeat > 30:
                     yield "data: {\"type\": \"heartbeat\"}\n\n"
                     last_heartbeat = current_time
-                    print(f"💓 SSE 하트비트 전송")
+                    logger.debug("SSE 하트비트 전송")
                 
                 # CPU 사용량 감소를 위한 짧은 대기
                 time.sleep(0.1)
                 
             except GeneratorExit:
-                print("🛑 SSE 연결 종료 (클라이언트 연결 끊김)")
+                logger.info("SSE 연결 종료 (클라이언트 연결 끊김)")
                 break
             except Exception as e:
-                print(f"❌ SSE 스트림 오류: {e}")
+                logger.error("SSE 스트림 오류: %s", e)
                 yield f"data: {{\"type\": \"error\", \"message\": \"스트림 오류: {str(e)}\"}}\n\n"
                 time.sleep(1)
     
@@ -345,24 +482,87 @@ def clear_alert_history(request):
     request.session.save()
     return JsonResponse({'status': 'success', 'message': '알림 히스토리가 초기화되었습니다.'})
 
+@login_required
+@require_http_methods(["GET"])
+def detection_stats_api(request):
+    """
+    탐지 집계 API (집계 테이블만 조회)
+
+    Query:
+        granularity: 'hour' (기본, 최근 48시간) | 'day' (최근 30일)
+        periods: 버킷 개수 (hour 최대 744, day 최대 732)
+        camera_id, label: 필터
+    """
+    granularity = request.GET.get('granularity', GRANULARITY_HOUR)
+    if granularity not in RANGE_LIMITS:
+        return JsonResponse({'status': 'error', 'message': f"granularity 는 {list(RANGE_LIMITS)} 중 하나여야 합니다."}, status=400)
+    try:
+        periods = int(request.GET['periods']) if request.GET.get('periods') else None
+        camera_id = int(request.GET['camera_id']) if request.GET.get('camera_id') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': "periods, camera_id 는 정수여야 합니다."}, status=400)
+
+    stats = get_detection_stats(granularity, periods, camera_id=camera_id, label=request.GET.get('label') or None)
+    return JsonResponse({'status': 'success', **stats})
+
+@login_required
+@require_http_methods(["GET"])
+def detection_logs_export(request):
+    """
+    탐지 로그 스트리밍 내보내기 (관리자 전용)
+
+    Query:
+        format: 'csv' (기본) | 'parquet'
+        start, end: YYYY-MM-DD (end 포함)
+        camera_id, label, alert_only=1: 필터
+    """
+    if not request.user.is_superuser:
+        return HttpResponse("접근 권한이 없습니다.", status=403)
+
+    export_format = request.GET.get('format', FORMAT_CSV)
+    if export_format not in FORMATS:
+        return JsonResponse({'status': 'error', 'message': f"format 은 {list(FORMATS)} 중 하나여야 합니다."}, status=400)
+    if export_format == FORMAT_PARQUET and not parquet_available():
+        return JsonResponse({'status': 'error', 'message': "Parquet 내보내기에는 pyarrow 설치가 필요합니다."}, status=400)
+    try:
+        logs = filter_logs(
+            start=parse_date(request.GET.get('start')),
+            end=parse_date(request.GET.get('end')),
+            camera_id=int(request.GET['camera_id']) if request.GET.get('camera_id') else None,
+            label=request.GET.get('label') or None,
+            alert_only=request.GET.get('alert_only') == '1',
+        )
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': "start/end 는 YYYY-MM-DD, camera_id 는 정수여야 합니다."}, status=400)
+
+    response = StreamingHttpResponse(iter_export(logs, export_format), content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{get_export_filename(export_format)}"'
+    return response
+
 @login_required
 def detection_logs_api(request):
-    """탐지 로그 API (페이징 지원)"""
-    page = int(request.GET.get('page', 1))
-    page_size = int(request.GET.get('page_size', 20))
+    """탐지 로그 API (커서 페이징 - next_cursor / prev_cursor 를 cursor 로 전달)"""
+    page_size = clamp_page_size(request.GET.get('page_size'), 20)
     alert_only = request.GET.get('alert_only', 'false').lower() == 'true'
+    direction = request.GET.get('direction', DIRECTION_NEXT)
+    try:
+        camera_id = int(request.GET['camera_id']) if request.GET.get('camera_id') else None
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': "camera_id 는 정수여야 합니다."}, status=400)
     
     logs = DetectionLog.objects.all()
+    if camera_id:
+        logs = logs.filter(camera_id=camera_id)
     if alert_only:
         logs = logs.filter(has_alert=True)
     
-    total_count = logs.count()
-    start = (page - 1) * page_size
-    end = start + page_size
-    logs = logs[start:end]
+    try:
+        page = paginate_logs(logs, request.GET.get('cursor'), direction, page_size)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
     
     logs_data = []
-    for log in logs:
+    for log in page['items']:
         logs_data.append({
             'id': log.id,
             'camera_name': log.camera_name,
@@ -371,19 +571,91 @@ def detection_logs_api(request):
             'object_count': log.object_count,
             'confidence': log.confidence,
             'has_alert': log.has_alert,
-            'has_screenshot': log.screenshot_exists,
-            'detected_at': log.detected_at.isoformat()
+            'has_screenshot': log.screenshot_available,
+            'screenshot_archived': log.screenshot_archived,
+            'thumbnail_url': (
+                reverse('cctv:detection_thumbnail', args=[log.id])
+                if log.screenshot_available or log.screenshot_archived else None
+            ),
+            'clip_url': log.clip_url,
+            'detected_at': log.detected_at.isoformat(),
+            'last_seen_at': log.last_seen_at.isoformat() if log.last_seen_at else None,
+            'ended_at': log.ended_at.isoformat() if log.ended_at else None,
+            'frame_count': log.frame_count,
         })
     
     return JsonResponse({
         'status': 'success',
         'logs': logs_data,
-        'total_count': total_count,
-        'page': page,
+        'total_count': get_cached_count(logs),
+        'total_count_approximate': True,
         'page_size': page_size,
-        'has_next': end < total_count
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
+        'has_next': page['has_next'],
+        'has_prev': page['has_prev'],
     })
 
+# 썸네일은 로그별로 바뀌지 않으므로 브라우저가 1년간 재사용 (로그인 필요 → private)
+THUMBNAIL_CACHE_CONTROL = 'private, max-age=31536000, immutable'
+
+@login_required
+@require_http_methods(["GET"])
+def detection_thumbnail(request, log_id):
+    """탐지 스크린샷 썸네일 - 없으면 원본으로 생성 후 DB 에 기록 (지연 백필)"""
+    log = get_object_or_404(
+        DetectionLog.objects.only(
+            'id', 'screenshot_path', 'screenshot_available', 'screenshot_archived', 'thumbnail_path',
+            'has_alert', 'detected_at',
+        ),
+        id=log_id,
+    )
+    if not log.screenshot_available and not log.screenshot_archived:
+        return HttpResponse(status=404)
+
+    etag = f'"thumb-{log.id}"'
+    if not log.screenshot_available:
+        # 압축 보관된 스크린샷 - tar 에서 원본을 꺼내 메모리에서 썸네일 생성
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=304)
+        else:
+            data = read_archived_log_screenshot(log)
+            thumbnail = encode_thumbnail(data) if data is not None else None
+            if thumbnail is None:
+                DetectionLog.objects.filter(id=log.id).update(screenshot_archived=False)
+                return HttpResponse(status=404)
+            response = HttpResponse(thumbnail, content_type=get_content_type(get_thumbnail_path(log.screenshot_path)))
+        response['ETag'] = etag
+        response['Cache-Control'] = THUMBNAIL_CACHE_CONTROL
+        return response
+
+    if request.headers.get('If-None-Match') == etag and log.thumbnail_path:
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        response['Cache-Control'] = THUMBNAIL_CACHE_CONTROL
+        return response
+
+    thumbnail_path = log.thumbnail_path
+    try:
+        thumbnail_file = open(thumbnail_path, 'rb') if thumbnail_path else None
+    except OSError:
+        thumbnail_file = None
+
+    if thumbnail_file is None:
+        thumbnail_path = create_thumbnail_from_file(log.screenshot_path)
+        if thumbnail_path is None:
+            # 원본도 없음 → 목록에서 제외되도록 플래그 해제
+            mark_screenshots_missing([log.id])
+            DetectionLog.objects.filter(id=log.id).update(thumbnail_path=None)
+            return HttpResponse(status=404)
+        DetectionLog.objects.filter(id=log.id).update(thumbnail_path=thumbnail_path)
+        thumbnail_file = open(thumbnail_path, 'rb')
+
+    response = FileResponse(thumbnail_file, content_type=get_content_type(thumbnail_path))
+    response['ETag'] = etag
+    response['Cache-Control'] = THUMBNAIL_CACHE_CONTROL
+    return response
+
 @login_required
 def start_detection(request):
     """AI 탐지 시작"""
@@ -447,7 +719,8 @@ def background_streaming_status(request):
             'success': True,
             'cameras': status_data,
             'total_cameras': len(cameras),
-            'background_active': sum(1 for data in status_data if data['background_streaming'])
+            'background_active': sum(1 for data in status_data if data['background_streaming']),
+            'ai_models': ai_detection_system.get_model_status(),
         })
 
     except Exception as e:
@@ -464,7 +737,6 @@ def detection_dashboard(request):
     # 필터 파라미터
     camera_id = request.GET.get('camera_id')
     alert_only = request.GET.get('alert_only') == 'true'
-    page = int(request.GET.get('page', 1))
     page_size = 20
 
     # 기본 쿼리
@@ -478,27 +750,24 @@ def detection_dashboard(request):
     if alert_only:
         logs = logs.filter(has_alert=True)
 
-    # 스크린샷이 있는 것만
-    logs = logs.exclude(screenshot_path__isnull=True).exclude(screenshot_path='')
-
-    # 페이징
-    total_count = logs.count()
-    start = (page - 1) * page_size
-    end = start + page_size
-    logs = logs[start:end]
+    # 스크린샷이 있는 것만 (DB 플래그 - 파일 시스템 조회 없음)
+    logs = logs.filter(screenshot_available=True)
 
-    # 이전/다음 페이지 계산
-    has_prev = page > 1
-    has_next = end < total_count
+    # 커서 페이징 (전체 건수는 캐시된 근사값)
+    try:
+        page = paginate_logs(logs, request.GET.get('cursor'), request.GET.get('direction'), page_size)
+    except ValueError:
+        page = paginate_logs(logs, page_size=page_size)
 
     context = {
         'cameras': cameras,
-        'logs': logs,
-        'total_count': total_count,
-        'page': page,
+        'logs': page['items'],
+        'total_count': get_cached_count(logs),
         'page_size': page_size,
-        'has_prev': has_prev,
-        'has_next': has_next,
+        'has_prev': page['has_prev'],
+        'has_next': page['has_next'],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
         'selected_camera_id': int(camera_id) if camera_id else None,
         'alert_only': alert_only,
     }
@@ -512,7 +781,6 @@ def camera_detection_gallery(request, camera_id):
 
     # 필터 파라미터
     alert_only = request.GET.get('alert_only') == 'true'
-    page = int(request.GET.get('page', 1))
     page_size = 30
 
     # 쿼리
@@ -521,28 +789,119 @@ def camera_detection_gallery(request, camera_id):
     if alert_only:
         logs = logs.filter(has_alert=True)
 
-    # 스크린샷이 있는 것만
-    logs = logs.exclude(screenshot_path__isnull=True).exclude(screenshot_path='')
-
-    # 페이징
-    total_count = logs.count()
-    start = (page - 1) * page_size
-    end = start + page_size
-    logs = logs[start:end]
+    # 스크린샷이 있는 것만 (DB 플래그 - 파일 시스템 조회 없음)
+    logs = logs.filter(screenshot_available=True)
 
-    # 이전/다음 페이지 계산
-    has_prev = page > 1
-    has_next = end < total_count
+    # 커서 페이징 (전체 건수는 캐시된 근사값)
+    try:
+        page = paginate_logs(logs, request.GET.get('cursor'), request.GET.get('direction'), page_size)
+    except ValueError:
+        page = paginate_logs(logs, page_size=page_size)
 
     context = {
         'camera': camera,
-        'logs': logs,
-        'total_count': total_count,
-        'page': page,
+        'logs': page['items'],
+        'total_count': get_cached_count(logs),
         'page_size': page_size,
-        'has_prev': has_prev,
-        'has_next': has_next,
+        'has_prev': page['has_prev'],
+        'has_next': page['has_next'],
+        'next_cursor': page['next_cursor'],
+        'prev_cursor': page['prev_cursor'],
         'alert_only': alert_only,
     }
 
-    return render(request, 'cctv/camera_detection_gallery.html', context)
\ No newline at end of file
+    return render(request, 'cctv/camera_detection_gallery.html', context)
+
+def _telemetry_camera_labels(cameras):
+    """텔레메트리 키(rtsp_url) → 카메라 라벨 매핑"""
+    return {
+        camera.rtsp_url: {'camera_id': camera.id, 'camera_name': camera.name}
+        for camera in cameras
+    }
+
+@login_required
+def telemetry_api(request):
+    """카메라별 파이프라인 카운터 및 단계별 지연시간 (JSON)"""
+    cameras = Camera.objects.all()
+    snapshot = pipeline_telemetry.snapshot()
+
+    camera_data = []
+    for camera in cameras:
+        metrics = snapshot.get(camera.rtsp_url, {'counters': {}, 'stages': {}})
+        status = camera_streamer.get_camera_status(camera.rtsp_url)
+        camera_data.append({
+            'id': camera.id,
+            'name': camera.name,
+            'location': camera.location,
+            'is_connected': status.get('is_connected', False),
+            'avg_fps': status.get('avg_fps', 0),
+            'counters': metrics['counters'],
+            'crop_cache_hit_rate': get_hit_rate(metrics['counters']),
+            'stages': metrics['stages'],
+        })
+
+    return JsonResponse({
+        'status': 'success',
+        'uptime_seconds': round(time.time() - pipeline_telemetry.started_at, 1),
+        'cameras': camera_data,
+    })
+
+# Prometheus 스크레이퍼용 Bearer 토큰 (비어 있으면 로그인한 사용자만 조회 가능)
+METRICS_TOKEN = getattr(settings, 'CCTV_METRICS_TOKEN', '')
+
+@require_http_methods(["GET"])
+def telemetry_metrics(request):
+    """Prometheus 텍스트 포맷 메트릭 (로그인 세션 또는 Authorization: Bearer <CCTV_METRICS_TOKEN>)"""
+    authorization = request.headers.get('Authorization', '')
+    token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")
+    if not token_ok and not request.user.is_authenticated:
+        response = HttpResponse("인증이 필요합니다.", status=401, content_type='text/plain; charset=utf-8')
+        response['WWW-Authenticate'] = 'Bearer realm="cctv-metrics"'
+        return response
+
+    cameras = list(Camera.objects.all())
+
+    # 카메라 FPS / 연결 상태 / 크롭 캐시 적중률 게이지
+    snapshot = pipeline_telemetry.snapshot()
+    gauges = {'camera_fps': {}, 'camera_connected': {}, 'crop_cache_hit_ratio': {}}
+    for camera in cameras:
+        status = camera_streamer.get_camera_status(camera.rtsp_url)
+        gauges['camera_fps'][camera.rtsp_url] = status.get('avg_fps', 0)
+        gauges['camera_connected'][camera.rtsp_url] = int(bool(status.get('is_connected')))
+        hit_rate = get_hit_rate(snapshot.get(camera.rtsp_url, {}).get('counters', {}))
+        if hit_rate is not None:
+            gauges['crop_cache_hit_ratio'][camera.rtsp_url] = hit_rate
+
+    body = pipeline_telemetry.render_prometheus(_telemetry_camera_labels(cameras), gauges)
+    return HttpResponse(body, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@staff_member_required
+def frame_traces_api(request):
+    """느린 프레임의 단계별 지연 트레이스 (관리자 전용)"""
+    try:
+        camera_id = int(request.GET['camera_id']) if request.GET.get('camera_id') else None
+        log_id = int(request.GET['log_id']) if request.GET.get('log_id') else None
+        limit = max(1, min(int(request.GET.get('limit', 50)), 200))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': "camera_id, log_id, limit 는 정수여야 합니다."}, status=400)
+
+    cameras = Camera.objects.all()
+    if camera_id:
+        cameras = cameras.filter(id=camera_id)
+    camera_labels = _telemetry_camera_labels(cameras)
+
+    traces = frame_tracer.get_traces(
+        rtsp_urls=set(camera_labels) if camera_id else None,
+        log_id=log_id,
+        limit=limit,
+    )
+    for trace in traces:
+        # RTSP 주소(인증 정보 포함 가능)는 카메라 정보로 대체
+        rtsp_url = trace.pop('rtsp_url')
+        trace.update(camera_labels.get(rtsp_url, {'camera_id': None, 'camera_name': None}))
+
+    return JsonResponse({
+        'status': 'success',
+        'tracer': frame_tracer.get_status(),
+        'traces': traces,
+    })
@@ -0,0 +1,126 @@
+# CCTV/yolo_backend.py
+"""
+YOLO 추론 백엔드 선택 및 export 캐시
+
+- torch    : ultralytics PyTorch eager (기본, GPU 환경)
+- onnx     : ONNX Runtime (CPU)
+- openvino : OpenVINO (CPU, 인텔 서버에서 가장 빠름)
+- auto     : CUDA 가 있으면 torch, 없으면 openvino → onnx → torch 순으로 사용 가능한 것 선택
+
+export 결과물은 원본 가중치 옆에 imgsz 별로 캐시한다.
+    CCTV/yolo11l.pt
+    CCTV/yolo11l_960.onnx
+    CCTV/yolo11l_960_openvino_model/
+원본 .pt 가 더 최신이면 다시 export 한다.
+
+Django 설정에 의존하지 않으므로 TEST/ 벤치마크 스크립트에서도 그대로 사용할 수 있다.
+"""
+import importlib.util
+import logging
+import os
+import shutil
+
+logger = logging.getLogger('CCTV.detection')
+
+BACKEND_AUTO = 'auto'
+BACKEND_TORCH = 'torch'
+BACKEND_ONNX = 'onnx'
+BACKEND_OPENVINO = 'openvino'
+BACKENDS = (BACKEND_TORCH, BACKEND_ONNX, BACKEND_OPENVINO)
+
+# 탐지 입력 크기 (exported 모델은 이 크기로 고정 export)
+YOLO_IMGSZ = 960
+
+# 백엔드별 런타임 패키지
+_RUNTIME_MODULES = {
+    BACKEND_ONNX: 'onnxruntime',
+    BACKEND_OPENVINO: 'openvino',
+}
+
+
+def is_backend_available(backend):
+    """런타임 패키지 설치 여부"""
+    if backend == BACKEND_TORCH:
+        return True
+    module = _RUNTIME_MODULES.get(backend)
+    return module is not None and importlib.util.find_spec(module) is not None
+
+
+def resolve_backend(backend=BACKEND_AUTO, cuda_available=False):
+    """설정값(auto 포함)을 실제 사용할 백엔드로 변환"""
+    if backend != BACKEND_AUTO:
+        if backend not in BACKENDS:
+            raise ValueError(f"알 수 없는 YOLO 백엔드: {backend}")
+        if not is_backend_available(backend):
+            logger.warning("YOLO 백엔드 '%s' 런타임이 설치되지 않아 torch 사용", backend)
+            return BACKEND_TORCH
+        return backend
+
+    if cuda_available:
+        return BACKEND_TORCH
+    for candidate in (BACKEND_OPENVINO, BACKEND_ONNX):
+        if is_backend_available(candidate):
+            return candidate
+    return BACKEND_TORCH
+
+
+def get_export_path(weights_path, backend, imgsz=YOLO_IMGSZ):
+    """캐시된 export 결과물 경로"""
+    stem, _ = os.path.splitext(weights_path)
+    if backend == BACKEND_ONNX:
+        return f"{stem}_{imgsz}.onnx"
+    if backend == BACKEND_OPENVINO:
+        return f"{stem}_{imgsz}_openvino_model"
+    return weights_path
+
+
+def _is_export_fresh(export_path, weights_path):
+    return os.path.exists(export_path) and os.path.getmtime(export_path) >= os.path.getmtime(weights_path)
+
+
+def export_model(weights_path, backend, imgsz=YOLO_IMGSZ, force=False):
+    """
+    .pt 를 ONNX/OpenVINO 로 export 하고 캐시 경로 반환
+
+    ultralytics 는 가중치 옆에 yolo11l.onnx / yolo11l_openvino_model 로 내보내므로
+    imgsz 가 포함된 캐시 경로로 옮긴다.
+    """
+    from ultralytics import YOLO
+
+    export_path = get_export_path(weights_path, backend, imgsz)
+    if not force and _is_export_fresh(export_path, weights_path):
+        return export_path
+
+    logger.info("YOLO %s export 시작: %s (imgsz=%s)", backend, weights_path, imgsz)
+    exported = YOLO(weights_path).export(format=backend, imgsz=imgsz, half=False, dynamic=False)
+    exported = str(exported)
+
+    if os.path.abspath(exported) != os.path.abspath(export_path):
+        if os.path.isdir(export_path):
+            shutil.rmtree(export_path)
+        elif os.path.exists(export_path):
+            os.remove(export_path)
+        shutil.move(exported, export_path)
+
+    logger.info("YOLO %s export 완료: %s", backend, export_path)
+    return export_path
+
+
+def load_yolo_model(weights_path, backend=BACKEND_AUTO, imgsz=YOLO_IMGSZ, cuda_available=False):
+    """
+    백엔드에 맞는 YOLO 모델 로드
+
+    Returns:
+        (model, backend) - export/로드 실패 시 torch 로 대체하고 backend 도 torch 로 반환
+    """
+    from ultralytics import YOLO
+
+    backend = resolve_backend(backend, cuda_available)
+    if backend != BACKEND_TORCH:
+        try:
+            export_path = export_model(weights_path, backend, imgsz)
+            return YOLO(export_path, task='detect'), backend
+        except Exception as e:
+            logger.warning("YOLO %s 로드 실패, torch 로 대체: %s", backend, e)
+
+    return YOLO(weights_path), BACKEND_TORCH
@@ -0,0 +1,126 @@
+# CLIP 이미지 인코더 fp32 vs int8 동적 양자화 정확도/지연 리포트 (CPU)
+#
+# 크롭 이미지 정답 (TEST/benchmark_detectors.py 의 load_dataset 과 동일)
+#   TEST/cropped_objects/labels.json    {"파일명": "라벨"} → 정확도 계산
+#   TEST/cropped_objects/<라벨>/*.png   → 라벨 폴더 이름이 정답 (정확도 계산)
+#   그 외 이미지                         → 정답 없음 (fp32 와의 예측 일치율만 계산)
+# 프롬프트는 탐지 파이프라인과 동일하게 "a photo of <라벨>" + "other object"
+#
+# 실행: python TEST/benchmark_clip_quantization.py [--labels fight falldown ...] [--repeat 3]
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+
+import torch
+import clip
+from PIL import Image
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+sys.path.insert(0, os.path.join(BASE_DIR, 'TEST'))
+
+from CCTV.clip_quantization import quantize_clip_visual  # noqa: E402
+from benchmark_detectors import load_dataset  # noqa: E402
+
+CROP_DIR = os.path.join(BASE_DIR, 'TEST', 'cropped_objects')
+MODEL_NAME = "ViT-L/14@336px"
+
+
+def run(model, preprocess, text_features, crops, repeat):
+    predictions = []
+    probabilities = []
+    timings = []
+    for path, _ in crops:
+        image = preprocess(Image.open(path).convert('RGB')).unsqueeze(0)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with torch.no_grad():
+                features = model.encode_image(image)
+                features = features / features.norm(dim=-1, keepdim=True)
+                probs = ((features @ text_features.T) * 100.0).softmax(dim=-1)[0]
+            timings.append(time.perf_counter() - start)
+        predictions.append(int(probs.argmax()))
+        probabilities.append(probs)
+    return predictions, probabilities, timings
+
+
+def summarize(name, timings):
+    timings = sorted(timings)
+    return (
+        f"{name:<6} mean {statistics.mean(timings) * 1000:8.1f}ms"
+        f"  p50 {timings[len(timings) // 2] * 1000:8.1f}ms"
+        f"  p95 {timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000:8.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CLIP int8 동적 양자화 리포트")
+    parser.add_argument('--crops', default=CROP_DIR)
+    parser.add_argument('--labels', nargs='*', default=None, help="비교할 라벨 (기본: labels.json / 라벨 폴더의 정답 라벨)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    crops = sorted(load_dataset([args.crops]))
+    if not crops:
+        print(f"크롭 이미지가 없습니다: {args.crops}")
+        return
+
+    labels = args.labels or sorted({label for _, label in crops if label})
+    if not labels:
+        print("라벨이 없습니다. --labels 로 지정하거나 labels.json / 라벨 폴더로 정답을 지정해 주세요.")
+        return
+    text_queries = [f"a photo of {label}" for label in labels] + ["other object"]
+
+    torch.set_num_threads(os.cpu_count() or 1)
+    print(f"모델: {MODEL_NAME} (CPU), 크롭 {len(crops)}장, 라벨 {labels}")
+
+    fp32_model, preprocess = clip.load(MODEL_NAME, device="cpu")
+    fp32_model.eval()
+    int8_model = quantize_clip_visual(copy.deepcopy(fp32_model))
+
+    with torch.no_grad():
+        text_features = fp32_model.encode_text(clip.tokenize(text_queries))
+        text_features = text_features / text_features.norm(dim=-1, keepdim=True)
+
+    # 워밍업
+    warmup = preprocess(Image.open(crops[0][0]).convert('RGB')).unsqueeze(0)
+    with torch.no_grad():
+        fp32_model.encode_image(warmup)
+        int8_model.encode_image(warmup)
+
+    fp32_pred, fp32_probs, fp32_times = run(fp32_model, preprocess, text_features, crops, args.repeat)
+    int8_pred, int8_probs, int8_times = run(int8_model, preprocess, text_features, crops, args.repeat)
+
+    agreement = sum(a == b for a, b in zip(fp32_pred, int8_pred)) / len(crops)
+    max_prob_diff = max(float((a - b).abs().max()) for a, b in zip(fp32_probs, int8_probs))
+
+    print()
+    print("=== 지연 (이미지 인코딩 + 유사도, 크롭 1장) ===")
+    print(summarize('fp32', fp32_times))
+    print(summarize('int8', int8_times))
+    print(f"속도 향상: x{statistics.mean(fp32_times) / statistics.mean(int8_times):.2f}")
+
+    print()
+    print("=== 정확도 ===")
+    print(f"fp32 대비 top-1 일치율: {agreement:.1%}")
+    print(f"최대 확률 차이: {max_prob_diff:.4f}")
+
+    labelled = [(i, labels.index(label)) for i, (_, label) in enumerate(crops) if label in labels]
+    if labelled:
+        fp32_acc = sum(fp32_pred[i] == target for i, target in labelled) / len(labelled)
+        int8_acc = sum(int8_pred[i] == target for i, target in labelled) / len(labelled)
+        print(f"라벨 크롭 {len(labelled)}장 정확도: fp32 {fp32_acc:.1%} / int8 {int8_acc:.1%}")
+
+    print()
+    print("=== 불일치 크롭 ===")
+    for (path, label), a, b in zip(crops, fp32_pred, int8_pred):
+        if a != b:
+            print(f"  {os.path.relpath(path, args.crops)} (정답: {label}) fp32={text_queries[a]} int8={text_queries[b]}")
+
+
+if __name__ == '__main__':
+    main()
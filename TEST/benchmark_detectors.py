@@ -0,0 +1,522 @@
+# 후보 탐지/분류 모델 통합 벤치마크 (AIDetectionSystem 백엔드 선정용)
+#
+# TEST/ 의 개별 프로토타입(owl2.py, test_owlvit.py, test_florence.py, test_blip.py, test_SigLIP.py,
+# test_yoloe.py, test_yoloworld.py)을 같은 인터페이스로 감싸 같은 이미지/라벨로 비교한다.
+# 모든 백엔드는 "이미지가 후보 라벨 중 무엇인가 (없으면 other)" 를 답한다.
+#   분류 모델 (clip, siglip, blip)          : 라벨 프롬프트 + "other object" 점수 중 최고
+#   탐지 모델 (owlvit, owlv2, yoloe, yolo_world) : 라벨별 최고 박스 점수, 임계값 미만이면 other
+#   florence                                   : 캡션에 라벨 단어가 포함된 비율
+#
+# 이미지 디렉토리의 정답
+#   <디렉토리>/labels.json        {"파일명": "라벨"}
+#   <디렉토리>/<라벨>/*.png        라벨 폴더 이름이 정답
+#   그 외 이미지                    정답 없음 (지연/메모리만 측정)
+#
+# 실행: python TEST/benchmark_detectors.py  (프로젝트 루트에서)
+#   --backends clip owlv2 yoloe  --images TEST/photo TEST/cropped_objects  --repeat 3
+#   --output result.json | result.csv   (기계 판독용 결과 저장)
+#
+# 최대 RSS 가 모델별로 섞이지 않도록 백엔드마다 별도 프로세스에서 실행한다 (--in-process 로 끌 수 있음).
+import argparse
+import csv
+import glob
+import importlib.util
+import json
+import multiprocessing
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = os.path.join(BASE_DIR, 'TEST')
+IMAGE_DIRS = [os.path.join(TEST_DIR, 'photo'), os.path.join(TEST_DIR, 'cropped_objects')]
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+MANIFEST_NAME = 'labels.json'
+
+OTHER_LABEL = 'other'
+OTHER_PROMPT = 'other object'
+
+# 결과 테이블 컬럼 (CSV 헤더 순서)
+RESULT_COLUMNS = (
+    'backend', 'model', 'device', 'status', 'images', 'labelled', 'accuracy',
+    'load_s', 'mean_ms', 'p50_ms', 'p95_ms', 'peak_rss_mb', 'peak_gpu_mb', 'error',
+)
+
+
+# ----------------------------
+# 데이터셋
+# ----------------------------
+def normalize_label(label):
+    return label.replace('_', ' ').strip().lower()
+
+
+def load_dataset(image_dirs):
+    """[(경로, 정답 라벨 또는 None)]"""
+    items = []
+    for image_dir in image_dirs:
+        manifest_path = os.path.join(image_dir, MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding='utf-8') as file:
+                manifest = json.load(file)
+
+        for path in sorted(glob.glob(os.path.join(image_dir, '*'))):
+            if os.path.isdir(path):
+                label = normalize_label(os.path.basename(path))
+                items += [
+                    (image, label) for image in sorted(glob.glob(os.path.join(path, '*')))
+                    if image.lower().endswith(IMAGE_EXTENSIONS)
+                ]
+            elif path.lower().endswith(IMAGE_EXTENSIONS):
+                label = manifest.get(os.path.basename(path))
+                items.append((path, normalize_label(label) if label else None))
+    return items
+
+
+def percentile(sorted_values, ratio):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * ratio))]
+
+
+def peak_rss_mb():
+    """프로세스 최대 RSS (MB)"""
+    try:
+        import resource
+        # Linux 는 KB, macOS 는 바이트 단위
+        divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+    except ImportError:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+
+
+# ----------------------------
+# 백엔드 공통 인터페이스
+# ----------------------------
+class DetectorBackend:
+    """
+    load(labels, device) 후 scores(image) 가 라벨별 점수 목록을 반환한다.
+    점수가 모두 threshold 미만이면 other 로 판정한다.
+    """
+
+    name = None
+    model_id = None
+    modules = ()
+    threshold = 0.0
+
+    def load(self, labels, device):
+        raise NotImplementedError
+
+    def scores(self, image):
+        raise NotImplementedError
+
+    def predict(self, image):
+        scores = self.scores(image)
+        best = max(range(len(scores)), key=lambda index: scores[index])
+        if scores[best] < self.threshold:
+            return OTHER_LABEL, scores[best]
+        return self.labels[best], scores[best]
+
+    @classmethod
+    def missing_modules(cls):
+        return [module for module in cls.modules if importlib.util.find_spec(module) is None]
+
+
+class ClipBackend(DetectorBackend):
+    """현재 운영 중인 CLIP (기준선)"""
+
+    name = 'clip'
+    model_id = 'ViT-L/14@336px'
+    modules = ('torch', 'clip')
+
+    def load(self, labels, device):
+        import clip
+        import torch
+
+        self.torch = torch
+        self.device = device
+        self.labels = labels
+        self.model, self.preprocess = clip.load(self.model_id, device=device)
+        prompts = [f"a photo of {label}" for label in labels] + [OTHER_PROMPT]
+        with torch.no_grad():
+            features = self.model.encode_text(clip.tokenize(prompts).to(device))
+            self.text_features = features / features.norm(dim=-1, keepdim=True)
+
+    def scores(self, image):
+        torch = self.torch
+        with torch.no_grad():
+            features = self.model.encode_image(self.preprocess(image).unsqueeze(0).to(self.device))
+            features = features / features.norm(dim=-1, keepdim=True)
+            probs = (100.0 * features @ self.text_features.T).softmax(dim=-1)[0]
+        return probs.float().cpu().tolist()
+
+    def predict(self, image):
+        scores = self.scores(image)
+        best = max(range(len(scores)), key=lambda index: scores[index])
+        if best == len(self.labels):
+            return OTHER_LABEL, scores[best]
+        return self.labels[best], scores[best]
+
+
+class BlipBackend(ClipBackend):
+    """BLIP ITM - 프롬프트별 이미지-텍스트 매칭 점수의 softmax"""
+
+    name = 'blip'
+    model_id = 'Salesforce/blip-itm-base-coco'
+    modules = ('torch', 'transformers')
+
+    def load(self, labels, device):
+        import torch
+        from transformers import BlipForImageTextRetrieval, BlipProcessor
+
+        self.torch = torch
+        self.device = device
+        self.labels = labels
+        self.prompts = [f"a photo of {label}" for label in labels] + [OTHER_PROMPT]
+        self.processor = BlipProcessor.from_pretrained(self.model_id)
+        self.model = BlipForImageTextRetrieval.from_pretrained(self.model_id).to(device).eval()
+
+    def scores(self, image):
+        torch = self.torch
+        inputs = self.processor(
+            images=[image] * len(self.prompts), text=self.prompts, return_tensors='pt', padding=True,
+        ).to(self.device)
+        with torch.no_grad():
+            itm = self.model(**inputs).itm_score.softmax(dim=-1)[:, 1]
+        return (itm / itm.sum()).float().cpu().tolist()
+
+
+class SiglipBackend(DetectorBackend):
+    """SigLIP2 - 프롬프트별 독립 sigmoid 확률"""
+
+    name = 'siglip'
+    model_id = 'google/siglip2-large-patch16-384'
+    modules = ('torch', 'transformers')
+    threshold = 0.05
+
+    def load(self, labels, device):
+        import torch
+        from transformers import AutoModel, AutoProcessor
+
+        self.torch = torch
+        self.device = device
+        self.labels = labels
+        self.prompts = [f"a photo of {label}" for label in labels]
+        self.processor = AutoProcessor.from_pretrained(self.model_id)
+        self.model = AutoModel.from_pretrained(self.model_id).to(device).eval()
+
+    def scores(self, image):
+        torch = self.torch
+        inputs = self.processor(
+            text=self.prompts, images=image, padding='max_length', max_length=64, return_tensors='pt',
+        ).to(self.device)
+        with torch.no_grad():
+            probs = torch.sigmoid(self.model(**inputs).logits_per_image)[0]
+        return probs.float().cpu().tolist()
+
+
+class OwlVitBackend(DetectorBackend):
+    """OWL-ViT - 라벨별 최고 박스 점수"""
+
+    name = 'owlvit'
+    model_id = 'google/owlvit-base-patch32'
+    modules = ('torch', 'transformers')
+    threshold = 0.1
+
+    def _load_model(self):
+        from transformers import OwlViTForObjectDetection, OwlViTProcessor
+
+        return OwlViTProcessor.from_pretrained(self.model_id), OwlViTForObjectDetection.from_pretrained(self.model_id)
+
+    def load(self, labels, device):
+        import torch
+
+        self.torch = torch
+        self.device = device
+        self.labels = labels
+        self.processor, model = self._load_model()
+        self.model = model.to(device).eval()
+
+    def scores(self, image):
+        torch = self.torch
+        inputs = self.processor(text=[self.labels], images=image, return_tensors='pt').to(self.device)
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+        # 쿼리별 최고 점수 (후처리 임계값과 무관하게 비교)
+        logits = outputs.logits[0].sigmoid()  # (박스 수, 라벨 수)
+        return logits.max(dim=0).values.float().cpu().tolist()
+
+
+class Owlv2Backend(OwlVitBackend):
+    name = 'owlv2'
+    model_id = 'google/owlv2-base-patch16'
+    threshold = 0.2
+
+    def _load_model(self):
+        from transformers import Owlv2ForObjectDetection, Owlv2Processor
+
+        return Owlv2Processor.from_pretrained(self.model_id), Owlv2ForObjectDetection.from_pretrained(self.model_id)
+
+
+class FlorenceBackend(DetectorBackend):
+    """Florence-2 캡션 - 라벨 단어가 캡션에 포함된 비율 (test_florence.py 방식)"""
+
+    name = 'florence'
+    model_id = 'microsoft/Florence-2-base'
+    modules = ('torch', 'transformers')
+    threshold = 0.5
+    task = '<DETAILED_CAPTION>'
+    stopwords = {'a', 'an', 'the', 'of', 'on', 'in', 'with', 'person'}
+
+    def load(self, labels, device):
+        import torch
+        from transformers import AutoModelForCausalLM, AutoProcessor
+
+        self.torch = torch
+        self.device = device
+        self.labels = labels
+        self.processor = AutoProcessor.from_pretrained(self.model_id, trust_remote_code=True)
+        self.model = AutoModelForCausalLM.from_pretrained(
+            self.model_id, trust_remote_code=True, attn_implementation='eager',
+        ).to(device).eval()
+        self.label_words = [
+            [word for word in label.split() if word not in self.stopwords] or label.split()
+            for label in labels
+        ]
+
+    def scores(self, image):
+        torch = self.torch
+        inputs = self.processor(text=self.task, images=image, return_tensors='pt').to(self.device)
+        with torch.no_grad():
+            generated_ids = self.model.generate(
+                input_ids=inputs['input_ids'], pixel_values=inputs['pixel_values'],
+                max_new_tokens=100, num_beams=3, do_sample=False,
+            )
+        caption = self.processor.batch_decode(generated_ids, skip_special_tokens=True)[0].lower()
+        caption_words = set(re.findall(r'[a-z]+', caption))
+        # 어간 일치 허용 (fight → fighting, ride → riding)
+        return [
+            sum(any(word.startswith(target[:4]) for word in caption_words) for target in words) / len(words)
+            for words in self.label_words
+        ]
+
+
+class YoloWorldBackend(DetectorBackend):
+    """YOLO-World - set_classes 로 라벨을 어휘로 지정, 클래스별 최고 신뢰도"""
+
+    name = 'yolo_world'
+    model_id = 'yolov8m-worldv2.pt'
+    modules = ('ultralytics',)
+    threshold = 0.1
+
+    def _load_model(self, labels):
+        from ultralytics import YOLOWorld
+
+        model = YOLOWorld(self.model_id)
+        model.set_classes(labels)
+        return model
+
+    def load(self, labels, device):
+        self.device = device
+        self.labels = labels
+        self.model = self._load_model(labels)
+
+    def scores(self, image):
+        result = self.model.predict(image, conf=0.01, device=self.device, verbose=False)[0]
+        scores = [0.0] * len(self.labels)
+        if result.boxes is not None:
+            for cls, conf in zip(result.boxes.cls.tolist(), result.boxes.conf.tolist()):
+                scores[int(cls)] = max(scores[int(cls)], conf)
+        return scores
+
+
+class YoloeBackend(YoloWorldBackend):
+    name = 'yoloe'
+    model_id = 'yoloe-11l-seg.pt'
+
+    def _load_model(self, labels):
+        from ultralytics import YOLOE
+
+        model = YOLOE(self.model_id)
+        model.set_classes(labels, model.get_text_pe(labels))
+        return model
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (
+        ClipBackend, OwlVitBackend, Owlv2Backend, FlorenceBackend, BlipBackend,
+        SiglipBackend, YoloeBackend, YoloWorldBackend,
+    )
+}
+
+
+# ----------------------------
+# 실행
+# ----------------------------
+def resolve_device(device):
+    if device != 'auto':
+        return device
+    try:
+        import torch
+        return 'cuda' if torch.cuda.is_available() else 'cpu'
+    except ImportError:
+        return 'cpu'
+
+
+def run_backend(name, items, labels, device, repeat):
+    """백엔드 하나 측정 → 결과 행 dict (별도 프로세스에서 실행 가능)"""
+    backend = BACKENDS[name]()
+    row = {'backend': name, 'model': backend.model_id, 'device': device, 'images': len(items)}
+
+    missing = backend.missing_modules()
+    if missing:
+        row.update(status='skipped', error=f"패키지 미설치: {', '.join(missing)}")
+        return row
+
+    from PIL import Image
+
+    try:
+        load_start = time.perf_counter()
+        backend.load(labels, device)
+        row['load_s'] = round(time.perf_counter() - load_start, 2)
+
+        images = [Image.open(path).convert('RGB') for path, _ in items]
+        # 워밍업 (첫 추론은 커널 컴파일/메모리 할당 포함)
+        backend.predict(images[0])
+
+        timings = []
+        predictions = []
+        for (path, expected), image in zip(items, images):
+            for _ in range(repeat):
+                start = time.perf_counter()
+                label, score = backend.predict(image)
+                timings.append(time.perf_counter() - start)
+            predictions.append({
+                'image': os.path.relpath(path, BASE_DIR),
+                'expected': expected,
+                'predicted': label,
+                'score': round(float(score), 4),
+            })
+    except Exception as e:
+        row.update(status='error', error=f"{type(e).__name__}: {e}")
+        return row
+
+    timings.sort()
+    labelled = [
+        prediction for prediction in predictions if prediction['expected'] is not None
+    ]
+    correct = sum(
+        prediction['predicted'] == (prediction['expected'] if prediction['expected'] in labels else OTHER_LABEL)
+        for prediction in labelled
+    )
+    row.update(
+        status='ok',
+        labelled=len(labelled),
+        accuracy=round(correct / len(labelled), 4) if labelled else None,
+        mean_ms=round(statistics.mean(timings) * 1000, 1),
+        p50_ms=round(percentile(timings, 0.5) * 1000, 1),
+        p95_ms=round(percentile(timings, 0.95) * 1000, 1),
+        peak_rss_mb=round(peak_rss_mb(), 1),
+        predictions=predictions,
+    )
+    if device.startswith('cuda'):
+        import torch
+        row['peak_gpu_mb'] = round(torch.cuda.max_memory_allocated() / (1024 * 1024), 1)
+    return row
+
+
+def run_isolated(name, items, labels, device, repeat):
+    """새 프로세스에서 실행 (spawn → 이전 모델의 메모리가 최대 RSS 에 섞이지 않음)"""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(run_backend, name, items, labels, device, repeat).result()
+
+
+def write_output(rows, path):
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(rows, file, ensure_ascii=False, indent=2)
+
+
+def format_cell(value, width, digits=1):
+    if value is None:
+        return f"{'-':>{width}}"
+    if isinstance(value, float):
+        return f"{value:>{width}.{digits}f}"
+    return f"{value:>{width}}"
+
+
+def print_table(rows):
+    print(f"{'backend':<12}{'status':>8}{'acc':>7}{'load(s)':>9}{'p50(ms)':>9}{'p95(ms)':>9}{'rss(MB)':>9}{'gpu(MB)':>9}")
+    for row in rows:
+        print(
+            f"{row['backend']:<12}{row['status']:>8}"
+            + format_cell(row.get('accuracy'), 7, 2)
+            + format_cell(row.get('load_s'), 9, 2)
+            + format_cell(row.get('p50_ms'), 9)
+            + format_cell(row.get('p95_ms'), 9)
+            + format_cell(row.get('peak_rss_mb'), 9)
+            + format_cell(row.get('peak_gpu_mb'), 9)
+        )
+        if row.get('error'):
+            print(f"  ⚠️ {row['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="탐지/분류 후보 모델 통합 벤치마크")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--images', nargs='+', default=IMAGE_DIRS, help="이미지 디렉토리 (labels.json 또는 라벨 폴더)")
+    parser.add_argument('--labels', nargs='*', default=None, help="후보 라벨 (기본: 정답 라벨 전체)")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--device', default='auto', help="auto | cpu | cuda | cuda:0")
+    parser.add_argument('--output', default=None, help="결과 저장 경로 (.json 또는 .csv)")
+    parser.add_argument('--json', action='store_true', help="결과를 JSON 으로 출력")
+    parser.add_argument('--in-process', action='store_true', help="백엔드를 현재 프로세스에서 순서대로 실행")
+    args = parser.parse_args()
+
+    items = load_dataset(args.images)
+    if not items:
+        print(f"이미지가 없습니다: {args.images}")
+        return
+
+    labels = [normalize_label(label) for label in args.labels] if args.labels else sorted(
+        {label for _, label in items if label}
+    )
+    if not labels:
+        print("라벨이 없습니다. --labels 로 지정하거나 labels.json / 라벨 폴더를 만들어 주세요.")
+        return
+
+    device = resolve_device(args.device)
+    print(f"이미지 {len(items)}장 x {args.repeat}회, 라벨 {labels} + {OTHER_LABEL}, 디바이스 {device}", file=sys.stderr)
+
+    rows = []
+    for name in args.backends:
+        print(f"▶ {name} 측정 중...", file=sys.stderr)
+        runner = run_backend if args.in_process else run_isolated
+        rows.append(runner(name, items, labels, device, args.repeat))
+
+    if args.output:
+        write_output(rows, args.output)
+        print(f"결과 저장: {args.output}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return
+
+    print()
+    print_table(rows)
+    # acc: 정답이 있는 이미지 top-1 정확도 (후보에 없는 정답은 other 가 정답)
+    # rss: 백엔드 프로세스 최대 RSS (--in-process 이면 누적)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# YOLO 추론 백엔드 벤치마크 (PyTorch eager vs ONNX Runtime vs OpenVINO)
+#
+# clip_images/ 의 프레임으로 imgsz 640 / 960 각각 측정
+# 실행: python TEST/benchmark_yolo_backends.py  (프로젝트 루트에서)
+#   --backends torch onnx openvino  --imgsz 640 960  --repeat 3
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+import cv2
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from CCTV.yolo_backend import BACKENDS, BACKEND_TORCH, export_model, is_backend_available  # noqa: E402
+
+WEIGHTS_PATH = os.path.join(BASE_DIR, 'CCTV', 'yolo11l.pt')
+IMAGE_DIR = os.path.join(BASE_DIR, 'clip_images')
+
+
+def load_frames(image_dir):
+    paths = sorted(
+        glob.glob(os.path.join(image_dir, '*.png'))
+        + glob.glob(os.path.join(image_dir, '*.PNG'))
+        + glob.glob(os.path.join(image_dir, '*.jpg'))
+    )
+    frames = []
+    for path in paths:
+        frame = cv2.imread(path)
+        if frame is not None:
+            frames.append((os.path.basename(path), frame))
+    return frames
+
+
+def load_model(backend, imgsz):
+    from ultralytics import YOLO
+
+    if backend == BACKEND_TORCH:
+        return YOLO(WEIGHTS_PATH)
+    return YOLO(export_model(WEIGHTS_PATH, backend, imgsz), task='detect')
+
+
+def benchmark(backend, imgsz, frames, repeat):
+    load_start = time.perf_counter()
+    model = load_model(backend, imgsz)
+    load_time = time.perf_counter() - load_start
+
+    # 워밍업 (첫 추론은 그래프 컴파일/메모리 할당 포함)
+    model(frames[0][1], imgsz=imgsz, conf=0.5, verbose=False)
+
+    timings = []
+    person_counts = []
+    for _ in range(repeat):
+        for _, frame in frames:
+            start = time.perf_counter()
+            results = model(frame, imgsz=imgsz, conf=0.5, verbose=False)
+            timings.append(time.perf_counter() - start)
+            boxes = results[0].boxes
+            person_counts.append(int((boxes.cls == 0).sum()) if boxes is not None else 0)
+
+    timings.sort()
+    return {
+        'backend': backend,
+        'imgsz': imgsz,
+        'load_s': load_time,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        'fps': 1.0 / statistics.mean(timings),
+        'persons': sum(person_counts[:len(frames)]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 백엔드 벤치마크")
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS), choices=BACKENDS)
+    parser.add_argument('--imgsz', nargs='+', type=int, default=[640, 960])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--images', default=IMAGE_DIR)
+    args = parser.parse_args()
+
+    frames = load_frames(args.images)
+    if not frames:
+        print(f"이미지가 없습니다: {args.images}")
+        return
+
+    print(f"이미지 {len(frames)}장 x {args.repeat}회, 가중치: {WEIGHTS_PATH}")
+
+    rows = []
+    for backend in args.backends:
+        if not is_backend_available(backend):
+            print(f"⚠️ {backend} 런타임 미설치 - 건너뜀")
+            continue
+        for imgsz in args.imgsz:
+            print(f"▶ {backend} imgsz={imgsz} 측정 중...")
+            rows.append(benchmark(backend, imgsz, frames, args.repeat))
+
+    print()
+    print(f"{'backend':<10}{'imgsz':>6}{'load(s)':>9}{'mean(ms)':>10}{'p50(ms)':>9}{'p95(ms)':>9}{'fps':>7}{'persons':>9}")
+    for row in rows:
+        print(
+            f"{row['backend']:<10}{row['imgsz']:>6}{row['load_s']:>9.2f}{row['mean_ms']:>10.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['fps']:>7.1f}{row['persons']:>9}"
+        )
+    # persons: 같은 이미지 세트에서 탐지된 person 박스 수 (백엔드 간 정확도 차이 확인용)
+
+
+if __name__ == '__main__':
+    main()
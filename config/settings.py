@@ -151,6 +151,100 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# CCTV YOLO 추론 백엔드: 'auto' | 'torch' | 'onnx' | 'openvino'
+# auto 는 CUDA 가 없으면 OpenVINO → ONNX Runtime 순으로 설치된 런타임 사용 (export 결과는 CCTV/ 에 캐시)
+CCTV_YOLO_BACKEND = 'auto'
+
+# CPU 환경에서 CLIP 이미지 인코더 int8 동적 양자화 사용 여부
+# 배포 전 TEST/benchmark_clip_quantization.py 로 fp32 대비 정확도/지연 확인 후 활성화
+CCTV_CLIP_QUANTIZE = False
+
+# CCTV 탐지 이벤트: 같은 카메라/라벨의 새 로그·알림 최소 간격(초), 트랙 미확인 시 이벤트 종료까지 시간(초)
+CCTV_EVENT_COOLDOWN_SECONDS = 30
+CCTV_EVENT_CLOSE_SECONDS = 10
+
+# CCTV 카메라별 탐지 주기 사이 대기 시간(초)
+CCTV_DETECTION_INTERVAL = 1.5
+
+# CCTV CLIP 배치 분류: 카메라 간 크롭을 묶는 최대 배치 크기, 첫 요청 후 배치를 채우려 기다리는 최대 시간(ms)
+CCTV_CLIP_BATCH_SIZE = 16
+CCTV_CLIP_BATCH_LINGER_MS = 5
+
+# CCTV 크롭 지각 해시 캐시: 같은 크롭으로 볼 최대 해밍 거리(64비트 중), 캐시 유효 시간(초, 저장 시각 기준)
+# 유효 시간은 트랙 분류 TTL(10초)의 2배 이상이어야 함 (더 짧으면 시작 시 경고)
+CCTV_CROP_CACHE_MAX_DISTANCE = 6
+CCTV_CROP_CACHE_TTL = 30.0
+
+# CCTV 탐지 엔진: 'two_stage' (YOLO person + CLIP 분류) | 'open_vocab' (YOLOE / YOLO-World 단일 추론, CLIP 미사용)
+# open_vocab 은 TEST/benchmark_detectors.py 로 라벨 정확도 확인 후 사용
+CCTV_DETECTION_ENGINE = 'two_stage'
+CCTV_OPEN_VOCAB_MODEL = 'yoloe-11l-seg.pt'
+CCTV_OPEN_VOCAB_CONFIDENCE = 0.25
+
+# CCTV 탐지 로그 목록의 전체 건수 캐시 시간(초) - 필터 조건별 근사값
+CCTV_LOG_COUNT_CACHE_SECONDS = 60
+
+# CCTV 스크린샷 존재 플래그(DetectionLog.screenshot_available) 백그라운드 재검증 주기(초), 0 이면 끔
+CCTV_SCREENSHOT_RECONCILE_INTERVAL = 3600
+
+# CCTV 탐지 스크린샷 썸네일 폭(px)과 형식('jpg' | 'webp') - 원본 옆에 <이름>.thumb.<형식> 으로 저장
+CCTV_THUMBNAIL_WIDTH = 320
+CCTV_THUMBNAIL_FORMAT = 'jpg'
+
+# CCTV 탐지 로그/스크린샷 보관 정책 (CCTV/retention.py, python manage.py apply_retention)
+# 경고 여부별 보관 일수, 라벨(표시 이름)별 보관 일수 (경고 여부별 기간보다 우선)
+CCTV_RETENTION_DAYS = {'normal': 7, 'alert': 180}
+CCTV_RETENTION_LABEL_DAYS = {}
+# 이 일수보다 오래된 스크린샷 날짜 폴더는 media/archive/ 아래 tar + 인덱스로 압축 (0 이면 압축 안 함)
+CCTV_RETENTION_ARCHIVE_AFTER_DAYS = 2
+# 백그라운드 보관 정책 실행 주기(초), 0 이면 끔
+CCTV_RETENTION_INTERVAL = 6 * 3600
+
+# CCTV Prometheus 메트릭(/cctv/metrics/) 스크레이퍼용 Bearer 토큰
+# 비어 있으면 로그인한 사용자만 조회 가능 - 스크레이퍼에는 Authorization: Bearer <토큰> 헤더 설정
+CCTV_METRICS_TOKEN = ''
+
+# Logging
+# CCTV 스레드들은 NonBlockingQueueHandler 를 통해 비동기로 출력 (터미널 I/O 에서 블로킹되지 않음)
+# 모듈별 레벨은 아래 loggers 에서 조정 (예: 탐지 상세 로그를 보려면 'CCTV.detection' 을 DEBUG 로)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'rate_limit': {
+            '()': 'CCTV.log.RateLimitFilter',
+            'interval': 10,
+        },
+    },
+    'formatters': {
+        'structured': {
+            '()': 'CCTV.log.StructuredFormatter',
+            'format': '%(asctime)s %(levelname)-7s [%(threadName)s] %(name)s: %(message)s',
+        },
+    },
+    'handlers': {
+        'cctv_console': {
+            'class': 'CCTV.log.NonBlockingQueueHandler',
+            'filters': ['rate_limit'],
+            'formatter': 'structured',
+        },
+    },
+    'loggers': {
+        'CCTV': {
+            'handlers': ['cctv_console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'CCTV.streaming': {'level': 'INFO'},
+        'CCTV.detection': {'level': 'INFO'},
+        'CCTV.apps': {'level': 'INFO'},
+        'CCTV.views': {'level': 'INFO'},
+        'CCTV.live_output': {'level': 'INFO'},
+        'CCTV.recorder': {'level': 'INFO'},
+        'CCTV.screenshots': {'level': 'INFO'},
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 